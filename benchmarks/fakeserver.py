@@ -0,0 +1,70 @@
+"""
+A minimal, threaded HTTP/1.1 server emulating the Grafana HTTP API, for
+running benchmarks without a real Grafana instance.
+"""
+
+import contextlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HEALTH = {"commit": "03f502a94d", "database": "ok", "version": "10.4.0"}
+
+
+def default_responder(method, path, params, body):  # noqa: ARG001
+    """
+    Respond to `/api/health`, and echo the request path for all other routes.
+    """
+    if path == "/api/health":
+        return 200, HEALTH
+    return 200, {"method": method, "path": path}
+
+
+def make_handler(responder, latency):
+    class FakeGrafanaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def handle_any(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if latency:
+                time.sleep(latency)
+            status, payload = responder(self.command, url.path, parse_qs(url.query), body)
+            if isinstance(payload, bytes):
+                content = payload
+            else:
+                content = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_any
+
+        def log_message(self, format, *args):  # noqa: ARG002
+            pass
+
+    return FakeGrafanaHandler
+
+
+@contextlib.contextmanager
+def fake_grafana(responder=default_responder, latency: float = 0.0):
+    """
+    Run a fake Grafana server on a random port, and yield its URL.
+
+    :param responder: Callable `(method, path, params, body) -> (status, payload)`.
+    :param latency: Artificial delay in seconds added to each response.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(responder, latency))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
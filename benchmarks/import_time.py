@@ -0,0 +1,98 @@
+"""
+Benchmark the startup time of short-lived programs, measuring fresh Python
+interpreters importing `grafana_client`, and using a few API elements.
+
+The time of starting the interpreter itself is measured separately and
+subtracted, so the numbers reflect the costs of the package and its
+dependencies.
+
+With `--budget`, the program also measures the time spent importing the
+modules of `grafana_client` itself, excluding its dependencies, when using a
+single API element, and fails when exceeding the budget in milliseconds.
+
+Synopsis:
+
+  python benchmarks/import_time.py --repeat 10
+  python benchmarks/import_time.py --repeat 1 --budget 150
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+from optparse import OptionParser
+from typing import Dict, Optional
+
+ELEMENTS = (
+    "admin alerting alertingprovisioning dashboard dashboard_versions datasource folder health organization "
+    "organizations search user users rbac teams annotations snapshots notifications plugin serviceaccount "
+    "libraryelement"
+)
+
+SCENARIOS: Dict[str, str] = {
+    "import package": "import grafana_client",
+    "import api": "from grafana_client import GrafanaApi",
+    "construct api": "from grafana_client import GrafanaApi; GrafanaApi.from_url()",
+    "use health": "from grafana_client import GrafanaApi; GrafanaApi.from_url().health",
+    "use all elements": (
+        "from grafana_client import GrafanaApi; api = GrafanaApi.from_url(); "
+        f"[getattr(api, name) for name in {ELEMENTS!r}.split()]"
+    ),
+    "use async health": "from grafana_client import AsyncGrafanaApi; AsyncGrafanaApi.from_url().health",
+}
+
+
+def measure(code: str, repeat: int) -> float:
+    """
+    Return the median wall clock time of running `code` in a fresh interpreter, in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def package_import_time(code: str = SCENARIOS["use health"]) -> float:
+    """
+    Return the time spent importing the modules of `grafana_client`, excluding
+    its dependencies, as reported by `python -X importtime`, in milliseconds.
+    """
+    command = [sys.executable, "-X", "importtime", "-c", code]
+    process = subprocess.run(command, check=True, capture_output=True, text=True)  # noqa: S603
+    total = 0
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip().startswith("grafana_client"):
+            total += int(fields[0].split(":")[1])
+    return total / 1000
+
+
+def startup_times(repeat: int) -> Dict[str, float]:
+    """
+    Return the median startup time of each scenario in milliseconds, excluding
+    the startup time of the interpreter.
+    """
+    baseline = measure("pass", repeat)
+    return {label: max(measure(code, repeat) - baseline, 0.0) for label, code in SCENARIOS.items()}
+
+
+def run(repeat: int, budget: Optional[float] = None):
+    print(f"Median startup time of {repeat} interpreters, in milliseconds, excluding the interpreter itself")
+    for label, value in startup_times(repeat).items():
+        print(f"{label:<20} {value:>8.1f}")
+    if budget is not None:
+        value = package_import_time()
+        print(f"Importing grafana_client modules took {value:.1f} ms, budget {budget:.1f} ms")
+        if value > budget:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("--repeat", type=int, default=10)
+    parser.add_option("--budget", type=float, default=None)
+    options, _ = parser.parse_args()
+    run(options.repeat, options.budget)
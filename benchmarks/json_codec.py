@@ -0,0 +1,99 @@
+"""
+Benchmark encoding and decoding of representative Grafana payloads, comparing
+the `niquests` built-in JSON handling with the pluggable JSON codecs.
+
+The payloads are derived from the test fixtures: data source definitions, data
+frame responses of `/ds/query`, a dashboard with many panels, and a `/search`
+result with 5000 hits.
+
+Synopsis:
+
+  python benchmarks/json_codec.py --repeat 20
+"""
+
+import json
+import sys
+import time
+from optparse import OptionParser
+from pathlib import Path
+
+import niquests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grafana_client.codec import CODECS, get_codec  # noqa: E402
+from test.elements import test_datasource_fixtures as fixtures  # noqa: E402
+
+
+def payloads():
+    datasources = [value for name, value in vars(fixtures).items() if name.endswith("_DATASOURCE")]
+    frame = fixtures.DATAFRAME_RESPONSE_HEALTH_PROMETHEUS["results"]["test"]["frames"][0]
+    query_response = {
+        "results": {
+            f"ref{index}": {"frames": [{**frame, "data": {"values": [list(range(1000)), [0.5] * 1000]}}]}
+            for index in range(10)
+        }
+    }
+    panel = {
+        "type": "timeseries",
+        "title": "Requests per second",
+        "datasource": {"type": "prometheus", "uid": fixtures.PROMETHEUS_DATASOURCE["uid"]},
+        "targets": [{"refId": "A", "expr": 'sum(rate(http_requests_total{job="api"}[5m])) by (status)'}],
+        "fieldConfig": {"defaults": {"unit": "reqps", "thresholds": {"steps": [{"color": "green", "value": None}]}}},
+        "gridPos": {"h": 8, "w": 12, "x": 0, "y": 0},
+    }
+    dashboard = {
+        "dashboard": {"uid": "cIBgcSjkk", "title": "Production Overview", "panels": [panel] * 200},
+        "meta": {"folderUid": "nErXDvCkzz", "url": "/d/cIBgcSjkk/production-overview"},
+    }
+    search = [
+        {"id": index, "uid": f"uid-{index}", "title": f"Dashboard {index}", "type": "dash-db", "tags": ["prod"]}
+        for index in range(5000)
+    ]
+    return {
+        "datasources": datasources,
+        "query response": query_response,
+        "dashboard": dashboard,
+        "search": search,
+    }
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def builtin_decode(data: bytes):
+    response = niquests.Response()
+    response.headers["Content-Type"] = "application/json"
+    response._content = data
+    return response.json()
+
+
+def run(repeat: int):
+    codecs = {}
+    for name in CODECS:
+        try:
+            codecs[name] = get_codec(name)
+        except ImportError:
+            print(f"Skipping codec `{name}`, not installed")
+
+    for label, payload in payloads().items():
+        data = json.dumps(payload).encode("utf-8")
+        print(f"\n{label} ({len(data) / 1024:.1f} KiB), milliseconds per operation")
+        encode = measure(lambda: json.dumps(payload).encode("utf-8"), repeat)
+        decode = measure(lambda: builtin_decode(data), repeat)
+        print(f"{'niquests built-in':<20} encode {encode:>8.3f}   decode {decode:>8.3f}")
+        for name, codec in codecs.items():
+            encode = measure(lambda: codec.dumps(payload), repeat)
+            decode = measure(lambda: codec.loads(data), repeat)
+            print(f"{name:<20} encode {encode:>8.3f}   decode {decode:>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("--repeat", type=int, default=20)
+    options, _ = parser.parse_args()
+    run(options.repeat)
@@ -0,0 +1,53 @@
+"""
+Benchmark requests per second of `AsyncGrafanaApi` against a local fake
+server, using different connection pool sizes.
+
+Synopsis:
+
+  python benchmarks/pool_size.py --concurrency 200 --requests 4000
+"""
+
+import asyncio
+import time
+from optparse import OptionParser
+
+from fakeserver import fake_grafana
+
+from grafana_client import AsyncGrafanaApi, ConnectionSettings
+
+
+async def measure(url: str, connection: ConnectionSettings, concurrency: int, requests: int) -> float:
+    grafana = AsyncGrafanaApi.from_url(url, connection=connection)
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            await grafana.health.check()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    duration = time.perf_counter() - start
+    await grafana.client.s.close()
+    return requests / duration
+
+
+def run(concurrency: int, requests: int, latency: float):
+    settings = {"default": None}
+    for size in [1, 10, 50, 100, 200]:
+        settings[f"pool_maxsize={size}"] = ConnectionSettings(pool_maxsize=size, pool_block=True)
+    settings["pool_maxsize=10, non-blocking"] = ConnectionSettings(pool_maxsize=10)
+
+    with fake_grafana(latency=latency) as url:
+        print(f"Concurrency: {concurrency}, requests: {requests}, server latency: {latency * 1000:.1f} ms")
+        for label, connection in settings.items():
+            rate = asyncio.run(measure(url, connection, concurrency, requests))
+            print(f"{label:<32} {rate:>10.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("--concurrency", type=int, default=200)
+    parser.add_option("--requests", type=int, default=4000)
+    parser.add_option("--latency", type=float, default=0.002)
+    options, _ = parser.parse_args()
+    run(options.concurrency, options.requests, options.latency)
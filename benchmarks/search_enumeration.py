@@ -0,0 +1,147 @@
+"""
+Benchmark enumerating all hits of the `/search` endpoint against a local fake
+server holding many dashboards, comparing a single request, which is truncated
+at 5000 hits, serial paging, speculative page prefetch, and partitioning by
+folder or type, using `GrafanaApi` and `AsyncGrafanaApi`.
+
+Synopsis:
+
+  python benchmarks/search_enumeration.py --dashboards 100000 --folders 500
+"""
+
+import asyncio
+import collections
+import functools
+import json
+import time
+from optparse import OptionParser
+from typing import Any, Callable, Dict, Iterable, List
+
+from fakeserver import HEALTH, fake_grafana
+
+from grafana_client import AsyncGrafanaApi, ConnectionSettings, GrafanaApi
+from grafana_client.pagination import SEARCH_LIMIT
+
+
+def make_responder(dashboards: int, folders: int):
+    """
+    Emulate `/api/search` with paging, filtering by `type`, `folderUIDs`, and `folderIds=0`.
+    Every tenth dashboard is located in the `General` folder.
+    """
+    folder_hits = [
+        {"id": index + 1, "uid": f"folder-{index}", "title": f"Folder {index}", "type": "dash-folder"}
+        for index in range(folders)
+    ]
+    dashboard_hits = []
+    for index in range(dashboards):
+        hit = {"id": folders + index + 1, "uid": f"dashboard-{index}", "title": f"Dashboard {index}", "type": "dash-db"}
+        if index % 10:
+            folder = folder_hits[index % folders]
+            hit.update({"folderId": folder["id"], "folderUid": folder["uid"], "folderTitle": folder["title"]})
+        dashboard_hits.append(hit)
+
+    by_folder: Dict[str, List[Dict[str, Any]]] = collections.defaultdict(list)
+    for hit in folder_hits + dashboard_hits:
+        by_folder[hit.get("folderUid", "")].append(hit)
+
+    @functools.lru_cache(maxsize=None)
+    def select(type_: str, folder_uid: str, root: bool) -> List[Dict[str, Any]]:
+        if folder_uid or root:
+            hits = by_folder[folder_uid]
+        else:
+            hits = folder_hits + dashboard_hits
+        if type_:
+            hits = [hit for hit in hits if hit["type"] == type_]
+        return hits
+
+    @functools.lru_cache(maxsize=4096)
+    def render(type_: str, folder_uid: str, root: bool, limit: int, page: int) -> bytes:
+        hits = select(type_, folder_uid, root)
+        return json.dumps(hits[(page - 1) * limit : page * limit]).encode()
+
+    def responder(method, path, params, body):  # noqa: ARG001
+        if path == "/api/health":
+            return 200, HEALTH
+        if path != "/api/search":
+            return 404, {"message": "Not found"}
+
+        def param(name, default=""):
+            return params.get(name, [default])[0]
+
+        limit = min(int(param("limit", SEARCH_LIMIT)), SEARCH_LIMIT)
+        page = int(param("page", 1))
+        return 200, render(param("type"), param("folderUIDs"), param("folderIds") == "0", limit, page)
+
+    return responder
+
+
+def measure(label: str, run: Callable[[], Iterable[Any]], requests: List[Any]):
+    requests.clear()
+    start = time.perf_counter()
+    hits = sum(1 for _ in run())
+    duration = time.perf_counter() - start
+    print(f"{label:<44} {hits:>8} hits {len(requests):>6} requests {duration:>8.2f} s {hits / duration:>10.0f} hits/s")
+
+
+def run_sync(url: str, concurrency: int):
+    grafana = GrafanaApi.from_url(url, connection=ConnectionSettings(pool_maxsize=concurrency), timeout=60)
+    requests = []
+    grafana.client.add_hook("before_request", requests.append)
+    search = grafana.search
+
+    measure("single request, limit=5000", lambda: search.search_dashboards(limit=SEARCH_LIMIT), requests)
+    measure("serial paging", lambda: search.iter_dashboards(concurrency=1), requests)
+    measure(
+        f"speculative paging, concurrency={concurrency}",
+        lambda: search.iter_dashboards(concurrency=concurrency),
+        requests,
+    )
+    measure(
+        f"partition by type, concurrency={concurrency}",
+        lambda: search.iter_dashboards(partition_by="type", concurrency=concurrency),
+        requests,
+    )
+    measure(
+        f"partition by folder, concurrency={concurrency}",
+        lambda: search.iter_dashboards(partition_by="folder", concurrency=concurrency),
+        requests,
+    )
+    grafana.close()
+
+
+def run_async(url: str, concurrency: int):
+    requests = []
+
+    async def enumerate_hits(**kwargs) -> List[Any]:
+        grafana = AsyncGrafanaApi.from_url(url, connection=ConnectionSettings(pool_maxsize=concurrency), timeout=60)
+        grafana.client.add_hook("before_request", requests.append)
+        async with grafana:
+            return [hit async for hit in await grafana.search.iter_dashboards(**kwargs)]
+
+    measure(
+        f"async speculative paging, concurrency={concurrency}",
+        lambda: asyncio.run(enumerate_hits(concurrency=concurrency)),
+        requests,
+    )
+    measure(
+        f"async partition by folder, concurrency={concurrency}",
+        lambda: asyncio.run(enumerate_hits(partition_by="folder", concurrency=concurrency)),
+        requests,
+    )
+
+
+def run(dashboards: int, folders: int, concurrency: int, latency: float):
+    with fake_grafana(make_responder(dashboards, folders), latency=latency) as url:
+        print(f"Dashboards: {dashboards}, folders: {folders}, server latency: {latency * 1000:.1f} ms")
+        run_sync(url, concurrency)
+        run_async(url, concurrency)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("--dashboards", type=int, default=100_000)
+    parser.add_option("--folders", type=int, default=500)
+    parser.add_option("--concurrency", type=int, default=8)
+    parser.add_option("--latency", type=float, default=0.02)
+    options, _ = parser.parse_args()
+    run(options.dashboards, options.folders, options.concurrency, options.latency)
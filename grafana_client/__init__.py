@@ -1,14 +1,64 @@
-try:
-    from importlib.metadata import PackageNotFoundError, version
-except ModuleNotFoundError:  # pragma:nocover
-    from importlib_metadata import PackageNotFoundError, version
-
-from .api import AsyncGrafanaApi, GrafanaApi  # noqa:E402,F401
-from .client import HeaderAuth, TokenAuth  # noqa:E402,F401
+import importlib
 
 __appname__ = "grafana-client"
 
-try:
-    __version__ = version(__appname__)
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
+# Public names are imported on first access, in order to keep the startup time
+# of short-lived programs low, also when they only use a few of them.
+EXPORTS = {
+    "AsyncGrafanaApi": ".api",
+    "GrafanaApi": ".api",
+    "BulkResult": ".bulk",
+    "ResponseCache": ".cache",
+    "Capabilities": ".capabilities",
+    "CircuitBreaker": ".circuitbreaker",
+    "ConnectionSettings": ".client",
+    "HeaderAuth": ".client",
+    "TokenAuth": ".client",
+    "JsonCodec": ".codec",
+    "RequestCompression": ".compression",
+    "DashboardExport": ".export",
+    "ExportResult": ".export",
+    "AsyncGrafanaFleet": ".fleet",
+    "FleetResult": ".fleet",
+    "GrafanaFleet": ".fleet",
+    "HistorySyncResult": ".history",
+    "VersionHistory": ".history",
+    "RequestHooks": ".hooks",
+    "ImportPlan": ".importer",
+    "ImportResult": ".importer",
+    "RequestInfo": ".hooks",
+    "MetricsRegistry": ".metrics",
+    "RateLimiter": ".ratelimit",
+    "TokenBucket": ".ratelimit",
+    "RetryPolicy": ".retry",
+    "SearchIndex": ".searchindex",
+}
+
+__all__ = tuple(EXPORTS)
+
+
+def __getattr__(name: str):
+    if name == "__version__":
+        value = _version()
+    elif name in EXPORTS:
+        value = getattr(importlib.import_module(EXPORTS[name], __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | {"__version__"})
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ModuleNotFoundError:  # pragma:nocover
+        from importlib_metadata import PackageNotFoundError, version
+
+    try:
+        return version(__appname__)
+    except PackageNotFoundError:  # pragma: no cover
+        return "unknown"
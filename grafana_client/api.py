@@ -1,66 +1,111 @@
+import copy
+import importlib
 import logging
 import os
 import warnings
-from typing import Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from urllib.parse import parse_qs, urlparse
 
 import niquests
 import niquests.auth
-from urllib3.exceptions import InsecureRequestWarning
-
-from .client import DEFAULT_TIMEOUT, AsyncGrafanaClient, GrafanaClient
-from .elements import (
-    Admin,
-    Alerting,
-    AlertingProvisioning,
-    Annotations,
-    Dashboard,
-    DashboardVersions,
-    Datasource,
-    Folder,
-    Health,
-    LibraryElement,
-    Notifications,
-    Organization,
-    Organizations,
-    Plugin,
-    Rbac,
-    Search,
-    ServiceAccount,
-    Snapshots,
-    Teams,
-    User,
-    Users,
-)
-from .elements._async import (
-    AsyncAdmin,
-    AsyncAlerting,
-    AsyncAlertingProvisioning,
-    AsyncAnnotations,
-    AsyncDashboard,
-    AsyncDashboardVersions,
-    AsyncDatasource,
-    AsyncFolder,
-    AsyncHealth,
-    AsyncLibraryElement,
-    AsyncNotifications,
-    AsyncOrganization,
-    AsyncOrganizations,
-    AsyncPlugin,
-    AsyncRbac,
-    AsyncSearch,
-    AsyncServiceAccount,
-    AsyncSnapshots,
-    AsyncTeams,
-    AsyncUser,
-    AsyncUsers,
-)
+
+from .client import DEFAULT_TIMEOUT, AsyncGrafanaClient, ConnectionSettings, GrafanaClient
 from .util import as_bool
 
+if TYPE_CHECKING:  # pragma: no cover
+    # Optional components are imported when used, in order to keep importing the API cheap.
+    from .bulk import BulkResult, ProgressCallback
+    from .cache import ResponseCache
+    from .circuitbreaker import CircuitBreaker
+    from .codec import JsonCodec
+    from .compression import RequestCompression
+    from .hooks import RequestHooks
+    from .metrics import MetricsRegistry
+    from .ratelimit import RateLimiter
+    from .retry import RetryPolicy
+
 logger = logging.getLogger(__name__)
 
+# Same as `bulk.DEFAULT_CONCURRENCY`, which is only imported when running bulk operations.
+DEFAULT_CONCURRENCY = 8
+
+
+def __getattr__(name: str):
+    # Element classes have been importable from this module, keep them available.
+    from . import elements
+    from .elements import _async
+
+    for package in (elements, _async):
+        if name in package.ELEMENTS:
+            return getattr(package, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazyElement:
+    """
+    Descriptor constructing an API element on first access, importing its module
+    from the `elements` package of the API class, either the synchronous one, or
+    the asynchronous one. The element is then cached on the instance.
+    """
+
+    def __init__(self, module: str, name: str, with_api: bool = False):
+        self.module = module
+        self.name = name
+        self.with_api = with_api
+        self.attribute = None
+
+    def __set_name__(self, owner, attribute: str):
+        self.attribute = attribute
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        module = importlib.import_module(f"{instance.ELEMENTS_PACKAGE}.{self.module}")
+        element_class = getattr(module, self.name)
+        element = element_class(instance.client, instance) if self.with_api else element_class(instance.client)
+        instance.__dict__[self.attribute] = element
+        return element
+
 
 class GrafanaApi:
+    ELEMENTS_PACKAGE = "grafana_client.elements"
+
+    admin = LazyElement("admin", "Admin")
+    alerting = LazyElement("alerting", "Alerting")
+    alertingprovisioning = LazyElement("alertingprovisioning", "AlertingProvisioning")
+    dashboard = LazyElement("dashboard", "Dashboard", with_api=True)
+    dashboard_versions = LazyElement("dashboard_versions", "DashboardVersions")
+    datasource = LazyElement("datasource", "Datasource", with_api=True)
+    folder = LazyElement("folder", "Folder")
+    health = LazyElement("health", "Health")
+    organization = LazyElement("organization", "Organization")
+    organizations = LazyElement("organization", "Organizations", with_api=True)
+    search = LazyElement("search", "Search")
+    user = LazyElement("user", "User")
+    users = LazyElement("user", "Users")
+    rbac = LazyElement("rbac", "Rbac")
+    teams = LazyElement("team", "Teams", with_api=True)
+    annotations = LazyElement("annotations", "Annotations")
+    snapshots = LazyElement("snapshots", "Snapshots")
+    notifications = LazyElement("notifications", "Notifications")
+    plugin = LazyElement("plugin", "Plugin")
+    serviceaccount = LazyElement("service_account", "ServiceAccount")
+    libraryelement = LazyElement("libraryelement", "LibraryElement", with_api=True)
+
     def __init__(
         self,
         auth=None,
@@ -72,6 +117,17 @@ class GrafanaApi:
         timeout=DEFAULT_TIMEOUT,
         user_agent: str = None,
         organization_id: int = None,
+        retry: Union["RetryPolicy", int] = None,
+        connection: ConnectionSettings = None,
+        cache: "ResponseCache" = None,
+        coalesce: bool = False,
+        rate_limiter: "RateLimiter" = None,
+        circuit_breaker: "CircuitBreaker" = None,
+        json_codec: Union[str, "JsonCodec"] = None,
+        compression: "RequestCompression" = None,
+        hooks: "RequestHooks" = None,
+        metrics: "MetricsRegistry" = None,
+        grafana_version: str = None,
     ):
         self.client = GrafanaClient(
             auth,
@@ -83,34 +139,127 @@ class GrafanaApi:
             timeout=timeout,
             user_agent=user_agent,
             organization_id=organization_id,
+            retry=retry,
+            connection=connection,
+            cache=cache,
+            coalesce=coalesce,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            json_codec=json_codec,
+            compression=compression,
+            hooks=hooks,
+            metrics=metrics,
         )
         self.url = None
-        self.admin = Admin(self.client)
-        self.alerting = Alerting(self.client)
-        self.alertingprovisioning = AlertingProvisioning(self.client)
-        self.dashboard = Dashboard(self.client, self)
-        self.dashboard_versions = DashboardVersions(self.client)
-        self.datasource = Datasource(self.client, self)
-        self.folder = Folder(self.client)
-        self.health = Health(self.client)
-        self.organization = Organization(self.client)
-        self.organizations = Organizations(self.client, self)
-        self.search = Search(self.client)
-        self.user = User(self.client)
-        self.users = Users(self.client)
-        self.rbac = Rbac(self.client)
-        self.teams = Teams(self.client, self)
-        self.annotations = Annotations(self.client)
-        self.snapshots = Snapshots(self.client)
-        self.notifications = Notifications(self.client)
-        self.plugin = Plugin(self.client)
-        self.serviceaccount = ServiceAccount(self.client)
-        self.libraryelement = LibraryElement(self.client, self)
+        self.grafana_version = grafana_version
         self._grafana_info = None
+        self._capabilities = None
+
+    def _warm_connections(self) -> int:
+        return self.client.connection.warm_connections if self.client.connection is not None else 0
+
+    def _warmed(self, info):
+        if info is not None and not self.grafana_version:
+            self._grafana_info = info
+            self._capabilities = None
+
+    def open(self, connections: int = None, prefetch: bool = False):
+        """
+        Open up to `connections` pooled connections, defaulting to
+        `ConnectionSettings.warm_connections`, and inquire the capabilities of
+        the Grafana server, when `prefetch` is true. Warming connections records
+        the response of the `/health` endpoint, so capabilities are available
+        without another request.
+        """
+        if connections is None:
+            connections = self._warm_connections()
+        if connections > 0:
+            self._warmed(self.client.warm(connections))
+        if prefetch:
+            _ = self.capabilities
+        return self
+
+    def close(self, timeout: float = None) -> bool:
+        """
+        Wait for in-flight requests to complete, up to `timeout` seconds, defaulting
+        to `ConnectionSettings.drain_timeout`, and close the connection pool.
+        Returns whether all requests completed.
+        """
+        return self.client.close(timeout)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def bulk(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+        progress: Optional["ProgressCallback"] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator["BulkResult"]:
+        """
+        Call `fn`, typically an element method like `dashboard.get_dashboard`,
+        for each item concurrently on a thread pool, with at most `concurrency`
+        calls at a time, and yield a `BulkResult` per item, capturing its value or
+        its exception. Results are yielded in the order of the items, or in the
+        order of completion, when `ordered` is false. The `progress` callback
+        receives the number of completed items, and the total, if known.
+
+        Calls taking longer than `timeout` seconds fail with `TimeoutError`. They
+        are abandoned, and complete in the background, bounded by the request
+        timeout of the client.
+
+        For concurrency above 10, increase `ConnectionSettings.pool_maxsize`
+        accordingly, in order to reuse connections.
+        """
+        from .bulk import run_bulk
+
+        return run_bulk(fn, items, concurrency=concurrency, ordered=ordered, progress=progress, timeout=timeout)
+
+    def for_org(self, organization_id: int):
+        """
+        Return a view of this API, scoped to the organization `organization_id`,
+        sending the `X-Grafana-Org-Id` header with each request, and sharing the
+        connection pool, see `GrafanaClient.for_org()`.
+
+        >>> grafana.for_org(5).dashboard.get_dashboard(uid)
+        """
+        view = copy.copy(self)
+        # Elements are bound to the client they have been constructed with.
+        for name in list(vars(view)):
+            if isinstance(getattr(type(view), name, None), LazyElement):
+                del view.__dict__[name]
+        view.client = self.client.for_org(organization_id)
+        return view
+
+    def for_each_org(
+        self,
+        operation: Callable[["GrafanaApi"], Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: Optional[float] = None,
+        progress: Optional["ProgressCallback"] = None,
+    ):
+        """
+        Invoke `operation` with a view on each organization, as listed by
+        `organizations.list_organization()`, on at most `concurrency`
+        organizations at a time, and return a `FleetResult`, keyed by
+        organization id. Listing organizations requires a server admin.
+        """
+        from .fleet import GrafanaFleet
+
+        organizations = self.organizations.list_organization()
+        fleet = GrafanaFleet({organization["id"]: self.for_org(organization["id"]) for organization in organizations})
+        return fleet.run(operation, concurrency=concurrency, timeout=timeout, progress=progress)
 
     def connect(self):
         try:
             self._grafana_info = self.health.check()
+            self._capabilities = None
         except niquests.exceptions.ConnectionError as ex:
             logger.critical(f"Unable to connect to Grafana at {self.url or self.client.url_host}: {ex}")
             raise
@@ -119,24 +268,51 @@ class GrafanaApi:
 
     @property
     def version(self):
+        if self.grafana_version:
+            return self.grafana_version
         if not self._grafana_info:
             self._grafana_info = self.health.check()
         version = self._grafana_info.get("version", None)
         logger.info(f"Inquired Grafana version: {version}")
         return version
 
+    @property
+    def capabilities(self):
+        """
+        Version and feature flags of the Grafana server, computed once, either
+        from the pinned version, or from the response of the `/health` endpoint.
+        """
+        from .capabilities import Capabilities
+
+        if self._capabilities is None:
+            if self.grafana_version:
+                self._capabilities = Capabilities.from_version(self.grafana_version, pinned=True)
+            else:
+                if not self._grafana_info:
+                    self._grafana_info = self.health.check()
+                self._capabilities = Capabilities.from_health(self._grafana_info)
+        return self._capabilities
+
     @classmethod
     def from_url(
         cls,
         url: str = None,
         credential: Union[str, Tuple[str, str], niquests.auth.AuthBase] = None,
         timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        retry: Union["RetryPolicy", int] = None,
+        connection: ConnectionSettings = None,
+        **kwargs,
     ):
         """
         Factory method to create a `GrafanaApi` instance from a URL.
 
         Accepts an optional credential, which is either an authentication
         token, or a tuple of (username, password).
+
+        Accepts an optional retry policy, either a `RetryPolicy` instance,
+        or the maximum number of retries, and optional connection pool and
+        HTTP protocol settings. Additional keyword arguments, like `cache`,
+        are passed to the constructor.
         """
 
         # Sanity checks and defaults.
@@ -156,6 +332,8 @@ class GrafanaApi:
         # Optionally turn off SSL verification.
         verify = as_bool(parse_qs(url.query).get("verify", [True])[0])
         if verify is False:
+            from urllib3.exceptions import InsecureRequestWarning
+
             warnings.filterwarnings("ignore", category=InsecureRequestWarning)
 
         grafana = cls(
@@ -166,15 +344,40 @@ class GrafanaApi:
             url_path_prefix=url.path.lstrip("/"),
             verify=verify,
             timeout=timeout,
+            retry=retry,
+            connection=connection,
+            **kwargs,
         )
         grafana.url = original_url
 
         return grafana
 
     @classmethod
-    def from_env(cls, timeout: Union[float, Tuple[float, float]] = None):
+    def from_env(
+        cls,
+        timeout: Union[float, Tuple[float, float]] = None,
+        retry: Union["RetryPolicy", int] = None,
+        connection: ConnectionSettings = None,
+        **kwargs,
+    ):
         """
         Factory method to create a `GrafanaApi` instance from environment variables.
+
+        Additional keyword arguments are passed to the constructor.
+        """
+        options = cls.options_from_env(timeout=timeout, retry=retry, connection=connection, **kwargs)
+        return cls.from_url(url=os.environ.get("GRAFANA_URL"), credential=os.environ.get("GRAFANA_TOKEN"), **options)
+
+    @staticmethod
+    def options_from_env(
+        timeout: Union[float, Tuple[float, float]] = None,
+        retry: Union["RetryPolicy", int] = None,
+        connection: ConnectionSettings = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Read the options of `from_url()` from environment variables, except for
+        the URL and the credential. Arguments take precedence.
         """
         if timeout is None:
             if "GRAFANA_TIMEOUT" in os.environ:
@@ -186,12 +389,25 @@ class GrafanaApi:
                     )
         if timeout is None:
             timeout = DEFAULT_TIMEOUT
-        return cls.from_url(
-            url=os.environ.get("GRAFANA_URL"), credential=os.environ.get("GRAFANA_TOKEN"), timeout=timeout
-        )
+        if retry is None and "GRAFANA_RETRIES" in os.environ:
+            try:
+                retry = int(os.environ["GRAFANA_RETRIES"])
+            except Exception as ex:
+                raise ValueError(
+                    f"Unable to parse invalid `int` value from `GRAFANA_RETRIES` environment variable: {ex}"
+                )
+        if connection is None:
+            connection = ConnectionSettings.from_env()
+        if "json_codec" not in kwargs and os.environ.get("GRAFANA_JSON_CODEC"):
+            kwargs["json_codec"] = os.environ["GRAFANA_JSON_CODEC"]
+        if "grafana_version" not in kwargs and os.environ.get("GRAFANA_VERSION"):
+            kwargs["grafana_version"] = os.environ["GRAFANA_VERSION"]
+        return dict(timeout=timeout, retry=retry, connection=connection, **kwargs)
 
 
 class AsyncGrafanaApi(GrafanaApi):
+    ELEMENTS_PACKAGE = "grafana_client.elements._async"
+
     def __init__(
         self,
         auth=None,
@@ -203,6 +419,17 @@ class AsyncGrafanaApi(GrafanaApi):
         timeout=DEFAULT_TIMEOUT,
         user_agent: str = None,
         organization_id: int = None,
+        retry: Union["RetryPolicy", int] = None,
+        connection: ConnectionSettings = None,
+        cache: "ResponseCache" = None,
+        coalesce: bool = False,
+        rate_limiter: "RateLimiter" = None,
+        circuit_breaker: "CircuitBreaker" = None,
+        json_codec: Union[str, "JsonCodec"] = None,
+        compression: "RequestCompression" = None,
+        hooks: "RequestHooks" = None,
+        metrics: "MetricsRegistry" = None,
+        grafana_version: str = None,
     ):
         self.client = AsyncGrafanaClient(
             auth,
@@ -214,35 +441,144 @@ class AsyncGrafanaApi(GrafanaApi):
             timeout=timeout,
             user_agent=user_agent,
             organization_id=organization_id,
+            retry=retry,
+            connection=connection,
+            cache=cache,
+            coalesce=coalesce,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            json_codec=json_codec,
+            compression=compression,
+            hooks=hooks,
+            metrics=metrics,
         )
         self.url = None
-        self.admin = AsyncAdmin(self.client)
-        self.alerting = AsyncAlerting(self.client)
-        self.alertingprovisioning = AsyncAlertingProvisioning(self.client)
-        self.dashboard = AsyncDashboard(self.client, self)
-        self.dashboard_versions = AsyncDashboardVersions(self.client)
-        self.datasource = AsyncDatasource(self.client, self)
-        self.folder = AsyncFolder(self.client)
-        self.health = AsyncHealth(self.client)
-        self.organization = AsyncOrganization(self.client)
-        self.organizations = AsyncOrganizations(self.client, self)
-        self.search = AsyncSearch(self.client)
-        self.user = AsyncUser(self.client)
-        self.users = AsyncUsers(self.client)
-        self.rbac = AsyncRbac(self.client)
-        self.teams = AsyncTeams(self.client, self)
-        self.annotations = AsyncAnnotations(self.client)
-        self.snapshots = AsyncSnapshots(self.client)
-        self.notifications = AsyncNotifications(self.client)
-        self.plugin = AsyncPlugin(self.client)
-        self.serviceaccount = AsyncServiceAccount(self.client)
-        self.libraryelement = AsyncLibraryElement(self.client, self)
-
+        self.grafana_version = grafana_version
         self._grafana_info = None
+        self._capabilities = None
+
+    async def open(self, connections: int = None, prefetch: bool = False):
+        """
+        Open up to `connections` pooled connections, defaulting to
+        `ConnectionSettings.warm_connections`, and inquire the capabilities of
+        the Grafana server, when `prefetch` is true. Warming connections records
+        the response of the `/health` endpoint, so capabilities are available
+        without another request.
+        """
+        if connections is None:
+            connections = self._warm_connections()
+        if connections > 0:
+            self._warmed(await self.client.warm(connections))
+        if prefetch:
+            await self.capabilities
+        return self
+
+    async def close(self, timeout: float = None) -> bool:
+        """
+        Wait for in-flight requests to complete, up to `timeout` seconds, defaulting
+        to `ConnectionSettings.drain_timeout`, and close the connection pool.
+        Returns whether all requests completed.
+        """
+        return await self.client.close(timeout)
+
+    def bulk(
+        self,
+        fn: Callable[[Any], Awaitable[Any]],
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = True,
+        progress: Optional["ProgressCallback"] = None,
+        timeout: Optional[float] = None,
+        fatal: Tuple[Type[BaseException], ...] = (),
+    ) -> AsyncIterator["BulkResult"]:
+        """
+        Await `fn`, typically an element method like `dashboard.get_dashboard`,
+        for each item, with at most `concurrency` calls at a time, and yield a
+        `BulkResult` per item, capturing its value or its exception. Items may
+        also be an asynchronous iterable, like a streamed response.
+
+        Calls taking longer than `timeout` seconds fail with `asyncio.TimeoutError`.
+        Exceptions of the `fatal` types cancel all remaining calls, and are raised.
+        """
+        from .bulk import arun_bulk
+
+        return arun_bulk(
+            fn,
+            items,
+            concurrency=concurrency,
+            ordered=ordered,
+            progress=progress,
+            timeout=timeout,
+            fatal=fatal,
+        )
+
+    def map(
+        self,
+        fn: Callable[[Any], Awaitable[Any]],
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: Optional[float] = None,
+        fatal: Tuple[Type[BaseException], ...] = (),
+    ) -> AsyncIterator["BulkResult"]:
+        """
+        Like `bulk()`, yielding results in the order of the items. While waiting
+        for a slow call, at most `concurrency` later results are held back.
+
+        >>> async for result in grafana.map(grafana.dashboard.get_dashboard, uids, concurrency=16):
+        ...     print(result.value)
+        """
+        return self.bulk(fn, items, concurrency=concurrency, ordered=True, timeout=timeout, fatal=fatal)
+
+    def as_completed(
+        self,
+        fn: Callable[[Any], Awaitable[Any]],
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: Optional[float] = None,
+        fatal: Tuple[Type[BaseException], ...] = (),
+    ) -> AsyncIterator["BulkResult"]:
+        """
+        Like `bulk()`, yielding results in the order of completion.
+        """
+        return self.bulk(fn, items, concurrency=concurrency, ordered=False, timeout=timeout, fatal=fatal)
+
+    async def for_each_org(
+        self,
+        operation: Callable[["AsyncGrafanaApi"], Awaitable[Any]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: Optional[float] = None,
+        progress: Optional["ProgressCallback"] = None,
+    ):
+        """
+        Await `operation` with a view on each organization, as listed by
+        `organizations.list_organization()`, on at most `concurrency`
+        organizations at a time, and return a `FleetResult`, keyed by
+        organization id. Listing organizations requires a server admin.
+        """
+        from .fleet import AsyncGrafanaFleet
+
+        organizations = await self.organizations.list_organization()
+        fleet = AsyncGrafanaFleet(
+            {organization["id"]: self.for_org(organization["id"]) for organization in organizations}
+        )
+        return await fleet.run(operation, concurrency=concurrency, timeout=timeout, progress=progress)
+
+    def __enter__(self):
+        raise TypeError("Use `async with` for `AsyncGrafanaApi`")
+
+    def __exit__(self, exc_type, exc_value, traceback):  # pragma: no cover
+        pass
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
 
     async def connect(self):
         try:
             self._grafana_info = await self.health.check()
+            self._capabilities = None
         except niquests.exceptions.ConnectionError as ex:  # pragma: no cover
             logger.critical(f"Unable to connect to Grafana at {self.url or self.client.url_host}: {ex}")
             raise
@@ -251,8 +587,27 @@ class AsyncGrafanaApi(GrafanaApi):
 
     @property
     async def version(self):
+        if self.grafana_version:
+            return self.grafana_version
         if not self._grafana_info:
             self._grafana_info = await self.health.check()
         version = self._grafana_info["version"]
         logger.info(f"Inquired Grafana version: {version}")
         return version
+
+    @property
+    async def capabilities(self):
+        """
+        Version and feature flags of the Grafana server, computed once, either
+        from the pinned version, or from the response of the `/health` endpoint.
+        """
+        from .capabilities import Capabilities
+
+        if self._capabilities is None:
+            if self.grafana_version:
+                self._capabilities = Capabilities.from_version(self.grafana_version, pinned=True)
+            else:
+                if not self._grafana_info:
+                    self._grafana_info = await self.health.check()
+                self._capabilities = Capabilities.from_health(self._grafana_info)
+        return self._capabilities
@@ -0,0 +1,299 @@
+"""
+About
+=====
+Bounded-concurrency bulk execution for `GrafanaApi` and `AsyncGrafanaApi`.
+
+Runs many calls of an element method, like `grafana.dashboard.get_dashboard`,
+concurrently, either on a thread pool for the synchronous API, without rewriting
+the code against `AsyncGrafanaApi`, or as tasks on the event loop for the
+asynchronous API. At most `concurrency` calls are pending at any time, also
+when the items are produced by a generator, so memory use does not grow with
+the number of items. When yielding results in the order of the items, a slow
+call does not hold up the following calls, but their results are held back
+until it completes. At most `concurrency` results are held back, after which
+no further calls are started until the slow call completes.
+
+Exceptions raised by single calls are captured into their `BulkResult`, and do
+not stop the other calls, unless they are fatal.
+"""
+
+import asyncio
+import collections
+import dataclasses
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+DEFAULT_CONCURRENCY = 8
+
+# Marks the end of the items.
+_EXHAUSTED = object()
+
+# Invoked with the number of completed items, and the total number of items, if known.
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+@dataclasses.dataclass
+class BulkResult:
+    """
+    Outcome of a single call.
+
+    :param index: Position of the item within the input.
+    :param item: The item the function has been called with.
+    :param value: The return value of the call.
+    :param error: The exception raised by the call, if any.
+    """
+
+    index: int
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """
+        Return the value of the call, or raise its exception.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def _call(fn: Callable[[Any], Any], index: int, item: Any) -> BulkResult:
+    try:
+        return BulkResult(index=index, item=item, value=fn(item))
+    except Exception as ex:
+        return BulkResult(index=index, item=item, error=ex)
+
+
+def run_bulk(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[BulkResult]:
+    """
+    Call `fn` for each item on a thread pool, and yield a `BulkResult` per item,
+    either in the order of the items, or in the order of completion.
+
+    Threads can not be interrupted, so calls exceeding the `timeout` are abandoned,
+    and complete in the background, bounded by the request timeout of the client.
+    They keep occupying their worker, and count against the `concurrency`, until then.
+
+    :param fn: Function to call with each item.
+    :param items: Items, a sequence or any other iterable.
+    :param concurrency: Maximum number of concurrent calls.
+    :param ordered: Yield results in the order of the items, instead of the order of completion.
+    :param progress: Callback invoked after each completed item.
+    :param timeout: Seconds after which a single call is abandoned, and fails with `TimeoutError`.
+    """
+    if concurrency < 1:
+        raise ValueError("Argument `concurrency` must be at least 1")
+    return _run_bulk(fn, items, concurrency, ordered, progress, timeout)
+
+
+def _run_bulk(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int,
+    ordered: bool,
+    progress: Optional[ProgressCallback],
+    timeout: Optional[float],
+) -> Iterator[BulkResult]:
+    total = len(items) if hasattr(items, "__len__") else None
+    source = enumerate(items)
+    exhausted = False
+    done = 0
+
+    def report():
+        nonlocal done
+        done += 1
+        if progress is not None:
+            progress(done, total)
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="grafana-bulk")
+    pending: Deque[Future] = collections.deque()
+    # Completed results, waiting for earlier items, when yielding in the order of the items.
+    buffered: Dict[int, BulkResult] = {}
+    position = 0
+    # Index, item, and deadline of each pending call.
+    calls: Dict[Future, Tuple[int, Any, Optional[float]]] = {}
+    # Timed out calls, still occupying their worker.
+    abandoned: Set[Future] = set()
+    try:
+        while True:
+            abandoned = {future for future in abandoned if not future.done()}
+            while not exhausted and len(pending) + len(abandoned) < concurrency and len(buffered) < concurrency:
+                entry = next(source, _EXHAUSTED)
+                if entry is _EXHAUSTED:
+                    exhausted = True
+                    break
+                index, item = entry
+                future = executor.submit(_call, fn, index, item)
+                pending.append(future)
+                calls[future] = (index, item, None if timeout is None else time.monotonic() + timeout)
+            if not pending:
+                if exhausted:
+                    break
+                # All workers are occupied by abandoned calls.
+                wait(abandoned, return_when=FIRST_COMPLETED)
+                continue
+            waiting = list(pending)
+            wait_timeout = None
+            if timeout is not None:
+                wait_timeout = max(0.0, min(calls[future][2] for future in waiting) - time.monotonic())
+            wait(waiting, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            completed = []
+            for future in waiting:
+                index, item, deadline = calls[future]
+                if future.done():
+                    result = future.result()
+                elif deadline is not None and now >= deadline:
+                    abandoned.add(future)
+                    error = TimeoutError(f"Call did not complete within {timeout} seconds")
+                    result = BulkResult(index=index, item=item, error=error)
+                else:
+                    continue
+                pending.remove(future)
+                del calls[future]
+                completed.append(result)
+            if ordered:
+                buffered.update((result.index, result) for result in completed)
+                completed = []
+                while position in buffered:
+                    completed.append(buffered.pop(position))
+                    position += 1
+            for result in completed:
+                report()
+                yield result
+    finally:
+        # When the consumer stops early, do not start the calls which are still queued.
+        for future in pending:
+            future.cancel()
+        # Do not wait for abandoned calls.
+        executor.shutdown(wait=not any(not future.done() for future in abandoned))
+
+
+async def _acall(fn: Callable[[Any], Awaitable[Any]], index: int, item: Any, timeout: Optional[float]) -> BulkResult:
+    try:
+        if timeout is None:
+            value = await fn(item)
+        else:
+            value = await asyncio.wait_for(fn(item), timeout)
+        return BulkResult(index=index, item=item, value=value)
+    except Exception as ex:
+        return BulkResult(index=index, item=item, error=ex)
+
+
+def arun_bulk(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Union[Iterable[Any], AsyncIterable[Any]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    timeout: Optional[float] = None,
+    fatal: Tuple[Type[BaseException], ...] = (),
+) -> AsyncIterator[BulkResult]:
+    """
+    Await `fn` for each item as tasks on the event loop, and yield a `BulkResult`
+    per item, either in the order of the items, or in the order of completion.
+
+    :param fn: Coroutine function to call with each item.
+    :param items: Items, an iterable, or an asynchronous iterable.
+    :param concurrency: Maximum number of concurrent calls.
+    :param ordered: Yield results in the order of the items, instead of the order of completion.
+    :param progress: Callback invoked after each completed item.
+    :param timeout: Seconds after which a single call is cancelled, and fails with `asyncio.TimeoutError`.
+    :param fatal: Exception types which cancel all remaining calls, and are raised.
+    """
+    if concurrency < 1:
+        raise ValueError("Argument `concurrency` must be at least 1")
+    return _arun_bulk(fn, items, concurrency, ordered, progress, timeout, fatal)
+
+
+async def _arun_bulk(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Union[Iterable[Any], AsyncIterable[Any]],
+    concurrency: int,
+    ordered: bool,
+    progress: Optional[ProgressCallback],
+    timeout: Optional[float],
+    fatal: Tuple[Type[BaseException], ...],
+) -> AsyncIterator[BulkResult]:
+    total = len(items) if hasattr(items, "__len__") else None
+    if hasattr(items, "__aiter__"):
+        iterator = items.__aiter__()
+    else:
+        iterator = iter(items)
+    index = 0
+    exhausted = False
+    done = 0
+
+    async def next_item():
+        try:
+            if hasattr(iterator, "__anext__"):
+                return await iterator.__anext__()
+            return next(iterator)
+        except (StopIteration, StopAsyncIteration):
+            return _EXHAUSTED
+
+    pending: Deque[asyncio.Future] = collections.deque()
+    # Completed results, waiting for earlier items, when yielding in the order of the items.
+    buffered: Dict[int, BulkResult] = {}
+    position = 0
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency and len(buffered) < concurrency:
+                item = await next_item()
+                if item is _EXHAUSTED:
+                    exhausted = True
+                    break
+                pending.append(asyncio.ensure_future(_acall(fn, index, item, timeout)))
+                index += 1
+            if not pending:
+                break
+            finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                pending.remove(task)
+            completed = sorted((task.result() for task in finished), key=lambda result: result.index)
+            for result in completed:
+                if fatal and isinstance(result.error, fatal):
+                    raise result.error
+            if ordered:
+                buffered.update((result.index, result) for result in completed)
+                completed = []
+                while position in buffered:
+                    completed.append(buffered.pop(position))
+                    position += 1
+            for result in completed:
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+                yield result
+    finally:
+        # Cancel the remaining calls on fatal errors, or when the consumer stops early.
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
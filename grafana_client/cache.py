@@ -0,0 +1,238 @@
+"""
+About
+=====
+In-memory response cache for the request runners of `GrafanaClient` and
+`AsyncGrafanaClient`.
+
+Successful `GET` responses are kept in a bounded LRU, with time-to-live values
+configurable per path prefix. Stale entries carrying an `ETag` or `Last-Modified`
+header are revalidated using conditional requests. Writes to a resource
+invalidate all cached entries under that resource, as well as listings of its
+parent collections.
+
+Entries are keyed by the origin of the API, that is its scheme, host, port, and
+path prefix, and by a fingerprint of the credentials and organization used, so
+a single cache can be shared between clients of different Grafana instances, or
+different users, without serving the responses of one to another.
+"""
+
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .util import request_key
+
+# Saving a dashboard using `POST /dashboards/db` or `/dashboards/import` does not
+# address the dashboard by its UID, so writes to dashboards invalidate all of them.
+DEFAULT_DEPENDENCIES = {
+    "/dashboards": ["/search", "/dashboards/uid", "/dashboards/id"],
+    "/folders": ["/search"],
+}
+
+
+@dataclasses.dataclass
+class CacheEntry:
+    path: str
+    response: Any
+    expires: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    origin: Optional[str] = None
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Return headers for revalidating the entry using a conditional request.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclasses.dataclass
+class CacheLookup:
+    """
+    The outcome of looking up a request in the cache.
+
+    `headers` are the request headers, amended by conditional request
+    headers when a stale entry can be revalidated.
+    """
+
+    key: Optional[str] = None
+    path: Optional[str] = None
+    origin: Optional[str] = None
+    entry: Optional[CacheEntry] = None
+    fresh: bool = False
+    headers: Optional[Dict[str, str]] = None
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache for decoded-on-demand HTTP responses.
+
+    :param ttl: Default time-to-live in seconds.
+    :param maxsize: Maximum number of entries.
+    :param ttls: Time-to-live values per path prefix, like `{"/health": 300, "/search": 10}`.
+                 The longest matching prefix wins. A value of zero disables caching.
+    :param dependencies: Additional path prefixes to invalidate on writes below a
+                         path prefix. By default, writes to dashboards and folders
+                         also invalidate `/search` results.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        maxsize: int = 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        dependencies: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.ttls = ttls or {}
+        self.dependencies = DEFAULT_DEPENDENCIES if dependencies is None else dependencies
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(url: str, params=None, data=None, headers=None, origin=None, identity=None) -> str:
+        return request_key(origin, identity, url, params, data, headers)
+
+    def prepare(
+        self, url: str, params=None, data=None, headers=None, origin: str = None, identity: str = None
+    ) -> CacheLookup:
+        """
+        Look up a `GET` request, and prepare conditional request headers if needed.
+
+        :param origin: Base URL of the API, the request URL is relative to.
+        :param identity: Fingerprint of the credentials and organization of the request.
+        """
+        key = self.make_key(url, params, data, headers, origin, identity)
+        path = url.split("?", 1)[0]
+        entry, fresh = self.lookup(key)
+        if entry is not None and not fresh:
+            headers = {**(headers or {}), **entry.validators()}
+        return CacheLookup(key=key, path=path, origin=origin, entry=entry, fresh=fresh, headers=headers)
+
+    def ttl_for(self, path: str) -> float:
+        ttl = self.ttl
+        matched = -1
+        for prefix, value in self.ttls.items():
+            if path.startswith(prefix) and len(prefix) > matched:
+                ttl = value
+                matched = len(prefix)
+        return ttl
+
+    def lookup(self, key: str) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Return the entry for the given key, and whether it is still fresh.
+        Stale entries are kept as long as they can be revalidated.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if entry.expires > time.monotonic():
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+            if not entry.etag and not entry.last_modified:
+                del self._entries[key]
+                return None, False
+            return entry, False
+
+    def store(self, key: str, path: str, response, origin: str = None) -> None:
+        ttl = self.ttl_for(path)
+        if ttl <= 0:
+            return
+        entry = CacheEntry(
+            path=path,
+            response=response,
+            expires=time.monotonic() + ttl,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            origin=origin,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, key: str, entry: CacheEntry) -> None:
+        """
+        Mark a stale entry as fresh again, after the server responded with `304 Not Modified`.
+        """
+        entry.expires = time.monotonic() + self.ttl_for(entry.path)
+        with self._lock:
+            self.revalidations += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+    def invalidate(self, path: str, origin: str = None) -> int:
+        """
+        Drop all entries under the given resource path, the listings of its
+        parent collections, and the entries of dependent path prefixes. When
+        `origin` is given, only entries of that API are dropped, for all users.
+
+        Returns the number of dropped entries.
+        """
+        path = path.split("?", 1)[0].rstrip("/")
+        ancestors = set()
+        parent = path
+        while "/" in parent:
+            parent = parent.rsplit("/", 1)[0]
+            ancestors.add(parent)
+        prefixes = [path]
+        for prefix, dependents in self.dependencies.items():
+            if is_below(path, prefix):
+                prefixes += dependents
+
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if (origin is None or entry.origin == origin)
+                and (entry.path in ancestors or any(is_below(entry.path, prefix) for prefix in prefixes))
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def is_below(path: str, prefix: str) -> bool:
+    """
+    Whether the path equals the prefix, or is nested beneath it.
+    """
+    return path == prefix or path.startswith(prefix.rstrip("/") + "/")
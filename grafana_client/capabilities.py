@@ -0,0 +1,95 @@
+"""
+About
+=====
+Capabilities of a Grafana server, derived from its version, which is either
+inquired once per `GrafanaApi` instance using the `/health` endpoint, or pinned
+using the `grafana_version` argument, or the `GRAFANA_VERSION` environment
+variable, in order to skip the probe.
+
+Feature flags are `None` when the version is unknown.
+"""
+
+import dataclasses
+from typing import Any, Dict, Optional
+
+from verlib2 import Version
+
+VERSION_7 = Version("7")
+VERSION_8 = Version("8")
+VERSION_8_2 = Version("8.2")
+VERSION_9 = Version("9")
+VERSION_10_2_0 = Version("10.2.0")
+VERSION_10_2_2 = Version("10.2.2")
+
+
+@dataclasses.dataclass(frozen=True)
+class Capabilities:
+    """
+    Parsed version and feature flags of a Grafana server.
+
+    :param version_string: The version as reported by the server, or as pinned.
+    :param version: The parsed version.
+    :param commit: The commit reported by the server.
+    :param pinned: Whether the version has been pinned instead of inquired.
+    """
+
+    version_string: Optional[str] = None
+    version: Optional[Version] = None
+    commit: Optional[str] = None
+    pinned: bool = False
+
+    @classmethod
+    def from_version(cls, version: Optional[str], pinned: bool = False) -> "Capabilities":
+        return cls(version_string=version, version=Version(version) if version else None, pinned=pinned)
+
+    @classmethod
+    def from_health(cls, info: Dict[str, Any]) -> "Capabilities":
+        version = info.get("version")
+        return cls(version_string=version, version=Version(version) if version else None, commit=info.get("commit"))
+
+    def _at_least(self, version: Version) -> Optional[bool]:
+        if self.version is None:
+            return None
+        return self.version >= version
+
+    @property
+    def dashboard_by_slug(self) -> Optional[bool]:
+        """
+        Getting dashboards by slug, removed with Grafana 8.
+        """
+        at_least = self._at_least(VERSION_8)
+        return None if at_least is None else not at_least
+
+    @property
+    def library_elements(self) -> Optional[bool]:
+        """
+        The library elements API, available since Grafana 8.2.
+        """
+        return self._at_least(VERSION_8_2)
+
+    @property
+    def native_datasource_health(self) -> Optional[bool]:
+        """
+        The native data source health check endpoint, available since Grafana 9.
+        """
+        return self._at_least(VERSION_9)
+
+    @property
+    def datasource_permissions(self) -> Optional[bool]:
+        """
+        The data source permissions API of Grafana Enterprise, removed with Grafana 10.2.3.
+        """
+        if self.version is None:
+            return None
+        return self.version <= VERSION_10_2_2
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version_string,
+            "commit": self.commit,
+            "pinned": self.pinned,
+            "dashboard_by_slug": self.dashboard_by_slug,
+            "library_elements": self.library_elements,
+            "native_datasource_health": self.native_datasource_health,
+            "datasource_permissions": self.datasource_permissions,
+        }
@@ -0,0 +1,179 @@
+"""
+About
+=====
+Circuit breaker for the request runners of `GrafanaClient` and `AsyncGrafanaClient`.
+
+Circuits are keyed by HTTP verb and route template, like `POST /ds/query`, and
+optionally by data source, like `POST /ds/query [datasource=P8E80F9AEF21F6940]`.
+
+- `closed`: Requests pass. Consecutive failures are counted, and when reaching
+  the threshold, the circuit opens.
+- `open`: Requests fail fast with `GrafanaCircuitOpenError`, until the
+  recovery timeout has elapsed.
+- `half-open`: A limited number of trial requests pass. When they succeed, the
+  circuit closes again, otherwise it reopens.
+"""
+
+import dataclasses
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from .routes import datasource_of, route_template
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+@dataclasses.dataclass
+class Circuit:
+    key: str
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: Optional[float] = None
+    trial_started_at: Optional[float] = None
+    trials: int = 0
+    total_failures: int = 0
+    total_rejected: int = 0
+
+
+class CircuitBreaker:
+    """
+    Fail fast on endpoints and data sources which are known to be unavailable.
+
+    :param failure_threshold: Number of consecutive failures which open a circuit.
+    :param recovery_timeout: Seconds to wait before letting trial requests pass an open circuit.
+    :param half_open_max_calls: Number of concurrent trial requests in `half-open` state.
+    :param per_datasource: Whether to maintain separate circuits per data source.
+    :param failure_statuses: HTTP status codes counting as failures. Timeouts and
+                             connection errors always count as failures.
+    :param on_state_change: Callback `(key, old_state, new_state)`, invoked on state transitions.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        per_datasource: bool = True,
+        failure_statuses: Iterable[int] = range(500, 600),
+        on_state_change: Optional[Callable[[str, str, str], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.per_datasource = per_datasource
+        self.failure_statuses = frozenset(failure_statuses)
+        self.on_state_change = on_state_change
+        self.clock = clock
+        self._circuits: Dict[str, Circuit] = {}
+        self._lock = threading.Lock()
+
+    def key_for(self, verb: str, url: str, json=None) -> str:
+        key = f"{verb.upper()} {route_template(url)}"
+        if self.per_datasource:
+            datasource = datasource_of(url, json)
+            if datasource is not None:
+                key += f" [datasource={datasource}]"
+        return key
+
+    def before_request(self, key: str) -> None:
+        """
+        Raise `GrafanaCircuitOpenError` when the circuit does not permit the request.
+        """
+        from .client import GrafanaCircuitOpenError
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.state == CLOSED:
+                return
+            now = self.clock()
+            if circuit.state == OPEN:
+                remaining = circuit.opened_at + self.recovery_timeout - now
+                if remaining > 0:
+                    circuit.total_rejected += 1
+                    raise GrafanaCircuitOpenError(key, remaining)
+                self._transition(circuit, HALF_OPEN)
+                circuit.trials = 0
+            # In `half-open` state, admit a limited number of trial requests. When
+            # trials do not report back, admit new ones after the recovery timeout.
+            if circuit.trials >= self.half_open_max_calls:
+                if now - circuit.trial_started_at < self.recovery_timeout:
+                    circuit.total_rejected += 1
+                    raise GrafanaCircuitOpenError(key, circuit.trial_started_at + self.recovery_timeout - now)
+                circuit.trials = 0
+            circuit.trials += 1
+            circuit.trial_started_at = now
+
+    def is_failure(self, error: Optional[BaseException]) -> bool:
+        if error is None:
+            return False
+        status_code = getattr(error, "status_code", None)
+        if not status_code:
+            # Timeouts, connection errors, and other errors without an HTTP response.
+            return True
+        return status_code in self.failure_statuses
+
+    def record(self, key: str, error: Optional[BaseException] = None) -> None:
+        """
+        Report the outcome of a request which has been permitted by `before_request`.
+        """
+        failure = self.is_failure(error)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                if not failure:
+                    return
+                circuit = self._circuits[key] = Circuit(key=key)
+            if not failure:
+                circuit.failures = 0
+                if circuit.state != CLOSED:
+                    self._transition(circuit, CLOSED)
+                return
+            circuit.failures += 1
+            circuit.total_failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.opened_at = self.clock()
+                if circuit.state != OPEN:
+                    self._transition(circuit, OPEN)
+
+    def _transition(self, circuit: Circuit, state: str):
+        old_state = circuit.state
+        circuit.state = state
+        if self.on_state_change is not None:
+            self.on_state_change(circuit.key, old_state, state)
+
+    def state(self, key: str) -> str:
+        """
+        Return the state of a circuit, one of `closed`, `open`, or `half-open`.
+        """
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit.state if circuit is not None else CLOSED
+
+    def states(self) -> Dict[str, Dict]:
+        """
+        Return all known circuits and their details.
+        """
+        now = self.clock()
+        with self._lock:
+            result = {}
+            for key, circuit in self._circuits.items():
+                info = dataclasses.asdict(circuit)
+                del info["key"], info["trial_started_at"], info["trials"]
+                if circuit.state == OPEN:
+                    info["retry_in"] = max(0.0, circuit.opened_at + self.recovery_timeout - now)
+                result[key] = info
+            return result
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """
+        Close a single circuit, or all of them.
+        """
+        with self._lock:
+            if key is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(key, None)
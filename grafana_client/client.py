@@ -1,13 +1,70 @@
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from json import JSONDecodeError
 
 import niquests
 import niquests.auth
 from niquests import HTTPError, Timeout
 
+from .pagination import (
+    DEFAULT_PREFETCH,
+    SEARCH_LIMIT,
+    apaginate,
+    apaginate_partitions,
+    page_params,
+    paginate,
+    paginate_partitions,
+)
+from .stream import CHUNK_SIZE, aiter_items, iter_items
+from .stream import loads as loads_json
+from .util import request_key
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    # Optional components are imported when used, in order to keep importing the client cheap.
+    from .cache import CacheLookup, ResponseCache
+    from .circuitbreaker import CircuitBreaker
+    from .codec import JsonCodec
+    from .compression import RequestCompression
+    from .hooks import Callback, RequestHooks
+    from .metrics import MetricsRegistry
+    from .ratelimit import RateLimiter
+    from .retry import RetryPolicy
+
 DEFAULT_TIMEOUT: float = 5.0
 
+# Seconds to wait for in-flight requests when closing a client.
+DEFAULT_DRAIN_TIMEOUT: float = 10.0
+
+# Seconds between checks for in-flight requests when closing an asynchronous client.
+DRAIN_INTERVAL: float = 0.01
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def compact_json() -> "JsonCodec":
+    """
+    Return the codec for encoding request bodies to be compressed, when no JSON codec has been configured.
+    """
+    from .codec import JsonCodec
+
+    return JsonCodec()
+
 
 class GrafanaException(Exception):
+    # Number of retries performed, and total seconds spent waiting between
+    # attempts, before giving up on the request which raised this exception.
+    retries: int = 0
+    retry_wait: float = 0.0
+
     def __init__(self, status_code, response, message):
         self.status_code = status_code
         self.response = response
@@ -22,6 +79,13 @@ class GrafanaTimeoutError(GrafanaException):
     """
 
 
+class GrafanaConnectionError(GrafanaException, niquests.exceptions.ConnectionError):
+    """
+    Connecting failed, or the connection dropped, before receiving a response.
+    Also a `niquests.exceptions.ConnectionError`, for backwards compatibility.
+    """
+
+
 class GrafanaServerError(GrafanaException):
     """
     5xx
@@ -30,6 +94,20 @@ class GrafanaServerError(GrafanaException):
     pass
 
 
+class GrafanaCircuitOpenError(GrafanaServerError):
+    """
+    The circuit breaker rejected the request without sending it, because
+    the endpoint or data source failed repeatedly before.
+    """
+
+    def __init__(self, key, retry_in):
+        self.key = key
+        self.retry_in = retry_in
+        super(GrafanaCircuitOpenError, self).__init__(
+            0, None, f"Circuit open for `{key}`, failing fast. Retrying in {retry_in:.1f} seconds"
+        )
+
+
 class GrafanaClientError(GrafanaException):
     """
     Invalid input (4xx errors)
@@ -56,6 +134,99 @@ class GrafanaUnauthorizedError(GrafanaClientError):
         super(GrafanaUnauthorizedError, self).__init__(401, response, "Unauthorized")
 
 
+@dataclasses.dataclass
+class ConnectionSettings:
+    """
+    Configure the connection pool and protocol selection of the underlying HTTP session.
+
+    :param pool_connections: Number of per-host connection pools to cache.
+    :param pool_maxsize: Maximum number of connections to keep per host.
+    :param pool_block: Wait for a free connection when the pool is exhausted,
+                       instead of opening additional throwaway connections.
+    :param http_version: Highest HTTP protocol version to use, either "1.1" or "2".
+                         "1.1" disables HTTP/2 and HTTP/3. "2" disables HTTP/3, and
+                         negotiates HTTP/2 using ALPN, falling back to HTTP/1.1 when
+                         the server does not offer it. `None` additionally lets niquests
+                         upgrade to HTTP/3 when the server advertises it using `Alt-Svc`.
+                         HTTP/3 cannot be enforced, because niquests only discovers it
+                         over a prior HTTP/1.1 or HTTP/2 connection.
+    :param multiplexed: Send concurrent requests over a single HTTP/2 or HTTP/3 connection.
+    :param keepalive: Keep connections open between requests.
+    :param warm_connections: Number of pooled connections to open when opening the API,
+                             for example when entering its context manager.
+    :param drain_timeout: Seconds to wait for in-flight requests when closing the API.
+    """
+
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    http_version: t.Optional[str] = None
+    multiplexed: bool = False
+    keepalive: bool = True
+    warm_connections: int = 0
+    drain_timeout: float = DEFAULT_DRAIN_TIMEOUT
+
+    def __post_init__(self):
+        if self.http_version is not None:
+            self.http_version = str(self.http_version)
+            if self.http_version not in ["1.1", "2"]:
+                raise ValueError(f"Invalid HTTP version `{self.http_version}`, use one of 1.1, or 2")
+
+    def session_options(self) -> t.Dict[str, t.Any]:
+        """
+        Return keyword arguments for creating a `niquests.Session` or `niquests.AsyncSession`.
+        """
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "multiplexed": self.multiplexed,
+            "disable_http2": self.http_version == "1.1",
+            "disable_http3": self.http_version in ["1.1", "2"],
+        }
+
+    def adapter_options(self) -> t.Dict[str, t.Any]:
+        """
+        Return keyword arguments for creating a `niquests.adapters.HTTPAdapter`.
+        """
+        options = self.session_options()
+        del options["multiplexed"]
+        options["pool_block"] = self.pool_block
+        return options
+
+    @classmethod
+    def from_env(cls) -> t.Optional["ConnectionSettings"]:
+        """
+        Read settings from `GRAFANA_POOL_CONNECTIONS`, `GRAFANA_POOL_MAXSIZE`,
+        `GRAFANA_POOL_BLOCK`, `GRAFANA_HTTP_VERSION`, `GRAFANA_HTTP_MULTIPLEXED`,
+        `GRAFANA_HTTP_KEEPALIVE`, `GRAFANA_POOL_WARM`, and `GRAFANA_DRAIN_TIMEOUT`
+        environment variables.
+
+        Returns `None` when none of them is defined.
+        """
+        from .util import as_bool
+
+        converters = {
+            "pool_connections": ("GRAFANA_POOL_CONNECTIONS", int),
+            "pool_maxsize": ("GRAFANA_POOL_MAXSIZE", int),
+            "pool_block": ("GRAFANA_POOL_BLOCK", as_bool),
+            "http_version": ("GRAFANA_HTTP_VERSION", str),
+            "multiplexed": ("GRAFANA_HTTP_MULTIPLEXED", as_bool),
+            "keepalive": ("GRAFANA_HTTP_KEEPALIVE", as_bool),
+            "warm_connections": ("GRAFANA_POOL_WARM", int),
+            "drain_timeout": ("GRAFANA_DRAIN_TIMEOUT", float),
+        }
+        kwargs = {}
+        for field, (variable, converter) in converters.items():
+            if variable in os.environ:
+                try:
+                    kwargs[field] = converter(os.environ[variable])
+                except Exception as ex:
+                    raise ValueError(f"Unable to parse invalid value from `{variable}` environment variable: {ex}")
+        if not kwargs:
+            return None
+        return cls(**kwargs)
+
+
 class TokenAuth(niquests.auth.AuthBase):
     def __init__(self, token):
         self.token = token
@@ -87,6 +258,16 @@ class GrafanaClient:
         timeout=DEFAULT_TIMEOUT,
         user_agent: str = None,
         organization_id: int = None,
+        retry: t.Union["RetryPolicy", int] = None,
+        connection: ConnectionSettings = None,
+        cache: "ResponseCache" = None,
+        coalesce: bool = False,
+        rate_limiter: "RateLimiter" = None,
+        circuit_breaker: "CircuitBreaker" = None,
+        json_codec: t.Union[str, "JsonCodec"] = None,
+        compression: "RequestCompression" = None,
+        hooks: "RequestHooks" = None,
+        metrics: "MetricsRegistry" = None,
     ):
         self.auth = auth
         self.verify = verify
@@ -95,6 +276,30 @@ class GrafanaClient:
         self.url_port = port
         self.url_path_prefix = url_path_prefix
         self.url_protocol = protocol
+        if isinstance(retry, int) and not isinstance(retry, bool):
+            from .retry import RetryPolicy
+
+            retry = RetryPolicy(total=retry)
+        self.retry = retry
+        self.connection = connection
+        self.cache = cache
+        self.flights = self._create_flights() if coalesce else None
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.json_codec = None
+        if json_codec is not None:
+            from .codec import get_codec
+
+            self.json_codec = get_codec(json_codec)
+        self.compression = compression
+        self.hooks = hooks
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.attach(self)
+        self.in_flight = 0
+        self._drained = threading.Condition()
+        # The client owning the connection pool, for organization-scoped views.
+        self.parent: t.Optional[GrafanaClient] = None
 
         def construct_api_url():
             params = {
@@ -117,7 +322,7 @@ class GrafanaClient:
 
         self.user_agent = user_agent or f"{__appname__}/{__version__}"
 
-        self.s = niquests.Session()
+        self.s = self._create_session()
         self.s.headers["User-Agent"] = self.user_agent
 
         self.organization_id = organization_id
@@ -133,9 +338,241 @@ class GrafanaClient:
             else:
                 self.auth = TokenAuth(self.auth)
 
+    def _create_flights(self):
+        from .coalesce import SingleFlight
+
+        return SingleFlight()
+
+    def _create_session(self):
+        if self.connection is None:
+            return niquests.Session()
+        session = niquests.Session(**self.connection.session_options())
+        self._configure_session(session, niquests.adapters.HTTPAdapter)
+        return session
+
+    def _configure_session(self, session, adapter_class):
+        if self.connection.pool_block:
+            adapter = adapter_class(
+                quic_cache_layer=session.quic_cache_layer,
+                resolver=session.resolver,
+                **self.connection.adapter_options(),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        if not self.connection.keepalive:
+            session.headers["Connection"] = "close"
+
     def _make_url(self, url):
         return f"{self.url}{url}"
 
+    def _warm_count(self, connections: int) -> int:
+        maxsize = self.connection.pool_maxsize if self.connection is not None else niquests.adapters.DEFAULT_POOLSIZE
+        return max(0, min(connections, maxsize))
+
+    def _warm_request(self):
+        r = self.s.request("get", self._make_url("/health"), auth=self.auth, verify=self.verify, timeout=self.timeout)
+        if getattr(r, "lazy", False):
+            self.s.gather(r)
+        return r
+
+    @staticmethod
+    def _warm_result(responses) -> t.Optional[t.Dict[str, t.Any]]:
+        info = None
+        for r in responses:
+            if isinstance(r, BaseException):
+                logger.warning(f"Warming connection failed: {r}")
+            elif info is None and r.status_code == 200:
+                try:
+                    info = r.json()
+                except ValueError:
+                    pass
+        return info
+
+    def warm(self, connections: int = 1) -> t.Optional[t.Dict[str, t.Any]]:
+        """
+        Open up to `connections` pooled connections, limited by the pool size, by
+        sending concurrent requests to the `/health` endpoint. Errors are logged,
+        and do not prevent starting up.
+
+        Returns the response of the `/health` endpoint, if any.
+        """
+        count = self._warm_count(connections)
+        if count == 0:
+            return None
+
+        def request():
+            try:
+                return self._warm_request()
+            except Exception as ex:
+                return ex
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            responses = list(executor.map(lambda _: request(), range(count)))
+        return self._warm_result(responses)
+
+    def for_org(self, organization_id: int) -> "GrafanaClient":
+        """
+        Return a view of this client, scoped to the organization `organization_id`
+        by sending the `X-Grafana-Org-Id` header with each request. The view shares
+        the connection pool, and all other components, like the response cache, or
+        the rate limiter, with this client. Unlike switching the organization of the
+        user, views do not change server-side state, so views on different
+        organizations can be used concurrently.
+        """
+        # Not using `copy.copy()`, because `__getattr__` would answer `__setstate__`.
+        view = object.__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        view.parent = self.parent or self
+        view.organization_id = organization_id
+        return view
+
+    def _scope_headers(self, headers):
+        if self.parent is None or (headers and "X-Grafana-Org-Id" in headers):
+            return headers
+        # orgId is defined in the openapi3 spec as an int64, but headers need to be a str
+        return {**(headers or {}), "X-Grafana-Org-Id": str(self.organization_id)}
+
+    def _request_started(self):
+        if self.parent is not None:
+            self.parent._request_started()
+            return
+        with self._drained:
+            self.in_flight += 1
+
+    def _request_finished(self):
+        if self.parent is not None:
+            self.parent._request_finished()
+            return
+        with self._drained:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._drained.notify_all()
+
+    def _drain_timeout(self, timeout: t.Optional[float]) -> float:
+        if timeout is not None:
+            return timeout
+        return self.connection.drain_timeout if self.connection is not None else DEFAULT_DRAIN_TIMEOUT
+
+    def close(self, timeout: t.Optional[float] = None) -> bool:
+        """
+        Wait for in-flight requests to complete, up to `timeout` seconds, and
+        close the connection pool. Returns whether all requests completed.
+        Views share the connection pool of their parent, which closes it.
+        """
+        if self.parent is not None:
+            return True
+        with self._drained:
+            drained = self._drained.wait_for(lambda: self.in_flight == 0, self._drain_timeout(timeout))
+        if not drained:
+            logger.warning(f"Closing client with {self.in_flight} requests in flight")
+        self.s.close()
+        return drained
+
+    def add_hook(self, event: str, callback: "Callback") -> "Callback":
+        """
+        Register a request lifecycle callback for one of the `before_request`,
+        `after_response`, or `on_error` events.
+        """
+        if self.hooks is None:
+            from .hooks import RequestHooks
+
+            self.hooks = RequestHooks()
+        return self.hooks.register(event, callback)
+
+    def paginate(
+        self,
+        url: str,
+        params: t.Optional[t.Dict[str, t.Any]] = None,
+        items_key: t.Optional[str] = None,
+        perpage: t.Optional[int] = None,
+        page: int = 1,
+        prefetch: int = DEFAULT_PREFETCH,
+        pages: bool = False,
+    ) -> t.Iterator[t.Any]:
+        """
+        Request the first page of a paged endpoint, and return an iterator over the
+        items of all pages, found at `items_key` of each response. Once the first
+        page reveals `totalCount`, the remaining pages are requested concurrently,
+        at most `prefetch` at a time. Use `pages=True` to iterate over responses.
+        """
+        return paginate(
+            lambda number: self.GET(url, params=page_params(params, number, perpage)),
+            items_key=items_key,
+            perpage=perpage,
+            prefetch=prefetch,
+            start=page,
+            pages=pages,
+        )
+
+    def paginate_all(self, *args, **kwargs) -> t.List[t.Any]:
+        """
+        Like `paginate()`, returning a list.
+        """
+        return list(self.paginate(*args, **kwargs))
+
+    def paginate_partitions(
+        self,
+        url: str,
+        partitions: t.Sequence[t.Dict[str, t.Any]] = ({},),
+        params: t.Optional[t.Dict[str, t.Any]] = None,
+        limit: int = SEARCH_LIMIT,
+        concurrency: int = DEFAULT_PREFETCH,
+        prefetch: t.Optional[int] = None,
+        key: t.Optional[str] = None,
+        fields: t.Optional[t.List[str]] = None,
+    ) -> t.Iterator[t.Any]:
+        """
+        Return an iterator over the hits of an endpoint paged using `limit` and
+        `page`, like `/search`, split into partitions by additional query
+        parameters. Partitions and pages are requested concurrently, up to
+        `concurrency` at a time, and hits are de-duplicated by the `key` field,
+        see `pagination.paginate_partitions()`.
+        """
+        return paginate_partitions(
+            lambda partition, page: self.GET(
+                url, params={**(params or {}), **partition, "limit": limit, "page": page}, fields=fields
+            ),
+            partitions,
+            limit=limit,
+            concurrency=concurrency,
+            prefetch=prefetch,
+            key=key,
+        )
+
+    def paginate_partitions_all(self, *args, **kwargs) -> t.List[t.Any]:
+        """
+        Like `paginate_partitions()`, returning a list.
+        """
+        return list(self.paginate_partitions(*args, **kwargs))
+
+    def _organization_of(self, headers) -> t.Optional[int]:
+        """
+        Return the organization a request is scoped to, as an integer, either
+        from its `X-Grafana-Org-Id` header, or the client's default. Returns
+        `None` when neither is set, or when the value is not numeric.
+        """
+        organization_id = self.organization_id
+        if headers and "X-Grafana-Org-Id" in headers:
+            organization_id = headers["X-Grafana-Org-Id"]
+        try:
+            return int(organization_id)
+        except (TypeError, ValueError):
+            # Let Grafana respond to invalid values, instead of failing before sending the request.
+            return None
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        """
+        Return the statistics of all configured components, like the response
+        cache, request coalescing, the rate limiter, or request compression.
+        """
+        components = {
+            "cache": self.cache,
+            "coalesce": self.flights,
+            "rate_limiter": self.rate_limiter,
+            "compression": self.compression,
+        }
+        return {name: component.stats() for name, component in components.items() if component is not None}
+
     @staticmethod
     def _ensure_valid_json_arg(json):
         if json is not None and not isinstance(json, (dict, list)):
@@ -146,30 +583,34 @@ class GrafanaClient:
             )
 
     @staticmethod
-    def _extract_from_response(r, accept_empty_json):
+    def _raise_for_error(status_code, response, text):
+        message = response["message"] if isinstance(response, dict) and "message" in response else text
+
+        if 500 <= status_code < 600:
+            raise GrafanaServerError(
+                status_code,
+                response,
+                f"Server Error {status_code}: {message}",
+            )
+        elif status_code == 400:
+            raise GrafanaBadInputError(response)
+        elif status_code == 401:
+            raise GrafanaUnauthorizedError(response)
+        elif 400 <= status_code < 500:
+            raise GrafanaClientError(
+                status_code,
+                response,
+                f"Client Error {status_code}: {message}",
+            )
+
+    @staticmethod
+    def _extract_from_response(r, accept_empty_json, fields=None, codec=None):
         if r.status_code >= 400:
             try:
                 response = r.json()
             except ValueError:
                 response = r.text
-            message = response["message"] if isinstance(response, dict) and "message" in response else r.text
-
-            if 500 <= r.status_code < 600:
-                raise GrafanaServerError(
-                    r.status_code,
-                    response,
-                    f"Server Error {r.status_code}: {message}",
-                )
-            elif r.status_code == 400:
-                raise GrafanaBadInputError(response)
-            elif r.status_code == 401:
-                raise GrafanaUnauthorizedError(response)
-            elif 400 <= r.status_code < 500:
-                raise GrafanaClientError(
-                    r.status_code,
-                    response,
-                    f"Client Error {r.status_code}: {message}",
-                )
+            GrafanaClient._raise_for_error(r.status_code, response, r.text)
 
         # `204 No Content` responses have an empty response body,
         # so it doesn't decode well from JSON.
@@ -181,6 +622,12 @@ class GrafanaClient:
         if content_type.startswith("text/"):
             return r.text
         try:
+            if fields is not None:
+                # Decode only the requested fields.
+                return loads_json(r.text, fields)
+            if codec is not None:
+                # Decode the response bytes directly.
+                return codec.loads(r.content)
             return r.json()
         except JSONDecodeError:
             if accept_empty_json and r.text == "":
@@ -188,31 +635,234 @@ class GrafanaClient:
             else:
                 raise
 
-    def __getattr__(self, item):
-        def __request_runner(url, json=None, data=None, params=None, headers=None, accept_empty_json=False):
-            __url = self._make_url(url)
-            # Sanity checks.
-            self._ensure_valid_json_arg(json)
+    @staticmethod
+    def _translate_exception(ex):
+        if isinstance(ex, Timeout):
+            error = GrafanaTimeoutError(0, None, str(ex))
+        elif isinstance(ex, niquests.exceptions.ConnectionError):
+            error = GrafanaConnectionError(0, None, str(ex))
+        elif isinstance(ex, HTTPError):
+            # Make sure to not leak any exception types of the requests implementation.
+            error = GrafanaException(0, None, str(ex))
+        else:
+            return ex
+        error.__cause__ = ex
+        return error
+
+    def _retry_delay(self, verb, error, response, attempt, waited):
+        """
+        Consult the retry policy, and return the number of seconds to wait
+        before the next attempt, or `None` if the error should be raised.
+        """
+        if self.retry is None:
+            return None
+        status_code = getattr(error, "status_code", None) or None
+        headers = response.headers if response is not None and status_code else None
+        delay = self.retry.next_delay(verb, attempt, waited, status_code=status_code, headers=headers)
+        if delay is None and isinstance(error, GrafanaException):
+            error.retries = attempt
+            error.retry_wait = waited
+        return delay
+
+    def _encode_body(self, json, data, headers):
+        """
+        Encode JSON request bodies to bytes, when using a custom JSON codec,
+        and compress request bodies, when configured.
+        """
+        if self.json_codec is None and self.compression is None:
+            return json, data, headers
+        if json is not None:
+            headers = {"Content-Type": "application/json", **(headers or {})}
+            data = (self.json_codec or compact_json()).dumps(json)
+            json = None
+        if self.compression is not None and isinstance(data, (bytes, str)) and data:
+            data, encoding = self.compression.compress(data)
+            if encoding is not None:
+                headers = {**(headers or {}), "Content-Encoding": encoding}
+        return json, data, headers
+
+    def _cache_identity(self) -> str:
+        """
+        Return a fingerprint of the credentials and the organization used for
+        requests, so responses are not shared between users of a cache.
+        """
+        auth = self.auth
+        if isinstance(auth, TokenAuth):
+            credentials = ("token", auth.token)
+        elif isinstance(auth, HeaderAuth):
+            credentials = ("header", auth.name, auth.value)
+        elif isinstance(auth, niquests.auth.HTTPBasicAuth):
+            credentials = ("basic", auth.username, auth.password)
+        elif auth is None:
+            credentials = None
+        else:
+            # Unknown authentication mechanisms are only shared by clients using the same instance.
+            credentials = (type(auth).__qualname__, id(auth))
+        return hashlib.sha256(request_key(credentials, self.organization_id).encode()).hexdigest()
+
+    def _cache_lookup(self, verb, url, params, data, headers, stream=False) -> t.Optional["CacheLookup"]:
+        if self.cache is None or stream or verb.upper() != "GET":
+            return None
+        return self.cache.prepare(
+            url, params=params, data=data, headers=headers, origin=self.url, identity=self._cache_identity()
+        )
+
+    def _cache_invalidate(self, verb, url):
+        if self.cache is not None and verb.upper() not in ["GET", "HEAD", "OPTIONS"]:
+            self.cache.invalidate(url, origin=self.url)
+
+    def _handle_response(self, verb, url, r, accept_empty_json, lookup: t.Optional["CacheLookup"], fields=None):
+        """
+        Decode a response, and keep the response cache up-to-date.
+        """
+        self._cache_invalidate(verb, url)
+        if lookup is None:
+            return self._extract_from_response(r, accept_empty_json, fields, self.json_codec)
+        if lookup.entry is not None and r.status_code == 304:
+            self.cache.revalidated(lookup.key, lookup.entry)
+            return self._extract_from_response(lookup.entry.response, accept_empty_json, fields, self.json_codec)
+        result = self._extract_from_response(r, accept_empty_json, fields, self.json_codec)
+        if r.status_code == 200:
+            self.cache.store(lookup.key, lookup.path, r, origin=lookup.origin)
+        return result
 
+    @staticmethod
+    def _stream_path(stream):
+        return stream if isinstance(stream, str) else None
+
+    def _open_stream(self, r, stream, fields):
+        """
+        Check the status of a streamed response, and return an iterator over
+        the items of the JSON array it contains.
+        """
+        if r.status_code >= 400:
+            try:
+                self._extract_from_response(r, False)
+            finally:
+                r.close()
+        if r.status_code == 204:
+            r.close()
+            return iter(())
+        return self._iter_stream(r, self._stream_path(stream), fields)
+
+    def _iter_stream(self, r, path, fields):
+        try:
+            yield from iter_items(r.iter_content(CHUNK_SIZE), path, fields)
+        except (Timeout, HTTPError) as ex:
+            raise self._translate_exception(ex)
+        finally:
+            r.close()
+
+    def _circuit_record(self, circuit, error=None):
+        if circuit is not None:
+            self.circuit_breaker.record(circuit, error)
+
+    def _coalesce_key(self, verb, url, params, data, headers, accept_empty_json, fields=None, stream=False):
+        # Streamed responses can only be consumed once, so they are never shared.
+        if self.flights is None or stream or verb.upper() not in ["GET", "HEAD", "OPTIONS"]:
+            return None
+        return request_key(f"{verb.upper()} {url}", params, data, headers, accept_empty_json, fields)
+
+    def _request(
+        self,
+        verb,
+        url,
+        json=None,
+        data=None,
+        params=None,
+        headers=None,
+        accept_empty_json=False,
+        fields=None,
+        stream=False,
+    ):
+        __url = self._make_url(url)
+        body, data, headers = self._encode_body(json, data, headers)
+
+        lookup = self._cache_lookup(verb, url, params, data, headers, stream)
+        if lookup is not None:
+            if lookup.fresh:
+                return self._extract_from_response(lookup.entry.response, accept_empty_json, fields, self.json_codec)
+            # Amended by conditional request headers, when revalidating a stale entry.
+            headers = lookup.headers
+
+        # Only pass `stream` when needed, in order to keep the request signature backwards compatible.
+        options = {"stream": True} if stream else {}
+
+        circuit = self.circuit_breaker.key_for(verb, url, json) if self.circuit_breaker is not None else None
+
+        attempt = 0
+        waited = 0.0
+        while True:
+            r = None
+            if circuit is not None:
+                self.circuit_breaker.before_request(circuit)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(verb, url)
+            info = None
+            if self.hooks is not None:
+                info = self.hooks.before_request(verb, url, attempt, self._organization_of(headers), body, data)
             try:
                 r = self.s.request(
-                    item.lower(),
+                    verb.lower(),
                     __url,
-                    json=json,
+                    json=body,
                     data=data,
                     params=params,
                     headers=headers,
                     auth=self.auth,
                     verify=self.verify,
                     timeout=self.timeout,
+                    **options,
                 )
-            except Timeout as e:
-                raise GrafanaTimeoutError(0, None, str(e)) from e
-            except HTTPError as e:
-                # Make sure to not leak any exception types of the requests implementation.
-                raise GrafanaException(0, None, str(e)) from e
+                if getattr(r, "lazy", False):
+                    self.s.gather(r)
+                if info is not None:
+                    self.hooks.after_response(info, r, streamed=bool(stream))
+                if stream:
+                    result = self._open_stream(r, stream, fields)
+                else:
+                    result = self._handle_response(verb, url, r, accept_empty_json, lookup, fields)
+            except (Timeout, HTTPError, niquests.exceptions.ConnectionError, GrafanaException) as ex:
+                error = self._translate_exception(ex)
+                if info is not None:
+                    self.hooks.on_error(info, error)
+            except BaseException as ex:
+                # Also report unexpected errors, and cancellation, so every attempt ends with an event.
+                if info is not None:
+                    self.hooks.on_error(info, ex)
+                raise
+            else:
+                self._circuit_record(circuit)
+                return result
+
+            self._circuit_record(circuit, error)
 
-            return self._extract_from_response(r, accept_empty_json)
+            delay = self._retry_delay(verb, error, r, attempt, waited)
+            if delay is None:
+                self._cache_invalidate(verb, url)
+                raise error
+            time.sleep(delay)
+            attempt += 1
+            waited += delay
+
+    def __getattr__(self, item):
+        def __request_runner(
+            url, json=None, data=None, params=None, headers=None, accept_empty_json=False, fields=None, stream=False
+        ):
+            # Sanity checks.
+            self._ensure_valid_json_arg(json)
+            headers = self._scope_headers(headers)
+
+            self._request_started()
+            try:
+                key = self._coalesce_key(item, url, params, data, headers, accept_empty_json, fields, stream)
+                if key is None:
+                    return self._request(item, url, json, data, params, headers, accept_empty_json, fields, stream)
+                return self.flights.do(
+                    key, lambda: self._request(item, url, json, data, params, headers, accept_empty_json, fields)
+                )
+            finally:
+                self._request_finished()
 
         return __request_runner
 
@@ -229,6 +879,16 @@ class AsyncGrafanaClient(GrafanaClient):
         timeout=DEFAULT_TIMEOUT,
         user_agent: str = None,
         organization_id: int = None,
+        retry: t.Union["RetryPolicy", int] = None,
+        connection: ConnectionSettings = None,
+        cache: "ResponseCache" = None,
+        coalesce: bool = False,
+        rate_limiter: "RateLimiter" = None,
+        circuit_breaker: "CircuitBreaker" = None,
+        json_codec: t.Union[str, "JsonCodec"] = None,
+        compression: "RequestCompression" = None,
+        hooks: "RequestHooks" = None,
+        metrics: "MetricsRegistry" = None,
     ):
         super().__init__(
             auth,
@@ -240,33 +900,260 @@ class AsyncGrafanaClient(GrafanaClient):
             timeout=timeout,
             user_agent=user_agent,
             organization_id=organization_id,
+            retry=retry,
+            connection=connection,
+            cache=cache,
+            coalesce=coalesce,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            json_codec=json_codec,
+            compression=compression,
+            hooks=hooks,
+            metrics=metrics,
         )
-        self.s = niquests.AsyncSession()
-        self.s.headers.setdefault("Connection", "keep-alive")
 
-    def __getattr__(self, item):
-        async def __request_runner(url, json=None, data=None, params=None, headers=None, accept_empty_json=False):
-            __url = self._make_url(url)
-            # Sanity checks.
-            self._ensure_valid_json_arg(json)
+    def _create_flights(self):
+        from .coalesce import AsyncSingleFlight
 
+        return AsyncSingleFlight()
+
+    def _create_session(self):
+        if self.connection is None:
+            session = niquests.AsyncSession()
+        else:
+            session = niquests.AsyncSession(**self.connection.session_options())
+            self._configure_session(session, niquests.adapters.AsyncHTTPAdapter)
+        session.headers.setdefault("Connection", "keep-alive")
+        return session
+
+    async def _warm_request(self):
+        r = await self.s.request(
+            "get", self._make_url("/health"), auth=self.auth, verify=self.verify, timeout=self.timeout
+        )
+        if getattr(r, "lazy", False):
+            await self.s.gather(r)
+        return r
+
+    async def warm(self, connections: int = 1) -> t.Optional[t.Dict[str, t.Any]]:
+        """
+        Open up to `connections` pooled connections, limited by the pool size, by
+        sending concurrent requests to the `/health` endpoint. Errors are logged,
+        and do not prevent starting up.
+
+        Returns the response of the `/health` endpoint, if any.
+        """
+        count = self._warm_count(connections)
+        if count == 0:
+            return None
+        responses = await asyncio.gather(*(self._warm_request() for _ in range(count)), return_exceptions=True)
+        return self._warm_result(responses)
+
+    async def close(self, timeout: t.Optional[float] = None) -> bool:
+        """
+        Wait for in-flight requests to complete, up to `timeout` seconds, and
+        close the connection pool. Returns whether all requests completed.
+        Views share the connection pool of their parent, which closes it.
+        """
+        if self.parent is not None:
+            return True
+        deadline = time.monotonic() + self._drain_timeout(timeout)
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(DRAIN_INTERVAL)
+        drained = self.in_flight == 0
+        if not drained:
+            logger.warning(f"Closing client with {self.in_flight} requests in flight")
+        await self.s.close()
+        return drained
+
+    async def paginate(
+        self,
+        url: str,
+        params: t.Optional[t.Dict[str, t.Any]] = None,
+        items_key: t.Optional[str] = None,
+        perpage: t.Optional[int] = None,
+        page: int = 1,
+        prefetch: int = DEFAULT_PREFETCH,
+        pages: bool = False,
+    ) -> t.AsyncIterator[t.Any]:
+        """
+        Request the first page of a paged endpoint, and return an asynchronous
+        iterator over the items of all pages, see `GrafanaClient.paginate()`.
+        """
+        return await apaginate(
+            lambda number: self.GET(url, params=page_params(params, number, perpage)),
+            items_key=items_key,
+            perpage=perpage,
+            prefetch=prefetch,
+            start=page,
+            pages=pages,
+        )
+
+    async def paginate_all(self, *args, **kwargs) -> t.List[t.Any]:
+        """
+        Like `paginate()`, returning a list.
+        """
+        return [item async for item in await self.paginate(*args, **kwargs)]
+
+    async def paginate_partitions(
+        self,
+        url: str,
+        partitions: t.Sequence[t.Dict[str, t.Any]] = ({},),
+        params: t.Optional[t.Dict[str, t.Any]] = None,
+        limit: int = SEARCH_LIMIT,
+        concurrency: int = DEFAULT_PREFETCH,
+        prefetch: t.Optional[int] = None,
+        key: t.Optional[str] = None,
+        fields: t.Optional[t.List[str]] = None,
+    ) -> t.AsyncIterator[t.Any]:
+        """
+        Return an asynchronous iterator over the hits of an endpoint paged using
+        `limit` and `page`, see `GrafanaClient.paginate_partitions()`.
+        """
+        return apaginate_partitions(
+            lambda partition, page: self.GET(
+                url, params={**(params or {}), **partition, "limit": limit, "page": page}, fields=fields
+            ),
+            partitions,
+            limit=limit,
+            concurrency=concurrency,
+            prefetch=prefetch,
+            key=key,
+        )
+
+    async def paginate_partitions_all(self, *args, **kwargs) -> t.List[t.Any]:
+        """
+        Like `paginate_partitions()`, returning a list.
+        """
+        return [item async for item in await self.paginate_partitions(*args, **kwargs)]
+
+    async def _open_stream(self, r, stream, fields):
+        if r.status_code >= 400:
+            try:
+                text = await r.text
+            finally:
+                await r.close()
+            try:
+                response = loads_json(text)
+            except ValueError:
+                response = text
+            self._raise_for_error(r.status_code, response, text)
+        if r.status_code == 204:
+            await r.close()
+            return self._aiter_stream(None, None, None)
+        return self._aiter_stream(r, self._stream_path(stream), fields)
+
+    async def _aiter_stream(self, r, path, fields):
+        if r is None:
+            return
+        try:
+            async for item in aiter_items(await r.iter_content(CHUNK_SIZE), path, fields):
+                yield item
+        except (Timeout, HTTPError) as ex:
+            raise self._translate_exception(ex)
+        finally:
+            await r.close()
+
+    async def _request(
+        self,
+        verb,
+        url,
+        json=None,
+        data=None,
+        params=None,
+        headers=None,
+        accept_empty_json=False,
+        fields=None,
+        stream=False,
+    ):
+        __url = self._make_url(url)
+        body, data, headers = self._encode_body(json, data, headers)
+
+        lookup = self._cache_lookup(verb, url, params, data, headers, stream)
+        if lookup is not None:
+            if lookup.fresh:
+                return self._extract_from_response(lookup.entry.response, accept_empty_json, fields, self.json_codec)
+            # Amended by conditional request headers, when revalidating a stale entry.
+            headers = lookup.headers
+
+        # Only pass `stream` when needed, in order to keep the request signature backwards compatible.
+        options = {"stream": True} if stream else {}
+
+        circuit = self.circuit_breaker.key_for(verb, url, json) if self.circuit_breaker is not None else None
+
+        attempt = 0
+        waited = 0.0
+        while True:
+            r = None
+            if circuit is not None:
+                self.circuit_breaker.before_request(circuit)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(verb, url)
+            info = None
+            if self.hooks is not None:
+                info = self.hooks.before_request(verb, url, attempt, self._organization_of(headers), body, data)
             try:
                 r = await self.s.request(
-                    item.lower(),
+                    verb.lower(),
                     __url,
-                    json=json,
+                    json=body,
                     data=data,
                     params=params,
                     headers=headers,
                     auth=self.auth,
                     verify=self.verify,
                     timeout=self.timeout,
+                    **options,
                 )
-            except Timeout as e:
-                raise GrafanaTimeoutError(0, None, str(e)) from e
-            except HTTPError as e:
-                raise GrafanaException(0, None, str(e)) from e
+                if getattr(r, "lazy", False):
+                    await self.s.gather(r)
+                if info is not None:
+                    self.hooks.after_response(info, r, streamed=bool(stream))
+                if stream:
+                    result = await self._open_stream(r, stream, fields)
+                else:
+                    result = self._handle_response(verb, url, r, accept_empty_json, lookup, fields)
+            except (Timeout, HTTPError, niquests.exceptions.ConnectionError, GrafanaException) as ex:
+                error = self._translate_exception(ex)
+                if info is not None:
+                    self.hooks.on_error(info, error)
+            except BaseException as ex:
+                # Also report unexpected errors, and cancellation, so every attempt ends with an event.
+                if info is not None:
+                    self.hooks.on_error(info, ex)
+                raise
+            else:
+                self._circuit_record(circuit)
+                return result
+
+            self._circuit_record(circuit, error)
+
+            delay = self._retry_delay(verb, error, r, attempt, waited)
+            if delay is None:
+                self._cache_invalidate(verb, url)
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+            waited += delay
+
+    def __getattr__(self, item):
+        async def __request_runner(
+            url, json=None, data=None, params=None, headers=None, accept_empty_json=False, fields=None, stream=False
+        ):
+            # Sanity checks.
+            self._ensure_valid_json_arg(json)
+            headers = self._scope_headers(headers)
 
-            return self._extract_from_response(r, accept_empty_json)
+            self._request_started()
+            try:
+                key = self._coalesce_key(item, url, params, data, headers, accept_empty_json, fields, stream)
+                if key is None:
+                    return await self._request(
+                        item, url, json, data, params, headers, accept_empty_json, fields, stream
+                    )
+                return await self.flights.do(
+                    key, lambda: self._request(item, url, json, data, params, headers, accept_empty_json, fields)
+                )
+            finally:
+                self._request_finished()
 
         return __request_runner
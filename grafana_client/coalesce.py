@@ -0,0 +1,102 @@
+"""
+About
+=====
+Single-flight request coalescing for `GrafanaClient` and `AsyncGrafanaClient`.
+
+When several callers issue the same idempotent request at the same time, only
+the first one goes to the network. The others wait for its outcome, and receive
+the very same decoded result, or the same exception.
+
+Because the result object is shared between all callers of a flight, it must
+be treated as read-only.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe request coalescing for the synchronous client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._flights)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Invoke `fn`, unless an invocation for the same key is in flight already,
+        in which case its outcome is awaited and returned.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.requests += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as ex:
+            flight.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+        return flight.result
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+
+class AsyncSingleFlight(SingleFlight):
+    """
+    Request coalescing for the asynchronous client.
+
+    The shared request runs within its own task, so that cancelling one of the
+    waiting callers does not cancel the request for the others.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._flights.get(key)
+        if task is None:
+            self.requests += 1
+            task = self._flights[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda future: self._finish(key, future))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, future: asyncio.Future):
+        if self._flights.get(key) is future:
+            del self._flights[key]
+        # Mark the exception as retrieved, in case all callers have been cancelled.
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,101 @@
+"""
+About
+=====
+Pluggable JSON codecs for encoding request bodies and decoding responses.
+
+Codecs encode Python objects directly to UTF-8 bytes, and decode response
+bytes without converting them to text first. `orjson` and `ujson` are used
+when installed, falling back to the standard library otherwise.
+"""
+
+import json
+from typing import Any, Union
+
+
+class JsonCodec:
+    """
+    JSON codec based on the standard library, serializing without whitespace.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>"
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    JSON codec based on `orjson`.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.orjson.dumps(obj, option=self.orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        # `orjson.JSONDecodeError` is a subclass of `json.JSONDecodeError`.
+        return self.orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """
+    JSON codec based on `ujson`.
+    """
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self.ujson = ujson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self.ujson.loads(data)
+        except ValueError as ex:
+            # Signal errors like the other codecs do.
+            if isinstance(data, bytes):
+                data = data.decode("utf-8", errors="replace")
+            raise json.JSONDecodeError(str(ex), data, 0) from ex
+
+
+CODECS = {
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "json": JsonCodec,
+}
+
+
+def get_codec(codec: Union[str, JsonCodec]) -> JsonCodec:
+    """
+    Resolve a codec by name, one of `orjson`, `ujson`, or `json`.
+
+    `auto` selects the fastest installed codec, falling back to the standard
+    library. Naming a codec whose package is not installed raises an `ImportError`.
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec == "auto":
+        for factory in CODECS.values():
+            try:
+                return factory()
+            except ImportError:
+                pass
+    if codec not in CODECS:
+        raise ValueError(f"Unknown JSON codec `{codec}`, use one of auto, {', '.join(CODECS)}")
+    return CODECS[codec]()
@@ -0,0 +1,80 @@
+"""
+About
+=====
+Compression of request bodies for `GrafanaClient` and `AsyncGrafanaClient`.
+
+Large request bodies, like dashboards, alert rule groups, or snapshots, are
+compressed using `gzip` or `deflate`, and sent with a `Content-Encoding` header.
+Please make sure the Grafana server, or the reverse proxy in front of it, is
+able to decode compressed request bodies before enabling it.
+"""
+
+import threading
+import zlib
+from typing import Dict, Optional, Tuple, Union
+
+# Window bits selecting the container format, see `zlib.compressobj`.
+WBITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+class RequestCompression:
+    """
+    Compress request bodies above a size threshold.
+
+    :param encoding: Either `gzip` or `deflate`.
+    :param threshold: Minimum body size in bytes for compressing it.
+    :param level: Compression level, from 1 (fastest) to 9 (smallest).
+    """
+
+    def __init__(self, encoding: str = "gzip", threshold: int = 1024, level: int = 6):
+        if encoding not in WBITS:
+            raise ValueError(f"Invalid content encoding `{encoding}`, use one of {', '.join(WBITS)}")
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.compressed = 0
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+
+    def compress(self, body: Union[bytes, str]) -> Tuple[bytes, Optional[str]]:
+        """
+        Compress a request body, when it is large enough, and it pays off.
+
+        Returns the body to send, and its content encoding, or `None` when sent uncompressed.
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        encoding = None
+        result = body
+        if len(body) >= self.threshold:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, WBITS[self.encoding])
+            compressed = compressor.compress(body) + compressor.flush()
+            if len(compressed) < len(body):
+                result = compressed
+                encoding = self.encoding
+        with self._lock:
+            self.requests += 1
+            self.bytes_raw += len(body)
+            self.bytes_sent += len(result)
+            if encoding is not None:
+                self.compressed += 1
+        return result, encoding
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Return the number of request bodies, and the bytes-on-wire savings.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "compressed": self.compressed,
+                "bytes_raw": self.bytes_raw,
+                "bytes_sent": self.bytes_sent,
+                "bytes_saved": self.bytes_raw - self.bytes_sent,
+                "ratio": self.bytes_sent / self.bytes_raw if self.bytes_raw else 1.0,
+            }
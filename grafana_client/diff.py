@@ -0,0 +1,266 @@
+"""
+About
+=====
+Compare dashboard models locally, without posting each pair of versions to the
+`/dashboards/calculate-diff` endpoint.
+
+The diff is structural, and array-aware: panels are matched by their `id`, or
+by their `gridPos` when they have none, query targets by their `refId`, and
+template variables and annotations by their `name`. Reordering matched items
+does not produce changes, and changes within them are addressed by their key,
+like `/panels/id=4/targets/refId=A/expr`. Other arrays are compared by index.
+
+The changes are machine-readable `Change` objects. `iter_version_diffs()`
+compares the consecutive versions of a dashboard's history, fetching the
+versions concurrently.
+"""
+
+import dataclasses
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .bulk import DEFAULT_CONCURRENCY, arun_bulk, run_bulk
+
+ADD = "add"
+REMOVE = "remove"
+REPLACE = "replace"
+
+# Fields identifying the items of arrays, by the name of the array, in order of preference.
+ARRAY_KEYS: Dict[str, Tuple[str, ...]] = {
+    "panels": ("id", "gridPos"),
+    "targets": ("refId",),
+    "list": ("name",),
+}
+
+# The version increases with each save.
+DEFAULT_IGNORE = ("/version",)
+
+ChangePath = Tuple[Union[str, int], ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class Change:
+    """
+    A single change between two documents.
+
+    :param op: One of `add`, `remove`, or `replace`.
+    :param path: Keys, indexes, and item keys, like `id=4`, leading to the changed value.
+    :param old: The value before, for `remove` and `replace`.
+    :param new: The value after, for `add` and `replace`.
+    """
+
+    op: str
+    path: ChangePath
+    old: Any = None
+    new: Any = None
+
+    @property
+    def pointer(self) -> str:
+        """
+        The path, formatted like a JSON Pointer.
+        """
+        return "".join("/" + str(segment).replace("~", "~0").replace("/", "~1") for segment in self.path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        change = {"op": self.op, "path": self.pointer}
+        if self.op != ADD:
+            change["old"] = self.old
+        if self.op != REMOVE:
+            change["new"] = self.new
+        return change
+
+
+@dataclasses.dataclass
+class VersionDiff:
+    """
+    Changes between two consecutive versions of a dashboard.
+
+    :param base: Version number before.
+    :param new: Version number after.
+    :param created: Timestamp of saving the new version.
+    :param created_by: Login of the user who saved the new version.
+    :param message: Message saved with the new version.
+    :param changes: The changes.
+    """
+
+    base: int
+    new: int
+    created: Optional[str] = None
+    created_by: Optional[str] = None
+    message: Optional[str] = None
+    changes: List[Change] = dataclasses.field(default_factory=list)
+
+
+def parse_pointer(pointer: str) -> ChangePath:
+    return tuple(segment.replace("~1", "/").replace("~0", "~") for segment in pointer.split("/")[1:])
+
+
+def item_key(item: Any, fields: Tuple[str, ...]) -> Optional[str]:
+    """
+    Return the key of an array item, like `id=4`, or `gridPos=0,8`.
+    """
+    if not isinstance(item, dict):
+        return None
+    for field in fields:
+        value = item.get(field)
+        if value is None:
+            continue
+        if field == "gridPos":
+            if not isinstance(value, dict):
+                continue
+            value = f"{value.get('x')},{value.get('y')}"
+        return f"{field}={value}"
+    return None
+
+
+def keyed(items: List[Any], fields: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """
+    Map the items of an array by their keys, or return `None`, when any item has
+    no key, or keys are ambiguous.
+    """
+    mapping = {}
+    for item in items:
+        key = item_key(item, fields)
+        if key is None or key in mapping:
+            return None
+        mapping[key] = item
+    return mapping
+
+
+def _diff(old: Any, new: Any, path: ChangePath, changes: List[Change], ignore: Set[ChangePath]):
+    if type(old) is type(new) and old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for name, value in old.items():
+            child = (*path, name)
+            if child in ignore:
+                continue
+            if name not in new:
+                changes.append(Change(REMOVE, child, old=value))
+            else:
+                _diff(value, new[name], child, changes, ignore)
+        for name, value in new.items():
+            child = (*path, name)
+            if name not in old and child not in ignore:
+                changes.append(Change(ADD, child, new=value))
+        return
+    if isinstance(old, list) and isinstance(new, list):
+        fields = ARRAY_KEYS.get(path[-1]) if path and isinstance(path[-1], str) else None
+        old_items = keyed(old, fields) if fields else None
+        new_items = keyed(new, fields) if old_items is not None else None
+        if new_items is not None:
+            for key, value in old_items.items():
+                if key not in new_items:
+                    changes.append(Change(REMOVE, (*path, key), old=value))
+                else:
+                    _diff(value, new_items[key], (*path, key), changes, ignore)
+            for key, value in new_items.items():
+                if key not in old_items:
+                    changes.append(Change(ADD, (*path, key), new=value))
+            return
+        for index in range(min(len(old), len(new))):
+            _diff(old[index], new[index], (*path, index), changes, ignore)
+        for index in range(len(new), len(old)):
+            changes.append(Change(REMOVE, (*path, index), old=old[index]))
+        for index in range(len(old), len(new)):
+            changes.append(Change(ADD, (*path, index), new=new[index]))
+        return
+    changes.append(Change(REPLACE, path, old=old, new=new))
+
+
+def diff_dashboards(old: Dict[str, Any], new: Dict[str, Any], ignore: Iterable[str] = DEFAULT_IGNORE) -> List[Change]:
+    """
+    Compare two dashboard models, and return the changes from `old` to `new`.
+
+    :param old: Dashboard model before.
+    :param new: Dashboard model after.
+    :param ignore: JSON Pointers of values to ignore, like `/version`.
+    """
+    changes: List[Change] = []
+    _diff(old, new, (), changes, {parse_pointer(pointer) for pointer in ignore})
+    return changes
+
+
+def version_entries(response: Any) -> List[Dict[str, Any]]:
+    """
+    Return the entries of a response of the versions endpoint, in ascending order
+    of their version numbers. The response is a list up to Grafana 10, and an
+    object holding `versions` since Grafana 11.
+    """
+    entries = response.get("versions", []) if isinstance(response, dict) else response
+    return sorted(entries, key=lambda entry: entry["version"])
+
+
+def _version_diff(base: Dict[str, Any], version: Dict[str, Any], ignore: Iterable[str]) -> VersionDiff:
+    return VersionDiff(
+        base=base["version"],
+        new=version["version"],
+        created=version.get("created"),
+        created_by=version.get("createdBy"),
+        message=version.get("message"),
+        changes=diff_dashboards(base.get("data") or {}, version.get("data") or {}, ignore=ignore),
+    )
+
+
+def iter_version_diffs(
+    api,
+    dashboard_uid: str,
+    limit: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ignore: Iterable[str] = DEFAULT_IGNORE,
+) -> Iterator[VersionDiff]:
+    """
+    Fetch the versions of a dashboard concurrently, using the synchronous API,
+    and yield the differences between consecutive versions, oldest first.
+    Versions being fetched, and fetched versions waiting for an earlier, slower
+    one, are held in memory, at most twice `concurrency` at a time.
+
+    :param api: A `GrafanaApi` instance.
+    :param dashboard_uid: UID of the dashboard.
+    :param limit: Maximum number of most recent versions to compare.
+    :param concurrency: Maximum number of versions fetched at a time.
+    :param ignore: JSON Pointers of values to ignore.
+    """
+    versions = api.dashboard_versions.get_dashboard_versions(dashboard_uid=dashboard_uid, limit=limit)
+    entries = version_entries(versions)
+    results = run_bulk(
+        lambda entry: api.dashboard_versions.get_dashboard_version(
+            dashboard_uid=dashboard_uid, version_id=entry["version"]
+        ),
+        entries,
+        concurrency=concurrency,
+    )
+    base = None
+    for result in results:
+        version = result.unwrap()
+        if base is not None:
+            yield _version_diff(base, version, ignore)
+        base = version
+
+
+async def aiter_version_diffs(
+    api,
+    dashboard_uid: str,
+    limit: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ignore: Iterable[str] = DEFAULT_IGNORE,
+):
+    """
+    Fetch the versions of a dashboard concurrently, using the asynchronous API,
+    and yield the differences between consecutive versions, oldest first, see
+    `iter_version_diffs()`.
+    """
+    versions = await api.dashboard_versions.get_dashboard_versions(dashboard_uid=dashboard_uid, limit=limit)
+    entries = version_entries(versions)
+    results = arun_bulk(
+        lambda entry: api.dashboard_versions.get_dashboard_version(
+            dashboard_uid=dashboard_uid, version_id=entry["version"]
+        ),
+        entries,
+        concurrency=concurrency,
+    )
+    base = None
+    async for result in results:
+        version = result.unwrap()
+        if base is not None:
+            yield _version_diff(base, version, ignore)
+        base = version
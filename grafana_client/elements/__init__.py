@@ -1,45 +1,46 @@
-from .admin import Admin
-from .alerting import Alerting
-from .alertingprovisioning import AlertingProvisioning
-from .annotations import Annotations
-from .base import Base
-from .dashboard import Dashboard
-from .dashboard_versions import DashboardVersions
-from .datasource import Datasource
-from .folder import Folder
-from .health import Health
-from .libraryelement import LibraryElement
-from .notifications import Notifications
-from .organization import Organization, Organizations
-from .plugin import Plugin
-from .rbac import Rbac
-from .search import Search
-from .service_account import ServiceAccount
-from .snapshots import Snapshots
-from .team import Teams
-from .user import User, Users
+"""
+API elements, imported on first access, in order to keep the startup time of
+short-lived programs low. Maps each element class name to its module.
+"""
 
-__all__ = (
-    "Admin",
-    "Alerting",
-    "AlertingProvisioning",
-    "Annotations",
-    "Base",
-    "Dashboard",
-    "DashboardVersions",
-    "Datasource",
-    "Folder",
-    "Health",
-    "LibraryElement",
-    "Notifications",
-    "Organization",
-    "Organizations",
-    "Plugin",
-    "Rbac",
-    "Search",
-    "ServiceAccount",
-    "Snapshots",
-    "Teams",
-    "User",
-    "Users",
-)
+import importlib
+
+ELEMENTS = {
+    "Admin": ("admin", "Admin"),
+    "Alerting": ("alerting", "Alerting"),
+    "AlertingProvisioning": ("alertingprovisioning", "AlertingProvisioning"),
+    "Annotations": ("annotations", "Annotations"),
+    "Base": ("base", "Base"),
+    "Dashboard": ("dashboard", "Dashboard"),
+    "DashboardVersions": ("dashboard_versions", "DashboardVersions"),
+    "Datasource": ("datasource", "Datasource"),
+    "Folder": ("folder", "Folder"),
+    "Health": ("health", "Health"),
+    "LibraryElement": ("libraryelement", "LibraryElement"),
+    "Notifications": ("notifications", "Notifications"),
+    "Organization": ("organization", "Organization"),
+    "Organizations": ("organization", "Organizations"),
+    "Plugin": ("plugin", "Plugin"),
+    "Rbac": ("rbac", "Rbac"),
+    "Search": ("search", "Search"),
+    "ServiceAccount": ("service_account", "ServiceAccount"),
+    "Snapshots": ("snapshots", "Snapshots"),
+    "Teams": ("team", "Teams"),
+    "User": ("user", "User"),
+    "Users": ("user", "Users"),
+}
+
+__all__ = tuple(ELEMENTS)
+
+
+def __getattr__(name: str):
+    if name not in ELEMENTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = ELEMENTS[name]
+    value = getattr(importlib.import_module(f".{module}", __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,45 +1,45 @@
-from .admin import Admin as AsyncAdmin
-from .alerting import Alerting as AsyncAlerting
-from .alertingprovisioning import AlertingProvisioning as AsyncAlertingProvisioning
-from .annotations import Annotations as AsyncAnnotations
-from .dashboard import Dashboard as AsyncDashboard
-from .dashboard_versions import DashboardVersions as AsyncDashboardVersions
-from .datasource import Datasource as AsyncDatasource
-from .folder import Folder as AsyncFolder
-from .health import Health as AsyncHealth
-from .libraryelement import LibraryElement as AsyncLibraryElement
-from .notifications import Notifications as AsyncNotifications
-from .organization import Organization as AsyncOrganization
-from .organization import Organizations as AsyncOrganizations
-from .plugin import Plugin as AsyncPlugin
-from .rbac import Rbac as AsyncRbac
-from .search import Search as AsyncSearch
-from .service_account import ServiceAccount as AsyncServiceAccount
-from .snapshots import Snapshots as AsyncSnapshots
-from .team import Teams as AsyncTeams
-from .user import User as AsyncUser
-from .user import Users as AsyncUsers
+"""
+API elements, imported on first access, in order to keep the startup time of
+short-lived programs low. Maps each element class name to its module.
+"""
 
-__all__ = (
-    "AsyncAdmin",
-    "AsyncAlerting",
-    "AsyncAlertingProvisioning",
-    "AsyncAnnotations",
-    "AsyncDashboard",
-    "AsyncDashboardVersions",
-    "AsyncDatasource",
-    "AsyncFolder",
-    "AsyncHealth",
-    "AsyncLibraryElement",
-    "AsyncNotifications",
-    "AsyncOrganization",
-    "AsyncOrganizations",
-    "AsyncPlugin",
-    "AsyncRbac",
-    "AsyncSearch",
-    "AsyncServiceAccount",
-    "AsyncSnapshots",
-    "AsyncTeams",
-    "AsyncUser",
-    "AsyncUsers",
-)
+import importlib
+
+ELEMENTS = {
+    "AsyncAdmin": ("admin", "Admin"),
+    "AsyncAlerting": ("alerting", "Alerting"),
+    "AsyncAlertingProvisioning": ("alertingprovisioning", "AlertingProvisioning"),
+    "AsyncAnnotations": ("annotations", "Annotations"),
+    "AsyncDashboard": ("dashboard", "Dashboard"),
+    "AsyncDashboardVersions": ("dashboard_versions", "DashboardVersions"),
+    "AsyncDatasource": ("datasource", "Datasource"),
+    "AsyncFolder": ("folder", "Folder"),
+    "AsyncHealth": ("health", "Health"),
+    "AsyncLibraryElement": ("libraryelement", "LibraryElement"),
+    "AsyncNotifications": ("notifications", "Notifications"),
+    "AsyncOrganization": ("organization", "Organization"),
+    "AsyncOrganizations": ("organization", "Organizations"),
+    "AsyncPlugin": ("plugin", "Plugin"),
+    "AsyncRbac": ("rbac", "Rbac"),
+    "AsyncSearch": ("search", "Search"),
+    "AsyncServiceAccount": ("service_account", "ServiceAccount"),
+    "AsyncSnapshots": ("snapshots", "Snapshots"),
+    "AsyncTeams": ("team", "Teams"),
+    "AsyncUser": ("user", "User"),
+    "AsyncUsers": ("user", "Users"),
+}
+
+__all__ = tuple(ELEMENTS)
+
+
+def __getattr__(name: str):
+    if name not in ELEMENTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = ELEMENTS[name]
+    value = getattr(importlib.import_module(f".{module}", __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
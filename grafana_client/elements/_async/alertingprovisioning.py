@@ -6,13 +6,15 @@ class AlertingProvisioning(Base):
         super(AlertingProvisioning, self).__init__(client)
         self.client = client
 
-    async def get_alertrules_all(self):
+    async def get_alertrules_all(self, fields=None, stream=False):
         """
         Gets all alert rules
+        @param fields: Only decode the given fields of each alert rule, like `["uid", "title"]`.
+        @param stream: Return an iterator which decodes alert rules incrementally.
         @return:
         """
         get_alertrules_all_path = "/v1/provisioning/alert-rules"
-        return await self.client.GET(get_alertrules_all_path)
+        return await self.client.GET(get_alertrules_all_path, fields=fields, stream=stream)
 
     async def get_alertrule(self, alertrule_uid):
         """
@@ -78,7 +80,7 @@ class AlertingProvisioning(Base):
         :param alertrule_group:
         :return:
         """
-        return self.update_rule_group(folder_uid, group_uid, alertrule_group, disable_provenance)
+        return await self.update_rule_group(folder_uid, group_uid, alertrule_group, disable_provenance)
 
     async def delete_alertrule(self, alertrule_uid):
         """
@@ -1,11 +1,9 @@
 import warnings
 
-from verlib2 import Version
-
+# Re-exported for backward compatibility, versions are checked using `GrafanaApi.capabilities`.
+from ...capabilities import VERSION_8 as VERSION_8
 from ..base import Base
 
-VERSION_8 = Version("8")
-
 
 class Dashboard(Base):
     def __init__(self, client, api):
@@ -13,14 +11,15 @@ class Dashboard(Base):
         self.client = client
         self.api = api
 
-    async def get_dashboard(self, dashboard_uid):
+    async def get_dashboard(self, dashboard_uid, fields=None):
         """
 
         :param dashboard_uid:
+        :param fields: Only decode the given fields, like `["meta.folderUid", "dashboard.title"]`.
         :return:
         """
         get_dashboard_path = "/dashboards/uid/%s" % dashboard_uid
-        return await self.client.GET(get_dashboard_path)
+        return await self.client.GET(get_dashboard_path, fields=fields)
 
     async def get_dashboard_by_name(self, dashboard_name):
         """
@@ -28,7 +27,8 @@ class Dashboard(Base):
         :param dashboard_name:
         :return:
         """
-        if await self.api.version and Version(await self.api.version) >= VERSION_8:
+        capabilities = await self.api.capabilities
+        if capabilities.dashboard_by_slug is False:
             raise DeprecationWarning("Grafana 8 and higher does not support getting dashboards by slug")
         get_dashboard_path = "/dashboards/db/%s" % dashboard_name
         return await self.client.GET(get_dashboard_path)
@@ -80,26 +80,26 @@ class Dashboard(Base):
             "get_dashboard_permissions is deprecated, " "use corresponding _by_id or _by_uid methods",
             DeprecationWarning,
         )
-        return self.get_permissions_by_id(dashboard_id)
+        return await self.get_permissions_by_id(dashboard_id)
 
     async def update_dashboard_permissions(self, dashboard_id, items):
         warnings.warn(
             "update_dashboard_permissions is deprecated, " "use corresponding _by_id or _by_uid methods",
             DeprecationWarning,
         )
-        return self.update_permissions_by_id(dashboard_id, items)
+        return await self.update_permissions_by_id(dashboard_id, items)
 
     async def get_permissions_by_id(self, dashboard_id):
-        return self.get_permissions_generic(dashboard_id, idtype="id")
+        return await self.get_permissions_generic(dashboard_id, idtype="id")
 
     async def update_permissions_by_id(self, dashboard_id, items):
-        return self.update_permissions_generic(dashboard_id, items, idtype="id")
+        return await self.update_permissions_generic(dashboard_id, items, idtype="id")
 
     async def get_permissions_by_uid(self, dashboard_id):
-        return self.get_permissions_generic(dashboard_id)
+        return await self.get_permissions_generic(dashboard_id)
 
     async def update_permissions_by_uid(self, dashboard_id, items):
-        return self.update_permissions_generic(dashboard_id, items)
+        return await self.update_permissions_generic(dashboard_id, items)
 
     async def get_permissions_generic(self, identifier, idtype="uid"):
         permissions_path = f"/dashboards/{idtype}/{identifier}/permissions"
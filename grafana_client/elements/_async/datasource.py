@@ -6,8 +6,11 @@ from typing import Dict, Optional, Tuple, Union
 from urllib.parse import urlencode
 
 from niquests import ReadTimeout
-from verlib2 import Version
 
+# `VERSION_9` and `VERSION_10_2_2` are re-exported for backward compatibility.
+from ...capabilities import VERSION_7, VERSION_8
+from ...capabilities import VERSION_9 as VERSION_9
+from ...capabilities import VERSION_10_2_2 as VERSION_10_2_2
 from ...client import GrafanaBadInputError, GrafanaClientError, GrafanaServerError
 from ...knowledge import get_healthcheck_expression, query_factory
 from ...model import DatasourceHealthResponse, DatasourceIdentifier
@@ -15,10 +18,6 @@ from ..base import Base
 
 logger = logging.getLogger(__name__)
 
-VERSION_10_2_2 = Version("10.2.2")
-VERSION_9 = Version("9")
-VERSION_8 = Version("8")
-VERSION_7 = Version("7")
 VERBOSE = False
 
 
@@ -130,13 +129,15 @@ class Datasource(Base):
         update_datasource = "/datasources/uid/%s" % datasource_uid
         return await self.client.PUT(update_datasource, json=datasource)
 
-    async def list_datasources(self):
+    async def list_datasources(self, fields=None, stream=False):
         """
 
+        :param fields: Only decode the given fields of each data source, like `["uid", "type"]`.
+        :param stream: Return an iterator which decodes data sources incrementally.
         :return:
         """
         list_datasources_path = "/datasources"
-        return await self.client.GET(list_datasources_path)
+        return await self.client.GET(list_datasources_path, fields=fields, stream=stream)
 
     async def delete_datasource_by_id(self, datasource_id):
         """
@@ -174,7 +175,8 @@ class Datasource(Base):
         :param datasource_id:
         :return:
         """
-        if Version(await self.api.version) > VERSION_10_2_2:
+        capabilities = await self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3")
 
         get_datasource_path = "/datasources/%s/enable-permissions" % datasource_id
@@ -187,7 +189,8 @@ class Datasource(Base):
         :param datasource_id:
         :return:
         """
-        if Version(await self.api.version) > VERSION_10_2_2:
+        capabilities = await self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3")
 
         get_datasource_path = "/datasources/%s/disable-permissions" % datasource_id
@@ -200,7 +203,8 @@ class Datasource(Base):
         :param datasource_id:
         :return:
         """
-        if Version(await self.api.version) > VERSION_10_2_2:
+        capabilities = await self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3, please use get_rbac_datasources()")
 
         get_datasource_path = "/datasources/%s/permissions" % datasource_id
@@ -214,7 +218,8 @@ class Datasource(Base):
         :param permissions:
         :return:
         """
-        if Version(await self.api.version) > VERSION_10_2_2:
+        capabilities = await self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3, please use set_rbac_datasources_*()")
 
         get_datasource_path = "/datasources/%s/permissions" % datasource_id
@@ -228,7 +233,8 @@ class Datasource(Base):
         :param permission_id:
         :return:
         """
-        if Version(await self.api.version) > VERSION_10_2_2:
+        capabilities = await self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3, please use set_rbac_datasources_*()")
 
         get_datasource_path = "/datasources/%s/permissions/%s" % (datasource_id, permission_id)
@@ -261,9 +267,9 @@ class Datasource(Base):
             )
         )
         if query_type == "query":
-            return self.query(datasource_id=datasource_id, query=expr, timestamp=time)
+            return await self.query(datasource_id=datasource_id, query=expr, timestamp=time)
         elif query_type == "query_range":
-            return self.query_range(datasource_id=datasource_id, query=expr, start=start, end=end, step=step)
+            return await self.query_range(datasource_id=datasource_id, query=expr, start=start, end=end, step=step)
         else:
             raise KeyError(f"Unknown or invalid query type: {query_type}")
 
@@ -359,6 +365,12 @@ class Datasource(Base):
 
         logger.info(f"Submitting request: {request}")
 
+        # Prometheus and Loki used a different query API up to Grafana 7.
+        legacy_query_api = False
+        if datasource_type in ("prometheus", "loki"):
+            capabilities = await self.api.capabilities
+            legacy_query_api = capabilities.version is not None and capabilities.version <= VERSION_7
+
         # Certain data sources like InfluxDB 1.x, still use the `/datasources/proxy` route.
         if datasource_type == "influxdb" and datasource_dialect == "InfluxQL":
             url = f"/datasources/proxy/{datasource_id}/query"
@@ -380,20 +392,20 @@ class Datasource(Base):
             request_kwargs = {}
             send_request = await self.client.GET
 
-        elif datasource_type in ("prometheus", "loki") and Version(await self.api.version) <= VERSION_7:
+        elif legacy_query_api:
             if (
                 "queries" in request["data"]
                 and len(request["data"]["queries"]) > 0
                 and "instant" in request["data"]["queries"][0]
                 and request["data"]["queries"][0]["instant"]
             ):
-                return self.query(
+                return await self.query(
                     datasource.get("id"),
                     request["expr"],
                     request["data"]["to"],
                 )
             else:
-                return self.query_range(
+                return await self.query_range(
                     datasource.get("id"),
                     request["expr"],
                     request["data"]["from"],
@@ -493,7 +505,8 @@ class Datasource(Base):
                     message = f"Invalid response. {reason}"
 
             elif datasource_type == "loki":
-                if await self.api.version and VERSION_7 <= Version(await self.api.version) < VERSION_8:
+                capabilities = await self.api.capabilities
+                if capabilities.version is not None and VERSION_7 <= capabilities.version < VERSION_8:
                     if "status" in response and response["status"] == "success":
                         message = "Success"
                         success = True
@@ -609,7 +622,8 @@ class Datasource(Base):
         start = time.time()
         raised = True
         noop = False
-        if await self.api.version and Version(await self.api.version) >= VERSION_9:
+        capabilities = await self.api.capabilities
+        if capabilities.native_datasource_health:
             try:
                 health_native = await self.health(datasource_uid=datasource_uid)
                 logger.debug(f"Response from native data source health check: {health_native}")
@@ -4,6 +4,7 @@ https://grafana.com/docs/grafana/latest/administration/service-accounts/
 https://grafana.com/docs/grafana/latest/developers/http_api/create-api-tokens-for-org/
 """
 
+from ...pagination import DEFAULT_PERPAGE, DEFAULT_PREFETCH, page_params
 from ..base import Base
 
 
@@ -99,42 +100,34 @@ class ServiceAccount(Base):
 
     async def search(self, query=None, page=None, perpage=None):
         """
+        Search service accounts, returning a list of responses, either of the page
+        `page`, or of all pages.
 
         :return:
         """
-        list_of_sa = []
-        sa_on_page = None
         show_sa_path = "/serviceaccounts/search"
-        params = []
-        if query:
-            params.append("query=%s" % query)
-
+        params = {"query": query} if query else {}
         if page:
-            iterate = False
-            params.append("page=%s" % page)
-        else:
-            iterate = True
-            params.append("page=%s")
-            page = 1
-
-        if perpage:
-            params.append("perpage=%s" % perpage)
-
-        show_sa_path += "?"
-        show_sa_path += "&".join(params)
-        if iterate:
-            while True:
-                url = show_sa_path % page
-                sa_on_page = await self.client.GET(url)
-                list_of_sa.append(sa_on_page)
-                if not sa_on_page["serviceAccounts"]:
-                    break
-                page += 1
-        else:
-            sa_on_page = await self.client.GET(show_sa_path)
-            list_of_sa.append(sa_on_page)
+            return [await self.client.GET(show_sa_path, params=page_params(params, page, perpage))]
+        return await self.client.paginate_all(
+            show_sa_path, params=params, items_key="serviceAccounts", perpage=perpage, pages=True
+        )
+
+    async def iter_service_accounts(self, query=None, perpage=DEFAULT_PERPAGE, prefetch=DEFAULT_PREFETCH):
+        """
+        Return an iterator over all service accounts matching `query`, requesting up
+        to `prefetch` pages concurrently, once the total number is known.
 
-        return list_of_sa
+        :param query:
+        :param perpage:
+        :param prefetch:
+        :return:
+        """
+        show_sa_path = "/serviceaccounts/search"
+        params = {"query": query} if query else {}
+        return await self.client.paginate(
+            show_sa_path, params=params, items_key="serviceAccounts", perpage=perpage, prefetch=prefetch
+        )
 
     async def search_one(self, service_account_name=""):
         """
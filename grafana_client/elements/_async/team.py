@@ -1,13 +1,11 @@
 import typing as t
 import warnings
 
-from verlib2 import Version
-
+from ...capabilities import VERSION_10_2_0
 from ...model import PersonalPreferences
+from ...pagination import DEFAULT_PERPAGE, DEFAULT_PREFETCH, page_params
 from ..base import Base
 
-VERSION_10_2_0 = Version("10.2.0")
-
 
 class Teams(Base):
     def __init__(self, client, api):
@@ -17,42 +15,32 @@ class Teams(Base):
 
     async def search_teams(self, query=None, page=None, perpage=None):
         """
+        Search teams, returning either the page `page`, or the teams of all pages.
 
         :return:
         """
-        list_of_teams = []
         search_teams_path = "/teams/search"
-        params = []
-
-        if query:
-            params.append("query=%s" % query)
-
+        params = {"query": query} if query else {}
         if page:
-            iterate = False
-            params.append("page=%s" % page)
-        else:
-            iterate = True
-            params.append("page=%s")
-            page = 1
-
-        if perpage:
-            params.append("perpage=%s" % perpage)
-
-        search_teams_path += "?"
-        search_teams_path += "&".join(params)
-
-        if iterate:
-            while True:
-                teams_on_page = await self.client.GET(search_teams_path % page)
-                list_of_teams += teams_on_page["teams"]
-                if len(teams_on_page["teams"]) < teams_on_page["perPage"]:
-                    break
-                page += 1
-        else:
-            teams_on_page = await self.client.GET(search_teams_path)
-            list_of_teams += teams_on_page["teams"]
+            teams_on_page = await self.client.GET(search_teams_path, params=page_params(params, page, perpage))
+            return teams_on_page["teams"]
+        return await self.client.paginate_all(search_teams_path, params=params, items_key="teams", perpage=perpage)
 
-        return list_of_teams
+    async def iter_teams(self, query=None, perpage=DEFAULT_PERPAGE, prefetch=DEFAULT_PREFETCH):
+        """
+        Return an iterator over all teams matching `query`, requesting up to
+        `prefetch` pages concurrently, once the total number of teams is known.
+
+        :param query:
+        :param perpage:
+        :param prefetch:
+        :return:
+        """
+        search_teams_path = "/teams/search"
+        params = {"query": query} if query else {}
+        return await self.client.paginate(
+            search_teams_path, params=params, items_key="teams", perpage=perpage, prefetch=prefetch
+        )
 
     async def get_team_by_name(self, team_name):
         """
@@ -141,7 +129,7 @@ class Teams(Base):
         :return:
         """
         warnings.warn("This method is deprecated, please use `get_preferences`", DeprecationWarning)
-        return self.get_preferences(team_id=team_id)
+        return await self.get_preferences(team_id=team_id)
 
     async def update_team_preferences(self, team_id: int, preferences: t.Dict):
         """
@@ -152,7 +140,7 @@ class Teams(Base):
         """
         warnings.warn("This method is deprecated, please use `update_preferences`", DeprecationWarning)
         preferences = PersonalPreferences(**preferences)
-        return self.update_preferences(team_id=team_id, preferences=preferences)
+        return await self.update_preferences(team_id=team_id, preferences=preferences)
 
     async def get_preferences(self, team_id: int):
         """
@@ -209,7 +197,8 @@ class Teams(Base):
         :param group_id:
         :return:
         """
-        if Version(await self.api.version) < VERSION_10_2_0:
+        capabilities = await self.api.capabilities
+        if capabilities.version is not None and capabilities.version < VERSION_10_2_0:
             team_group_path = "/teams/%s/groups/%s" % (team_id, group_id)
         else:
             team_group_path = "/teams/%s/groups?groupId=%s" % (team_id, group_id)
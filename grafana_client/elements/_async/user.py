@@ -1,4 +1,5 @@
 from ...model import PersonalPreferences
+from ...pagination import DEFAULT_PERPAGE, DEFAULT_PREFETCH, page_params
 from ..base import Base
 
 
@@ -9,44 +10,31 @@ class Users(Base):
 
     async def search_users(self, query=None, page=None, perpage=None):
         """
+        Search users, returning either the page `page`, or the users of all pages.
 
         :return:
         """
-        list_of_users = []
-        users_on_page = None
         show_users_path = "/users"
-        params = []
+        params = {"query": query} if query else {}
+        if page:
+            return await self.client.GET(show_users_path, params=page_params(params, page, perpage))
+        return await self.client.paginate_all(show_users_path, params=params, perpage=perpage)
 
-        if query:
-            params.append("query=%s" % query)
+    async def iter_users(self, query=None, perpage=DEFAULT_PERPAGE, prefetch=DEFAULT_PREFETCH):
+        """
+        Return an iterator over all users matching `query`, requesting up to
+        `prefetch` pages concurrently, once the total number of users is known.
 
-        if page:
-            iterate = False
-            params.append("page=%s" % page)
-        else:
-            iterate = True
-            params.append("page=%s")
-            page = 1
-
-        if perpage:
-            params.append("perpage=%s" % perpage)
-
-        show_users_path += "?"
-        show_users_path += "&".join(params)
-
-        if iterate:
-            while True:
-                url = show_users_path % page
-                users_on_page = await self.client.GET(url)
-                if not users_on_page:
-                    break
-                list_of_users += users_on_page
-                page += 1
-        else:
-            users_on_page = await self.client.GET(show_users_path)
-            list_of_users += users_on_page
-
-        return list_of_users
+        :param query:
+        :param perpage:
+        :param prefetch:
+        :return:
+        """
+        search_users_path = "/users/search"
+        params = {"query": query} if query else {}
+        return await self.client.paginate(
+            search_users_path, params=params, items_key="users", perpage=perpage, prefetch=prefetch
+        )
 
     async def get_user(self, user_id):
         """
@@ -6,13 +6,15 @@ class AlertingProvisioning(Base):
         super(AlertingProvisioning, self).__init__(client)
         self.client = client
 
-    def get_alertrules_all(self):
+    def get_alertrules_all(self, fields=None, stream=False):
         """
         Gets all alert rules
+        @param fields: Only decode the given fields of each alert rule, like `["uid", "title"]`.
+        @param stream: Return an iterator which decodes alert rules incrementally.
         @return:
         """
         get_alertrules_all_path = "/v1/provisioning/alert-rules"
-        return self.client.GET(get_alertrules_all_path)
+        return self.client.GET(get_alertrules_all_path, fields=fields, stream=stream)
 
     def get_alertrule(self, alertrule_uid):
         """
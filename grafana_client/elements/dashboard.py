@@ -1,11 +1,9 @@
 import warnings
 
-from verlib2 import Version
-
+# Re-exported for backward compatibility, versions are checked using `GrafanaApi.capabilities`.
+from ..capabilities import VERSION_8 as VERSION_8
 from .base import Base
 
-VERSION_8 = Version("8")
-
 
 class Dashboard(Base):
     def __init__(self, client, api):
@@ -13,14 +11,15 @@ class Dashboard(Base):
         self.client = client
         self.api = api
 
-    def get_dashboard(self, dashboard_uid):
+    def get_dashboard(self, dashboard_uid, fields=None):
         """
 
         :param dashboard_uid:
+        :param fields: Only decode the given fields, like `["meta.folderUid", "dashboard.title"]`.
         :return:
         """
         get_dashboard_path = "/dashboards/uid/%s" % dashboard_uid
-        return self.client.GET(get_dashboard_path)
+        return self.client.GET(get_dashboard_path, fields=fields)
 
     def get_dashboard_by_name(self, dashboard_name):
         """
@@ -28,7 +27,8 @@ class Dashboard(Base):
         :param dashboard_name:
         :return:
         """
-        if self.api.version and Version(self.api.version) >= VERSION_8:
+        capabilities = self.api.capabilities
+        if capabilities.dashboard_by_slug is False:
             raise DeprecationWarning("Grafana 8 and higher does not support getting dashboards by slug")
         get_dashboard_path = "/dashboards/db/%s" % dashboard_name
         return self.client.GET(get_dashboard_path)
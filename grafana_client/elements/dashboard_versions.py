@@ -38,7 +38,7 @@ class DashboardVersions(Base):
         if start is not None:
             query_args["start"] = start
 
-        return self.client.GET(dashboard_versions_path, data=query_args)
+        return self.client.GET(dashboard_versions_path, params=query_args)
 
     def get_dashboard_versions_by_id(self, dashboard_id: int = None, limit: int = None, start: int = None):
         return self.get_dashboard_versions(dashboard_id=dashboard_id, limit=limit, start=start)
@@ -6,8 +6,11 @@ from typing import Dict, Optional, Tuple, Union
 from urllib.parse import urlencode
 
 from niquests import ReadTimeout
-from verlib2 import Version
 
+# `VERSION_9` and `VERSION_10_2_2` are re-exported for backward compatibility.
+from ..capabilities import VERSION_7, VERSION_8
+from ..capabilities import VERSION_9 as VERSION_9
+from ..capabilities import VERSION_10_2_2 as VERSION_10_2_2
 from ..client import GrafanaBadInputError, GrafanaClientError, GrafanaServerError
 from ..knowledge import get_healthcheck_expression, query_factory
 from ..model import DatasourceHealthResponse, DatasourceIdentifier
@@ -15,10 +18,6 @@ from .base import Base
 
 logger = logging.getLogger(__name__)
 
-VERSION_10_2_2 = Version("10.2.2")
-VERSION_9 = Version("9")
-VERSION_8 = Version("8")
-VERSION_7 = Version("7")
 VERBOSE = False
 
 
@@ -130,13 +129,15 @@ class Datasource(Base):
         update_datasource = "/datasources/uid/%s" % datasource_uid
         return self.client.PUT(update_datasource, json=datasource)
 
-    def list_datasources(self):
+    def list_datasources(self, fields=None, stream=False):
         """
 
+        :param fields: Only decode the given fields of each data source, like `["uid", "type"]`.
+        :param stream: Return an iterator which decodes data sources incrementally.
         :return:
         """
         list_datasources_path = "/datasources"
-        return self.client.GET(list_datasources_path)
+        return self.client.GET(list_datasources_path, fields=fields, stream=stream)
 
     def delete_datasource_by_id(self, datasource_id):
         """
@@ -174,7 +175,8 @@ class Datasource(Base):
         :param datasource_id:
         :return:
         """
-        if Version(self.api.version) > VERSION_10_2_2:
+        capabilities = self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3")
 
         get_datasource_path = "/datasources/%s/enable-permissions" % datasource_id
@@ -187,7 +189,8 @@ class Datasource(Base):
         :param datasource_id:
         :return:
         """
-        if Version(self.api.version) > VERSION_10_2_2:
+        capabilities = self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3")
 
         get_datasource_path = "/datasources/%s/disable-permissions" % datasource_id
@@ -200,7 +203,8 @@ class Datasource(Base):
         :param datasource_id:
         :return:
         """
-        if Version(self.api.version) > VERSION_10_2_2:
+        capabilities = self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3, please use get_rbac_datasources()")
 
         get_datasource_path = "/datasources/%s/permissions" % datasource_id
@@ -214,7 +218,8 @@ class Datasource(Base):
         :param permissions:
         :return:
         """
-        if Version(self.api.version) > VERSION_10_2_2:
+        capabilities = self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3, please use set_rbac_datasources_*()")
 
         get_datasource_path = "/datasources/%s/permissions" % datasource_id
@@ -228,7 +233,8 @@ class Datasource(Base):
         :param permission_id:
         :return:
         """
-        if Version(self.api.version) > VERSION_10_2_2:
+        capabilities = self.api.capabilities
+        if capabilities.datasource_permissions is False:
             raise NotImplementedError("Deprecated since Grafana 10.2.3, please use set_rbac_datasources_*()")
 
         get_datasource_path = "/datasources/%s/permissions/%s" % (datasource_id, permission_id)
@@ -357,6 +363,12 @@ class Datasource(Base):
 
         logger.info(f"Submitting request: {request}")
 
+        # Prometheus and Loki used a different query API up to Grafana 7.
+        legacy_query_api = False
+        if datasource_type in ("prometheus", "loki"):
+            capabilities = self.api.capabilities
+            legacy_query_api = capabilities.version is not None and capabilities.version <= VERSION_7
+
         # Certain data sources like InfluxDB 1.x, still use the `/datasources/proxy` route.
         if datasource_type == "influxdb" and datasource_dialect == "InfluxQL":
             url = f"/datasources/proxy/{datasource_id}/query"
@@ -378,7 +390,7 @@ class Datasource(Base):
             request_kwargs = {}
             send_request = self.client.GET
 
-        elif datasource_type in ("prometheus", "loki") and Version(self.api.version) <= VERSION_7:
+        elif legacy_query_api:
             if (
                 "queries" in request["data"]
                 and len(request["data"]["queries"]) > 0
@@ -491,7 +503,8 @@ class Datasource(Base):
                     message = f"Invalid response. {reason}"
 
             elif datasource_type == "loki":
-                if self.api.version and VERSION_7 <= Version(self.api.version) < VERSION_8:
+                capabilities = self.api.capabilities
+                if capabilities.version is not None and VERSION_7 <= capabilities.version < VERSION_8:
                     if "status" in response and response["status"] == "success":
                         message = "Success"
                         success = True
@@ -607,7 +620,8 @@ class Datasource(Base):
         start = time.time()
         raised = True
         noop = False
-        if self.api.version and Version(self.api.version) >= VERSION_9:
+        capabilities = self.api.capabilities
+        if capabilities.native_datasource_health:
             try:
                 health_native = self.health(datasource_uid=datasource_uid)
                 logger.debug(f"Response from native data source health check: {health_native}")
@@ -1,9 +1,7 @@
-from verlib2 import Version
-
+# Re-exported for backward compatibility, versions are checked using `GrafanaApi.capabilities`.
+from ..capabilities import VERSION_8_2 as VERSION_8_2
 from .base import Base
 
-VERSION_8_2 = Version("8.2")
-
 
 class LibraryElement(Base):
     Panel: int = 1
@@ -20,7 +18,8 @@ class LibraryElement(Base):
         :param element_uid:
         :return:
         """
-        if self.api.version and Version(self.api.version) < VERSION_8_2:
+        capabilities = self.api.capabilities
+        if capabilities.library_elements is False:
             raise DeprecationWarning("Grafana versions earlier than 8.2 do not support library elements")
         get_element_path = f"/library-elements/{element_uid}"
         return self.client.GET(get_element_path)
@@ -31,7 +30,8 @@ class LibraryElement(Base):
         :param element_name:
         :return:
         """
-        if self.api.version and Version(self.api.version) < VERSION_8_2:
+        capabilities = self.api.capabilities
+        if capabilities.library_elements is False:
             raise DeprecationWarning("Grafana versions earlier than 8.2 do not support library elements")
         get_element_path = f"/library-elements/name/{element_name}"
         return self.client.GET(get_element_path)
@@ -42,7 +42,8 @@ class LibraryElement(Base):
         :param element_uid:
         :return:
         """
-        if self.api.version and Version(self.api.version) < VERSION_8_2:
+        capabilities = self.api.capabilities
+        if capabilities.library_elements is False:
             raise DeprecationWarning("Grafana versions earlier than 8.2 do not support library elements")
         get_element_connections_path = f"/library-elements/{element_uid}/connections"
         return self.client.GET(get_element_connections_path)
@@ -59,7 +60,8 @@ class LibraryElement(Base):
         :param folder_uid:
         :return:
         """
-        if self.api.version and Version(self.api.version) < VERSION_8_2:
+        capabilities = self.api.capabilities
+        if capabilities.library_elements is False:
             raise DeprecationWarning("Grafana versions earlier than 8.2 do not support library elements")
         json: dict = dict()
         # If the model contains a "meta" entry, use the "folderUid" entry if folder_uid isn't given
@@ -101,7 +103,8 @@ class LibraryElement(Base):
         :param folder_uid:
         :return:
         """
-        if self.api.version and Version(self.api.version) < VERSION_8_2:
+        capabilities = self.api.capabilities
+        if capabilities.library_elements is False:
             raise DeprecationWarning("Grafana versions earlier than 8.2 do not support library elements")
         json: dict = dict()
         # If the model contains a "meta" entry, use the "folderUid" entry if folder_uid isn't given
@@ -142,7 +145,8 @@ class LibraryElement(Base):
         :param element_uid:
         :return:
         """
-        if self.api.version and Version(self.api.version) < VERSION_8_2:
+        capabilities = self.api.capabilities
+        if capabilities.library_elements is False:
             raise DeprecationWarning("Grafana versions earlier than 8.2 do not support library elements")
         delete_element_path = f"/library-elements/{element_uid}"
         return self.client.DELETE(delete_element_path)
@@ -171,7 +175,8 @@ class LibraryElement(Base):
 
         :return:
         """
-        if self.api.version and Version(self.api.version) < VERSION_8_2:
+        capabilities = self.api.capabilities
+        if capabilities.library_elements is False:
             raise DeprecationWarning("Grafana versions earlier than 8.2 do not support library elements")
         list_elements_path = "/library-elements"
         params = []
@@ -1,8 +1,51 @@
 from grafana_client.util import format_param_value
 
+from ..pagination import DEFAULT_PREFETCH, SEARCH_LIMIT
 from .base import Base
 
 
+def search_params(
+    query=None,
+    tag=None,
+    type_=None,
+    dashboard_ids=None,
+    dashboard_uids=None,
+    folder_ids=None,
+    folder_uids=None,
+    starred=None,
+):
+    """
+    Build the query parameters of the `/search` endpoint.
+    """
+    params = {}
+
+    if query:
+        params["query"] = query
+
+    if tag:
+        params["tag"] = format_param_value(tag)
+
+    if type_:
+        params["type"] = type_
+
+    if dashboard_ids:
+        params["dashboardIds"] = format_param_value(dashboard_ids)
+
+    if dashboard_uids:
+        params["dashboardUIDs"] = format_param_value(dashboard_uids)
+
+    if folder_ids:
+        params["folderIds"] = format_param_value(folder_ids)
+
+    if folder_uids:
+        params["folderUIDs"] = format_param_value(folder_uids)
+
+    if starred:
+        params["starred"] = starred
+
+    return params
+
+
 class Search(Base):
     def __init__(self, client):
         super(Search, self).__init__(client)
@@ -19,6 +62,9 @@ class Search(Base):
         folder_uids=None,
         starred=None,
         limit=None,
+        fields=None,
+        stream=False,
+        page=None,
     ):
         """
 
@@ -31,36 +77,101 @@ class Search(Base):
         :param folder_uids:
         :param starred:
         :param limit:
+        :param fields: Only decode the given fields of each hit, like `["uid", "title"]`.
+        :param stream: Return an iterator which decodes hits incrementally.
+        :param page: Page number, starting at 1, for paging using `limit`.
         :return:
         """
         list_dashboard_path = "/search"
-        params = {}
-
-        if query:
-            params["query"] = query
-
-        if tag:
-            params["tag"] = format_param_value(tag)
+        params = search_params(
+            query=query,
+            tag=tag,
+            type_=type_,
+            dashboard_ids=dashboard_ids,
+            dashboard_uids=dashboard_uids,
+            folder_ids=folder_ids,
+            folder_uids=folder_uids,
+            starred=starred,
+        )
 
-        if type_:
-            params["type"] = type_
-
-        if dashboard_ids:
-            params["dashboardIds"] = format_param_value(dashboard_ids)
+        if limit:
+            params["limit"] = limit
 
-        if dashboard_uids:
-            params["dashboardUIDs"] = format_param_value(dashboard_uids)
+        if page:
+            params["page"] = page
 
-        if folder_ids:
-            params["folderIds"] = format_param_value(folder_ids)
+        return self.client.GET(list_dashboard_path, params=params, fields=fields, stream=stream)
 
-        if folder_uids:
-            params["folderUIDs"] = format_param_value(folder_uids)
+    def iter_dashboards(
+        self,
+        query=None,
+        tag=None,
+        type_=None,
+        folder_uids=None,
+        starred=None,
+        partition_by=None,
+        limit=SEARCH_LIMIT,
+        concurrency=DEFAULT_PREFETCH,
+        prefetch=None,
+        fields=None,
+    ):
+        """
+        Return an iterator over all hits of a search, beyond the limit of 5000 hits
+        per request, paging using `limit` and `page`. Hits are yielded in the order
+        of completion, and de-duplicated by their UID.
 
-        if starred:
-            params["starred"] = starred
+        :param query:
+        :param tag:
+        :param type_:
+        :param folder_uids:
+        :param starred:
+        :param partition_by: Split the search into partitions, searched concurrently, either `"folder"`,
+                             searching dashboards per folder, of `folder_uids`, or of all folders otherwise,
+                             or `"type"`, searching folders and dashboards separately.
+        :param limit: Number of hits per page, at most 5000.
+        :param concurrency: Maximum number of requests in flight.
+        :param prefetch: Maximum number of pages requested ahead per partition.
+        :param fields: Only decode the given fields of each hit, `uid` is always included.
+        :return:
+        """
+        list_dashboard_path = "/search"
+        params = search_params(query=query, tag=tag, type_=type_, starred=starred)
+        if fields is not None and "uid" not in fields:
+            fields = [*fields, "uid"]
 
-        if limit:
-            params["limit"] = limit
+        partitions = [{}]
+        if partition_by == "folder":
+            params.setdefault("type", "dash-db")
+            if folder_uids is None:
+                folder_uids = [
+                    folder["uid"]
+                    for folder in self.client.paginate_partitions_all(
+                        list_dashboard_path, params={"type": "dash-folder"}, limit=limit, key="uid", fields=["uid"]
+                    )
+                ]
+                # Dashboards in the `General` folder.
+                partitions = [{"folderIds": 0}]
+            else:
+                partitions = []
+            partitions += [{"folderUIDs": folder_uid} for folder_uid in folder_uids]
+        elif partition_by == "type":
+            if folder_uids:
+                params["folderUIDs"] = format_param_value(folder_uids)
+            if not type_:
+                partitions = [{"type": "dash-folder"}, {"type": "dash-db"}]
+        elif partition_by is None:
+            if folder_uids:
+                params["folderUIDs"] = format_param_value(folder_uids)
+        else:
+            raise ValueError(f"Unknown partitioning `{partition_by}`, use either `folder` or `type`")
 
-        return self.client.GET(list_dashboard_path, params=params)
+        return self.client.paginate_partitions(
+            list_dashboard_path,
+            partitions,
+            params=params,
+            limit=limit,
+            concurrency=concurrency,
+            prefetch=prefetch,
+            key="uid",
+            fields=fields,
+        )
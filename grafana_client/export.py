@@ -0,0 +1,366 @@
+"""
+About
+=====
+Export all dashboards of a Grafana instance to an archive, fetching them
+concurrently, and resuming interrupted exports.
+
+Dashboards are enumerated using `Search.iter_dashboards()`, fetched with at most
+`concurrency` requests in flight, and written to the archive as they arrive, so
+memory use does not grow with the number of dashboards. Archives are either
+JSON Lines files, holding one `Dashboard.get_dashboard()` response per line, or
+tar files, holding one `dashboards/<uid>.json` member per dashboard. They are
+compressed using gzip when the file name ends with `.gz` or `.tgz`.
+
+Archives are append-only. A state file next to the archive records the version
+of each dashboard written, and the size of the archive at the last checkpoint.
+An interrupted export resumes from the last checkpoint, and later exports into
+the same archive only append dashboards whose version changed, comparing the
+latest version from the versions endpoint before fetching the dashboard. Use
+`read_export()` to read the most recent record of each dashboard.
+"""
+
+import dataclasses
+import gzip
+import json
+import os
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .bulk import DEFAULT_CONCURRENCY, ProgressCallback, arun_bulk, run_bulk
+from .client import GrafanaClientError
+
+STATE_VERSION = 1
+
+DEFAULT_CHECKPOINT_INTERVAL = 100
+
+# Tar archives end with two empty blocks.
+TAR_END = tarfile.NUL * tarfile.BLOCKSIZE * 2
+
+
+@dataclasses.dataclass
+class ExportResult:
+    """
+    Outcome of an export.
+
+    :param exported: Number of dashboards written to the archive.
+    :param skipped: Number of dashboards skipped, because their version did not change.
+    :param removed: UIDs of dashboards exported before, which no longer exist.
+    :param errors: Exceptions raised while fetching dashboards, per UID.
+    :param duration: Seconds the export took.
+    """
+
+    exported: int = 0
+    skipped: int = 0
+    removed: List[str] = dataclasses.field(default_factory=list)
+    errors: Dict[str, BaseException] = dataclasses.field(default_factory=dict)
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def state_path(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".state.json")
+
+
+def is_tar(path: Path) -> bool:
+    return path.name.endswith((".tar", ".tar.gz", ".tgz"))
+
+
+def is_compressed(path: Path) -> bool:
+    return path.name.endswith((".gz", ".tgz"))
+
+
+def latest_version(response: Any) -> Optional[int]:
+    """
+    Return the most recent version of a response of the versions endpoint, which
+    is a list up to Grafana 10, and an object holding `versions` since Grafana 11.
+    """
+    versions = response.get("versions") if isinstance(response, dict) else response
+    if not versions:
+        return None
+    return versions[0].get("version")
+
+
+def load_state(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load the state of the archive at `path`, if both exist and match.
+    """
+    try:
+        with state_path(path).open() as file:
+            state = json.load(file)
+    except FileNotFoundError:
+        return None
+    if state.get("version") != STATE_VERSION or not path.exists() or path.stat().st_size < state["offset"]:
+        return None
+    return state
+
+
+def save_state(path: Path, state: Dict[str, Any]):
+    target = state_path(path)
+    descriptor, name = tempfile.mkstemp(prefix=".export-", dir=target.resolve().parent)
+    temporary = Path(name)
+    try:
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(state, file)
+        temporary.replace(target)
+    except BaseException:
+        temporary.unlink()
+        raise
+
+
+class ArchiveWriter:
+    """
+    Append records to an archive, starting at `offset`. Each checkpoint ends the
+    current gzip member, so the archive can be truncated to the offset returned
+    by `checkpoint()` and appended to later, and remains a valid gzip file.
+    """
+
+    def __init__(self, path: Path, offset: int = 0):
+        self.path = path
+        self.tar = is_tar(path)
+        self.compressed = is_compressed(path)
+        self.file = path.open("r+b" if offset else "wb")
+        self.file.truncate(offset)
+        self.file.seek(offset)
+        self.stream = None
+
+    def _write(self, data: bytes):
+        if self.stream is None:
+            self.stream = gzip.GzipFile(fileobj=self.file, mode="wb") if self.compressed else self.file
+        self.stream.write(data)
+
+    def write(self, uid: str, response: Dict[str, Any]):
+        data = json.dumps(response, separators=(",", ":")).encode()
+        if not self.tar:
+            self._write(data + b"\n")
+            return
+        info = tarfile.TarInfo(f"dashboards/{uid}.json")
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._write(info.tobuf(tarfile.PAX_FORMAT))
+        self._write(data)
+        remainder = len(data) % tarfile.BLOCKSIZE
+        if remainder:
+            self._write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+
+    def checkpoint(self) -> int:
+        """
+        Make the records written so far durable, and return the size of the archive.
+        """
+        if self.stream is not None and self.compressed:
+            self.stream.close()
+        self.stream = None
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> int:
+        """
+        Close the archive, and return its size without the end of tar archives,
+        which is overwritten when appending.
+        """
+        offset = self.checkpoint()
+        if self.tar:
+            self._write(TAR_END)
+            self.checkpoint()
+        self.file.close()
+        return offset
+
+
+class DashboardExport:
+    """
+    Export dashboards to an archive, concurrently, and resumably.
+
+    >>> result = DashboardExport("dashboards.jsonl.gz", concurrency=16).run(grafana)
+    >>> result = await DashboardExport("dashboards.tar.gz").arun(grafana, partition_by="folder")
+
+    :param path: Archive file, ending with `.jsonl`, `.jsonl.gz`, `.tar`, `.tar.gz`, or `.tgz`.
+    :param concurrency: Maximum number of dashboards fetched at a time.
+    :param checkpoint_interval: Number of dashboards written between checkpoints.
+    :param skip_unchanged: Skip dashboards whose version did not change since they were exported.
+    :param progress: Callback invoked after each dashboard, with the number of dashboards done.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        skip_unchanged: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        self.path = Path(path)
+        self.concurrency = concurrency
+        self.checkpoint_interval = checkpoint_interval
+        self.skip_unchanged = skip_unchanged
+        self.progress = progress
+        self.state: Dict[str, Any] = {}
+        self.writer: Optional[ArchiveWriter] = None
+        self.result = ExportResult()
+        # Versions of the dashboards written since the last checkpoint.
+        self._pending: Dict[str, Optional[int]] = {}
+        self._seen: set = set()
+        self._started = 0.0
+
+    def _begin(self):
+        self.state = load_state(self.path) or {"version": STATE_VERSION, "offset": 0, "dashboards": {}}
+        self.writer = ArchiveWriter(self.path, self.state["offset"])
+        self.result = ExportResult()
+        self._pending = {}
+        self._seen = set()
+        self._started = time.perf_counter()
+
+    def _known_version(self, uid: str) -> Optional[int]:
+        if not self.skip_unchanged:
+            return None
+        return self.state["dashboards"].get(uid)
+
+    def _fetch(self, api, uid: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a dashboard, or return `None` when its version did not change.
+        """
+        known = self._known_version(uid)
+        if known is not None:
+            try:
+                versions = api.dashboard_versions.get_dashboard_versions(dashboard_uid=uid, limit=1)
+            except GrafanaClientError:
+                versions = None
+            if versions is not None and latest_version(versions) == known:
+                return None
+        return api.dashboard.get_dashboard(uid)
+
+    async def _afetch(self, api, uid: str) -> Optional[Dict[str, Any]]:
+        known = self._known_version(uid)
+        if known is not None:
+            try:
+                versions = await api.dashboard_versions.get_dashboard_versions(dashboard_uid=uid, limit=1)
+            except GrafanaClientError:
+                versions = None
+            if versions is not None and latest_version(versions) == known:
+                return None
+        return await api.dashboard.get_dashboard(uid)
+
+    def _record(self, result):
+        uid = result.item["uid"]
+        self._seen.add(uid)
+        if not result.ok:
+            self.result.errors[uid] = result.error
+            return
+        response = result.value
+        version = (response or {}).get("dashboard", {}).get("version")
+        if response is None or (version is not None and version == self._known_version(uid)):
+            self.result.skipped += 1
+            return
+        self.writer.write(uid, response)
+        self._pending[uid] = version
+        self.result.exported += 1
+        if len(self._pending) >= self.checkpoint_interval:
+            self._checkpoint(self.writer.checkpoint())
+
+    def _checkpoint(self, offset: int):
+        self.state["dashboards"].update(self._pending)
+        self._pending = {}
+        self.state["offset"] = offset
+        self.state["updated_at"] = time.time()
+        save_state(self.path, self.state)
+
+    def _finish(self, complete: bool, search: Dict[str, Any]) -> ExportResult:
+        """
+        Close the archive, and save the state. Dashboards missing from a complete,
+        unfiltered enumeration have been removed.
+        """
+        self._checkpoint(self.writer.close())
+        if complete and not search:
+            self.result.removed = sorted(set(self.state["dashboards"]) - self._seen)
+            for uid in self.result.removed:
+                del self.state["dashboards"][uid]
+            save_state(self.path, self.state)
+        self.result.duration = time.perf_counter() - self._started
+        return self.result
+
+    def _search(self, search: Dict[str, Any]) -> Dict[str, Any]:
+        return {"type_": "dash-db", "fields": ["uid"], **search}
+
+    def run(self, api, **search) -> ExportResult:
+        """
+        Export the dashboards using the synchronous API. Keyword arguments are
+        passed to `Search.iter_dashboards()`, for selecting or partitioning them.
+        """
+        self._begin()
+        complete = False
+        try:
+            hits = api.search.iter_dashboards(**self._search(search))
+            results = run_bulk(
+                lambda hit: self._fetch(api, hit["uid"]),
+                hits,
+                concurrency=self.concurrency,
+                ordered=False,
+                progress=self.progress,
+            )
+            for result in results:
+                self._record(result)
+            complete = True
+        finally:
+            self._finish(complete, search)
+        return self.result
+
+    async def arun(self, api, **search) -> ExportResult:
+        """
+        Export the dashboards using the asynchronous API.
+        """
+        self._begin()
+        complete = False
+        try:
+            hits = await api.search.iter_dashboards(**self._search(search))
+            results = arun_bulk(
+                lambda hit: self._afetch(api, hit["uid"]),
+                hits,
+                concurrency=self.concurrency,
+                ordered=False,
+                progress=self.progress,
+            )
+            async for result in results:
+                self._record(result)
+            complete = True
+        finally:
+            self._finish(complete, search)
+        return self.result
+
+
+def _read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    if is_tar(path):
+        with tarfile.open(path, "r:gz" if is_compressed(path) else "r:") as archive:
+            for member in archive:
+                if member.isfile():
+                    yield json.load(archive.extractfile(member))
+        return
+    with gzip.open(path, "rb") if is_compressed(path) else path.open("rb") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_export(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the most recent record of each dashboard of an archive, as returned by
+    `Dashboard.get_dashboard()`, omitting dashboards which have been removed,
+    according to the state file. The archive is read twice, in order to keep
+    memory use independent of the size of the dashboards.
+    """
+    path = Path(path)
+    state = load_state(path)
+    latest: Dict[str, int] = {}
+    for index, record in enumerate(_read_records(path)):
+        latest[record["dashboard"]["uid"]] = index
+    if state is not None:
+        latest = {uid: index for uid, index in latest.items() if uid in state["dashboards"]}
+    wanted = set(latest.values())
+    for index, record in enumerate(_read_records(path)):
+        if index in wanted:
+            yield record
@@ -0,0 +1,244 @@
+"""
+About
+=====
+Run operations across many Grafana instances concurrently, for example one
+instance per tenant.
+
+A fleet holds one `GrafanaApi` or `AsyncGrafanaApi` instance per target, built
+from a list of URLs, or from environment variables, sharing the same options,
+like connection pool settings, timeouts, and retry policies. Operations are
+functions receiving an API instance. They run on a limited number of instances
+at a time, each with an optional timeout, and their results and failures are
+aggregated per instance name.
+"""
+
+import dataclasses
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Mapping, Optional, Union
+from urllib.parse import urlparse
+
+from .api import AsyncGrafanaApi, GrafanaApi
+from .bulk import ProgressCallback, arun_bulk, run_bulk
+
+DEFAULT_FLEET_CONCURRENCY = 16
+
+
+class GrafanaFleetError(Exception):
+    """
+    Raised by `FleetResult.raise_for_errors()`, carrying the errors per instance name.
+    """
+
+    def __init__(self, errors: Dict[str, BaseException]):
+        self.errors = errors
+        names = ", ".join(str(name) for name in sorted(errors))
+        super().__init__(f"Operation failed on {len(errors)} instances: {names}")
+
+
+@dataclasses.dataclass
+class FleetResult:
+    """
+    Aggregated outcome of an operation across a fleet.
+
+    :param values: Return values of the operation, per instance name.
+    :param errors: Exceptions raised by the operation, per instance name.
+    :param durations: Seconds the operation took, per instance name.
+    """
+
+    values: Dict[str, Any] = dataclasses.field(default_factory=dict)
+    errors: Dict[str, BaseException] = dataclasses.field(default_factory=dict)
+    durations: Dict[str, float] = dataclasses.field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def raise_for_errors(self) -> None:
+        if self.errors:
+            raise GrafanaFleetError(self.errors)
+
+
+def instance_name(url: str) -> str:
+    """
+    Derive the name of an instance from its URL, omitting the scheme and credentials.
+    """
+    url = urlparse(url)
+    name = url.hostname or ""
+    if url.port is not None:
+        name += f":{url.port}"
+    return name + url.path.rstrip("/")
+
+
+def urls_from_env(variable: str = "GRAFANA_FLEET_URLS") -> Dict[str, str]:
+    """
+    Read instance URLs, separated by whitespace or commas, from an environment
+    variable. Entries may be prefixed with a name, like `tenant-a=https://...`.
+    """
+    urls = {}
+    for entry in re.split(r"[\s,]+", os.environ.get(variable, "").strip()):
+        if not entry:
+            continue
+        name, separator, url = entry.partition("=")
+        if not separator or "://" in name:
+            name, url = instance_name(entry), entry
+        urls[name] = url
+    return urls
+
+
+class GrafanaFleet:
+    """
+    Run operations across many `GrafanaApi` instances concurrently, on a thread pool.
+
+    >>> fleet = GrafanaFleet.from_urls(urls, connection=ConnectionSettings(pool_maxsize=4), timeout=10)
+    >>> result = fleet.run(lambda grafana: grafana.health.check(), concurrency=32, timeout=30)
+    >>> result.values, result.errors
+    """
+
+    api_class = GrafanaApi
+
+    def __init__(self, apis: Mapping[str, GrafanaApi]):
+        self.apis: Dict[str, GrafanaApi] = dict(apis)
+
+    @classmethod
+    def from_urls(cls, urls: Union[Iterable[str], Mapping[str, str]], **kwargs):
+        """
+        Create a fleet from instance URLs, either a mapping of names to URLs, or an
+        iterable of URLs, named by `instance_name()`. Keyword arguments, like
+        `credential`, `timeout`, `retry`, or `connection`, are passed to `from_url()`
+        of each instance.
+        """
+        if not isinstance(urls, Mapping):
+            named = {}
+            for url in urls:
+                name = instance_name(url)
+                if name in named:
+                    raise ValueError(f"Duplicate instance name `{name}`, use a mapping of names to URLs")
+                named[name] = url
+            urls = named
+        return cls({name: cls.api_class.from_url(url, **kwargs) for name, url in urls.items()})
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+        Create a fleet from the instance URLs in the `GRAFANA_FLEET_URLS`
+        environment variable. `GRAFANA_TOKEN` is used as a shared credential, and
+        the other options are read like `GrafanaApi.from_env()` does.
+        """
+        urls = urls_from_env()
+        if not urls:
+            raise ValueError("No instance URLs defined in `GRAFANA_FLEET_URLS` environment variable")
+        if "credential" not in kwargs and os.environ.get("GRAFANA_TOKEN"):
+            kwargs["credential"] = os.environ["GRAFANA_TOKEN"]
+        return cls.from_urls(urls, **cls.api_class.options_from_env(**kwargs))
+
+    def __len__(self) -> int:
+        return len(self.apis)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.apis)
+
+    def __getitem__(self, name: str) -> GrafanaApi:
+        return self.apis[name]
+
+    def run(
+        self,
+        operation: Callable[[GrafanaApi], Any],
+        concurrency: int = DEFAULT_FLEET_CONCURRENCY,
+        timeout: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> FleetResult:
+        """
+        Invoke `operation` with the API of each instance, on at most `concurrency`
+        instances at a time, and return the aggregated results and failures.
+        Operations taking longer than `timeout` seconds fail with `TimeoutError`.
+        They are abandoned, and complete in the background, bounded by the request
+        timeout of the instance's client.
+        """
+
+        def call(name: str):
+            start = time.perf_counter()
+            try:
+                return operation(self.apis[name])
+            finally:
+                result.durations[name] = time.perf_counter() - start
+
+        result = FleetResult()
+        outcomes = run_bulk(
+            call, list(self.apis), concurrency=concurrency, ordered=False, progress=progress, timeout=timeout
+        )
+        for outcome in outcomes:
+            if outcome.ok:
+                result.values[outcome.item] = outcome.value
+            else:
+                result.errors[outcome.item] = outcome.error
+        return result
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        for api in self.apis.values():
+            api.close(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class AsyncGrafanaFleet(GrafanaFleet):
+    """
+    Run operations across many `AsyncGrafanaApi` instances concurrently, on the event loop.
+
+    >>> fleet = AsyncGrafanaFleet.from_urls(urls)
+    >>> result = await fleet.run(lambda grafana: grafana.health.check(), concurrency=32, timeout=30)
+    """
+
+    api_class = AsyncGrafanaApi
+
+    async def run(
+        self,
+        operation: Callable[[AsyncGrafanaApi], Awaitable[Any]],
+        concurrency: int = DEFAULT_FLEET_CONCURRENCY,
+        timeout: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> FleetResult:
+        """
+        Await `operation` with the API of each instance, on at most `concurrency`
+        instances at a time, and return the aggregated results and failures.
+        Operations taking longer than `timeout` seconds are cancelled, and fail
+        with `asyncio.TimeoutError`.
+        """
+
+        async def call(name: str):
+            start = time.perf_counter()
+            try:
+                return await operation(self.apis[name])
+            finally:
+                result.durations[name] = time.perf_counter() - start
+
+        result = FleetResult()
+        outcomes = arun_bulk(
+            call, list(self.apis), concurrency=concurrency, ordered=False, progress=progress, timeout=timeout
+        )
+        async for outcome in outcomes:
+            if outcome.ok:
+                result.values[outcome.item] = outcome.value
+            else:
+                result.errors[outcome.item] = outcome.error
+        return result
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        for api in self.apis.values():
+            await api.close(timeout)
+
+    def __enter__(self):
+        raise TypeError("Use `async with` for `AsyncGrafanaFleet`")
+
+    def __exit__(self, exc_type, exc_value, traceback):  # pragma: no cover
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
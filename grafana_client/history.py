@@ -0,0 +1,469 @@
+"""
+About
+=====
+Mirror the version history of dashboards into a local SQLite database, for
+auditing changes without walking the versions endpoints of every dashboard.
+
+Each refresh enumerates the dashboards using `Search.iter_dashboards()`, and
+only fetches versions newer than the most recent version mirrored per
+dashboard, for at most `concurrency` dashboards at a time. Dashboards which did
+not change cost a single request for their most recent version number.
+
+Each mirrored version records the data sources its dashboard references, and
+the data sources it touched, referenced by the panels, or the other parts of
+the dashboard, it changed compared to the previous version, see
+`grafana_client.diff`. Queries, like all versions touching a data source within
+the last week, run locally on indexed tables.
+
+When refreshing with `limit`, older versions exceeding the limit are skipped for
+good. The first version mirrored after such a gap, like the first version of a
+dashboard, has no recorded number of changes, and counts as touching all data
+sources it references, instead of being compared across the gap.
+"""
+
+import dataclasses
+import datetime
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .bulk import DEFAULT_CONCURRENCY, ProgressCallback, arun_bulk, run_bulk
+from .diff import ARRAY_KEYS, Change, ChangePath, diff_dashboards, item_key, version_entries
+from .importer import references
+
+SCHEMA_VERSION = 1
+
+# Number of version entries requested per page, when listing versions.
+DEFAULT_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dashboards (
+    uid TEXT PRIMARY KEY,
+    title TEXT,
+    folder_uid TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    dashboard_uid TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    created TEXT,
+    created_at REAL,
+    created_by TEXT,
+    message TEXT,
+    changes INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (dashboard_uid, version)
+);
+CREATE INDEX IF NOT EXISTS versions_created_at ON versions (created_at);
+CREATE TABLE IF NOT EXISTS datasources (
+    datasource_uid TEXT NOT NULL,
+    dashboard_uid TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    touched INTEGER NOT NULL,
+    PRIMARY KEY (datasource_uid, dashboard_uid, version)
+);
+"""
+
+# A point in time, as seconds since the epoch, a datetime, or a duration before now.
+Moment = Union[float, datetime.datetime, datetime.timedelta]
+
+
+@dataclasses.dataclass
+class HistorySyncResult:
+    """
+    Outcome of refreshing the mirror.
+
+    :param dashboards: Number of dashboards inspected.
+    :param versions: Number of versions mirrored.
+    :param errors: Exceptions raised while fetching versions, per dashboard UID.
+    :param duration: Seconds the refresh took.
+    """
+
+    dashboards: int = 0
+    versions: int = 0
+    errors: Dict[str, BaseException] = dataclasses.field(default_factory=dict)
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the `created` timestamps of versions, like `2024-04-14T10:00:00Z`.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def to_timestamp(moment: Moment) -> float:
+    if isinstance(moment, datetime.timedelta):
+        return time.time() - moment.total_seconds()
+    if isinstance(moment, datetime.datetime):
+        return moment.timestamp()
+    return float(moment)
+
+
+def resolve(document: Any, path: ChangePath) -> Tuple[Any, Optional[Any]]:
+    """
+    Follow a change path within a document, and return the value it leads to,
+    and the innermost panel containing it, both `None` when not found.
+    """
+    panel = None
+    value = document
+    parent: Optional[Union[str, int]] = None
+    for segment in path:
+        if isinstance(value, dict):
+            value = value.get(segment)
+        elif isinstance(value, list) and isinstance(segment, int):
+            value = value[segment] if segment < len(value) else None
+        elif isinstance(value, list):
+            fields = ARRAY_KEYS.get(parent, ())
+            value = next((item for item in value if item_key(item, fields) == segment), None)
+        else:
+            value = None
+        if value is None:
+            break
+        if parent == "panels":
+            panel = value
+        parent = segment
+    return value, panel
+
+
+def touched_datasources(old: Dict[str, Any], new: Dict[str, Any], changes: Iterable[Change]) -> Set[str]:
+    """
+    Return the UIDs of the data sources referenced by the panels containing the
+    changes, before or after, or by the changed values outside of panels.
+    """
+    uids: Set[str] = set()
+    for change in changes:
+        for document, value in ((old, change.old), (new, change.new)):
+            _, panel = resolve(document, change.path)
+            uids |= references(panel if panel is not None else value)[1]
+    return uids
+
+
+class VersionHistory:
+    """
+    Local mirror of the version history of dashboards, stored in SQLite.
+
+    >>> history = VersionHistory("history.sqlite")
+    >>> history.refresh(grafana, concurrency=16)
+    >>> history.versions(datasource_uid="prometheus", since=datetime.timedelta(days=7))
+
+    :param path: Database file, or `:memory:`.
+    :param page_size: Number of version entries requested per page.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", page_size: int = DEFAULT_PAGE_SIZE):
+        self.path = path
+        self.page_size = page_size
+        self.connection = sqlite3.connect(str(path))
+        self.connection.row_factory = sqlite3.Row
+        if str(path) != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError(f"Unsupported version history schema version: {version}")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def latest_versions(self) -> Dict[str, int]:
+        """
+        Return the most recent version mirrored, per dashboard UID.
+        """
+        return {row["uid"]: row["version"] for row in self.connection.execute("SELECT uid, version FROM dashboards")}
+
+    def _next_page(self, numbers: List[int], response: Any, latest: int, limit: Optional[int], size: int) -> bool:
+        """
+        Collect the numbers of the versions newer than `latest` from a page of
+        version entries, and return whether to request the next page.
+        """
+        entries = version_entries(response)
+        fresh = [entry["version"] for entry in entries if entry["version"] > latest]
+        known = set(numbers)
+        added = [number for number in fresh if number not in known]
+        numbers.extend(added)
+        if limit is not None and len(numbers) >= limit:
+            return False
+        # Grafana 11 ignores `start`, and returns the same page again.
+        return bool(added) and len(fresh) == len(entries) == size
+
+    def _selection(self, numbers: List[int], limit: Optional[int]) -> List[int]:
+        numbers = sorted(numbers)
+        return numbers[-limit:] if limit is not None else numbers
+
+    def _fetch(self, api, uid: str, latest: int, limit: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Fetch the versions of a dashboard newer than `latest`, oldest first.
+        """
+        numbers: List[int] = []
+        # Probe the most recent version first, which is all it takes for unchanged dashboards.
+        size = 1 if latest else self.page_size
+        while True:
+            response = api.dashboard_versions.get_dashboard_versions(
+                dashboard_uid=uid, limit=size, start=len(numbers) if numbers else None
+            )
+            if not self._next_page(numbers, response, latest, limit, size):
+                break
+            size = self.page_size
+        return [
+            api.dashboard_versions.get_dashboard_version(dashboard_uid=uid, version_id=number)
+            for number in self._selection(numbers, limit)
+        ]
+
+    async def _afetch(self, api, uid: str, latest: int, limit: Optional[int]) -> List[Dict[str, Any]]:
+        numbers: List[int] = []
+        size = 1 if latest else self.page_size
+        while True:
+            response = await api.dashboard_versions.get_dashboard_versions(
+                dashboard_uid=uid, limit=size, start=len(numbers) if numbers else None
+            )
+            if not self._next_page(numbers, response, latest, limit, size):
+                break
+            size = self.page_size
+        return [
+            await api.dashboard_versions.get_dashboard_version(dashboard_uid=uid, version_id=number)
+            for number in self._selection(numbers, limit)
+        ]
+
+    def _previous(self, uid: str) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        row = self.connection.execute(
+            "SELECT version, data FROM versions WHERE dashboard_uid = ? ORDER BY version DESC LIMIT 1", (uid,)
+        ).fetchone()
+        return (row["version"], json.loads(row["data"])) if row is not None else (None, None)
+
+    def store(self, hit: Dict[str, Any], versions: List[Dict[str, Any]]) -> int:
+        """
+        Store the versions of a dashboard, oldest first, and return how many.
+        """
+        uid = hit["uid"]
+        number, previous = self._previous(uid) if versions else (None, None)
+        with self.connection:
+            for version in versions:
+                data = version.get("data") or {}
+                referenced = references(data)[1]
+                # Versions are numbered consecutively, so skipped versions leave a gap.
+                if previous is None or version["version"] != number + 1:
+                    changes = None
+                    touched = referenced
+                else:
+                    diff = diff_dashboards(previous, data)
+                    changes = len(diff)
+                    touched = touched_datasources(previous, data, diff)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        uid,
+                        version["version"],
+                        version.get("created"),
+                        parse_timestamp(version.get("created")),
+                        version.get("createdBy"),
+                        version.get("message"),
+                        changes,
+                        json.dumps(data, separators=(",", ":")),
+                    ),
+                )
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO datasources VALUES (?, ?, ?, ?)",
+                    [
+                        (datasource_uid, uid, version["version"], datasource_uid in touched)
+                        for datasource_uid in referenced | touched
+                    ],
+                )
+                number, previous = version["version"], data
+            self.connection.execute(
+                "INSERT OR REPLACE INTO dashboards VALUES"
+                " (?, ?, ?, MAX(?, COALESCE((SELECT version FROM dashboards WHERE uid = ?), 0)), ?)",
+                (
+                    uid,
+                    hit.get("title"),
+                    hit.get("folderUid"),
+                    max((version["version"] for version in versions), default=0),
+                    uid,
+                    time.time(),
+                ),
+            )
+        return len(versions)
+
+    def _items(self, hits: Iterable[Dict[str, Any]]):
+        latest = self.latest_versions()
+        for hit in hits:
+            yield hit, latest.get(hit["uid"], 0)
+
+    async def _aitems(self, hits: AsyncIterable[Dict[str, Any]]):
+        latest = self.latest_versions()
+        async for hit in hits:
+            yield hit, latest.get(hit["uid"], 0)
+
+    def _record(self, outcome, result: HistorySyncResult):
+        hit, _ = outcome.item
+        result.dashboards += 1
+        if outcome.ok:
+            result.versions += self.store(hit, outcome.value)
+        else:
+            result.errors[hit["uid"]] = outcome.error
+
+    def refresh(
+        self,
+        api,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        limit: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        **search,
+    ) -> HistorySyncResult:
+        """
+        Mirror the versions added since the last refresh, using the synchronous API.
+
+        :param api: A `GrafanaApi` instance.
+        :param concurrency: Maximum number of dashboards fetched at a time.
+        :param limit: Maximum number of versions mirrored per dashboard and refresh, the most recent ones.
+                      Skipped versions are not mirrored by later refreshes either.
+        :param progress: Callback invoked after each dashboard.
+        :param search: Passed to `Search.iter_dashboards()`, for selecting dashboards.
+        """
+        result = HistorySyncResult()
+        started = time.perf_counter()
+        hits = api.search.iter_dashboards(**{"type_": "dash-db", "fields": ["uid", "title", "folderUid"], **search})
+        outcomes = run_bulk(
+            lambda item: self._fetch(api, item[0]["uid"], item[1], limit),
+            self._items(hits),
+            concurrency=concurrency,
+            ordered=False,
+            progress=progress,
+        )
+        for outcome in outcomes:
+            self._record(outcome, result)
+        result.duration = time.perf_counter() - started
+        return result
+
+    async def arefresh(
+        self,
+        api,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        limit: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        **search,
+    ) -> HistorySyncResult:
+        """
+        Mirror the versions added since the last refresh, using the asynchronous API.
+        """
+        result = HistorySyncResult()
+        started = time.perf_counter()
+        hits = await api.search.iter_dashboards(
+            **{"type_": "dash-db", "fields": ["uid", "title", "folderUid"], **search}
+        )
+        outcomes = arun_bulk(
+            lambda item: self._afetch(api, item[0]["uid"], item[1], limit),
+            self._aitems(hits),
+            concurrency=concurrency,
+            ordered=False,
+            progress=progress,
+        )
+        async for outcome in outcomes:
+            self._record(outcome, result)
+        result.duration = time.perf_counter() - started
+        return result
+
+    def versions(
+        self,
+        dashboard_uid: Optional[str] = None,
+        datasource_uid: Optional[str] = None,
+        touched: bool = True,
+        since: Optional[Moment] = None,
+        until: Optional[Moment] = None,
+        created_by: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the mirrored versions, most recent first, without their data.
+
+        :param dashboard_uid: Only versions of this dashboard.
+        :param datasource_uid: Only versions touching this data source, or referencing it, when `touched` is false.
+        :param touched: Whether to match versions changing panels using `datasource_uid`, or all referencing it.
+        :param since: Only versions created since, as a timestamp, a datetime, or a duration before now.
+        :param until: Only versions created before.
+        :param created_by: Only versions saved by this user.
+        :param limit: Maximum number of versions.
+        """
+        query = (
+            "SELECT v.dashboard_uid, d.title, d.folder_uid, v.version, v.created, v.created_by, v.message, v.changes"
+            " FROM versions v LEFT JOIN dashboards d ON d.uid = v.dashboard_uid"
+        )
+        conditions = []
+        params: List[Any] = []
+        if datasource_uid is not None:
+            query += (
+                " JOIN datasources s ON s.dashboard_uid = v.dashboard_uid AND s.version = v.version"
+                " AND s.datasource_uid = ?"
+            )
+            params.append(datasource_uid)
+            if touched:
+                query += " AND s.touched = 1"
+        if dashboard_uid is not None:
+            conditions.append("v.dashboard_uid = ?")
+            params.append(dashboard_uid)
+        if since is not None:
+            conditions.append("v.created_at >= ?")
+            params.append(to_timestamp(since))
+        if until is not None:
+            conditions.append("v.created_at < ?")
+            params.append(to_timestamp(until))
+        if created_by is not None:
+            conditions.append("v.created_by = ?")
+            params.append(created_by)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY v.created_at DESC, v.dashboard_uid, v.version DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def get_version(self, dashboard_uid: str, version: int) -> Optional[Dict[str, Any]]:
+        """
+        Return the dashboard model of a mirrored version.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM versions WHERE dashboard_uid = ? AND version = ?", (dashboard_uid, version)
+        ).fetchone()
+        return json.loads(row["data"]) if row is not None else None
+
+    def changes(self, dashboard_uid: str, version: int) -> List[Change]:
+        """
+        Return the changes of a mirrored version, compared to the previous mirrored
+        version, which is older than the preceding version after a gap.
+        """
+        rows = self.connection.execute(
+            "SELECT data FROM versions WHERE dashboard_uid = ? AND version <= ? ORDER BY version DESC LIMIT 2",
+            (dashboard_uid, version),
+        ).fetchall()
+        if not rows:
+            raise LookupError(f"Version {version} of dashboard {dashboard_uid} has not been mirrored")
+        new = json.loads(rows[0]["data"])
+        old = json.loads(rows[1]["data"]) if len(rows) > 1 else {}
+        return diff_dashboards(old, new)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "dashboards": self.connection.execute("SELECT COUNT(*) FROM dashboards").fetchone()[0],
+            "versions": self.connection.execute("SELECT COUNT(*) FROM versions").fetchone()[0],
+        }
@@ -0,0 +1,159 @@
+"""
+About
+=====
+Request lifecycle hooks for `GrafanaClient` and `AsyncGrafanaClient`.
+
+Callbacks are invoked for each attempt of a request, including retries:
+
+- `before_request`: Before sending the request.
+- `after_response`: After receiving a response, whatever its status code.
+- `on_error`: When an attempt fails, because of an error status code, a timeout,
+  a connection error, or any other exception, including the cancellation of a
+  coroutine.
+
+All callbacks receive a `RequestInfo` object, and are invoked synchronously,
+also from `AsyncGrafanaClient`, so they should return quickly. Exceptions
+raised by callbacks are logged, and do not affect the request.
+"""
+
+import dataclasses
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from .routes import route_template
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ["before_request", "after_response", "on_error"]
+
+
+@dataclasses.dataclass
+class RequestTimings:
+    """
+    Timings of a request attempt in seconds.
+
+    :param connect: Time taken to establish the connection, as reported by niquests.
+    :param ttfb: Time until the response headers have been received.
+    :param total: Time until the response has been received completely. For
+                  streamed responses, this is the time until the headers have
+                  been received.
+    """
+
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    total: Optional[float] = None
+
+
+@dataclasses.dataclass
+class RequestInfo:
+    """
+    Details about a request attempt, passed to all hook callbacks.
+    """
+
+    verb: str
+    url: str
+    route: str
+    attempt: int
+    organization_id: Optional[int] = None
+    status_code: Optional[int] = None
+    timings: RequestTimings = dataclasses.field(default_factory=RequestTimings)
+    request_bytes: Optional[int] = None
+    response_bytes: Optional[int] = None
+    error: Optional[BaseException] = None
+    started: float = 0.0
+
+
+Callback = Callable[[RequestInfo], None]
+
+
+class RequestHooks:
+    """
+    Registry of request lifecycle callbacks.
+
+    >>> hooks = RequestHooks(after_response=[lambda info: print(info.route, info.timings.total)])
+    >>> hooks.register("on_error", lambda info: print(info.error))
+    """
+
+    def __init__(
+        self,
+        before_request: Optional[List[Callback]] = None,
+        after_response: Optional[List[Callback]] = None,
+        on_error: Optional[List[Callback]] = None,
+    ):
+        self.callbacks: Dict[str, List[Callback]] = {
+            "before_request": list(before_request or []),
+            "after_response": list(after_response or []),
+            "on_error": list(on_error or []),
+        }
+
+    def register(self, event: str, callback: Callback) -> Callback:
+        """
+        Register a callback for one of the `before_request`, `after_response`, or `on_error` events.
+        """
+        if event not in self.callbacks:
+            raise ValueError(f"Unknown hook event `{event}`, use one of {', '.join(EVENTS)}")
+        self.callbacks[event].append(callback)
+        return callback
+
+    def unregister(self, event: str, callback: Callback) -> None:
+        self.callbacks[event].remove(callback)
+
+    def _dispatch(self, event: str, info: RequestInfo):
+        for callback in self.callbacks[event]:
+            try:
+                callback(info)
+            except Exception:
+                logger.exception(f"Invoking `{event}` hook failed")
+
+    def before_request(
+        self, verb: str, url: str, attempt: int, organization_id: Optional[int], json=None, data=None
+    ) -> RequestInfo:
+        if json is None and data is None:
+            request_bytes = 0
+        else:
+            # The size of JSON bodies encoded by niquests is known after sending the request.
+            request_bytes = body_size(data) if json is None else None
+        info = RequestInfo(
+            verb=verb.upper(),
+            url=url,
+            route=route_template(url),
+            attempt=attempt,
+            organization_id=organization_id,
+            request_bytes=request_bytes,
+        )
+        self._dispatch("before_request", info)
+        info.started = time.perf_counter()
+        return info
+
+    def after_response(self, info: RequestInfo, response, streamed: bool = False) -> None:
+        info.timings.total = time.perf_counter() - info.started
+        info.status_code = response.status_code
+        elapsed = getattr(response, "elapsed", None)
+        if elapsed:
+            info.timings.ttfb = elapsed.total_seconds()
+        conn_info = getattr(response, "conn_info", None)
+        if conn_info is not None and conn_info.established_latency is not None:
+            info.timings.connect = conn_info.established_latency.total_seconds()
+        request = getattr(response, "request", None)
+        if request is not None:
+            info.request_bytes = body_size(request.body) if request.body is not None else 0
+        if not streamed:
+            info.response_bytes = len(response.content or b"")
+        elif "Content-Length" in response.headers:
+            info.response_bytes = int(response.headers["Content-Length"])
+        self._dispatch("after_response", info)
+
+    def on_error(self, info: RequestInfo, error: BaseException) -> None:
+        if info.timings.total is None:
+            info.timings.total = time.perf_counter() - info.started
+        info.error = error
+        self._dispatch("on_error", info)
+
+
+def body_size(body) -> Optional[int]:
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return None
@@ -0,0 +1,340 @@
+"""
+About
+=====
+Import data sources, folders, library panels, and dashboards in the order of
+their dependencies, concurrently.
+
+An `ImportPlan` collects the objects to import, and derives the dependencies
+between them: nested folders depend on their parent folder, library panels
+and dashboards on their folder, and both on the data sources they reference
+by UID, and dashboards on the library panels they use. Dependencies on
+objects which are not part of the plan are assumed to exist already.
+
+The objects are grouped into levels, where each object only depends on objects
+of earlier levels. Levels are imported one after another, and the objects of
+each level concurrently, on a thread pool for `GrafanaApi`, or as tasks on the
+event loop for `AsyncGrafanaApi`. Failures are recorded per object, and only
+skip the objects depending on the failed ones, without stopping the import.
+"""
+
+import collections
+import dataclasses
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .bulk import DEFAULT_CONCURRENCY, ProgressCallback, arun_bulk, run_bulk
+from .client import GrafanaClientError
+from .export import read_export
+
+DATASOURCE = "datasource"
+FOLDER = "folder"
+LIBRARY_ELEMENT = "library_element"
+DASHBOARD = "dashboard"
+
+# Status codes of creating objects which already exist.
+CONFLICT_STATUS_CODES = (409, 412)
+
+# Kind and UID of an object.
+Key = Tuple[str, str]
+
+
+@dataclasses.dataclass
+class ImportObject:
+    """
+    An object to import.
+
+    :param kind: One of `datasource`, `folder`, `library_element`, or `dashboard`.
+    :param uid: UID of the object.
+    :param payload: The object, as returned by the corresponding `get_*` element method.
+    :param dependencies: Kinds and UIDs of the objects which need to exist before.
+    """
+
+    kind: str
+    uid: str
+    payload: Dict[str, Any]
+    dependencies: Set[Key] = dataclasses.field(default_factory=set)
+
+    @property
+    def key(self) -> Key:
+        return self.kind, self.uid
+
+
+@dataclasses.dataclass
+class ImportResult:
+    """
+    Outcome of an import.
+
+    :param imported: Kinds and UIDs of the objects imported successfully.
+    :param errors: Exceptions raised while importing objects, per kind and UID.
+    :param skipped: Objects not imported, per kind and UID, with the failed dependency blocking them.
+    :param levels: Number of dependency levels.
+    :param duration: Seconds the import took.
+    """
+
+    imported: List[Key] = dataclasses.field(default_factory=list)
+    errors: Dict[Key, BaseException] = dataclasses.field(default_factory=dict)
+    skipped: Dict[Key, Key] = dataclasses.field(default_factory=dict)
+    levels: int = 0
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.skipped
+
+
+def references(model: Any) -> Tuple[Set[str], Set[str]]:
+    """
+    Return the UIDs of the library panels, and of the data sources, referenced
+    anywhere within a dashboard or panel model.
+    """
+    library_panels: Set[str] = set()
+    datasources: Set[str] = set()
+    stack = [model]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+            continue
+        if not isinstance(value, dict):
+            continue
+        for name, item in value.items():
+            if isinstance(item, dict) and isinstance(item.get("uid"), str):
+                if name == "libraryPanel":
+                    library_panels.add(item["uid"])
+                elif name == "datasource":
+                    datasources.add(item["uid"])
+            if isinstance(item, (dict, list)):
+                stack.append(item)
+    return library_panels, datasources
+
+
+class ImportPlan:
+    """
+    Import objects in the order of their dependencies, concurrently.
+
+    >>> plan = ImportPlan()
+    >>> plan.add_folder({"uid": "team-a", "title": "Team A"})
+    >>> plan.add_dashboard(grafana.dashboard.get_dashboard(uid))
+    >>> result = plan.run(grafana, concurrency=16)
+    """
+
+    def __init__(self):
+        self.objects: Dict[Key, ImportObject] = {}
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def _add(self, kind: str, uid: str, payload: Dict[str, Any], dependencies: Set[Key]) -> ImportObject:
+        if not uid:
+            raise ValueError(f"Unable to import {kind} without UID")
+        item = ImportObject(kind=kind, uid=uid, payload=payload, dependencies=dependencies)
+        self.objects[item.key] = item
+        return item
+
+    def add_datasource(self, datasource: Dict[str, Any]) -> ImportObject:
+        return self._add(DATASOURCE, datasource.get("uid"), datasource, set())
+
+    def add_folder(self, folder: Dict[str, Any]) -> ImportObject:
+        parent_uid = folder.get("parentUid")
+        dependencies = {(FOLDER, parent_uid)} if parent_uid else set()
+        return self._add(FOLDER, folder.get("uid"), folder, dependencies)
+
+    def add_library_element(self, element: Dict[str, Any]) -> ImportObject:
+        _, datasources = references(element.get("model"))
+        dependencies = {(DATASOURCE, uid) for uid in datasources}
+        if element.get("folderUid"):
+            dependencies.add((FOLDER, element["folderUid"]))
+        return self._add(LIBRARY_ELEMENT, element.get("uid"), element, dependencies)
+
+    def add_dashboard(self, dashboard: Dict[str, Any], folder_uid: Optional[str] = None) -> ImportObject:
+        """
+        Add a dashboard, either a response of `Dashboard.get_dashboard()`, or a
+        dashboard model, located in the folder `folder_uid`.
+        """
+        if "dashboard" in dashboard:
+            folder_uid = folder_uid or dashboard.get("folderUid") or dashboard.get("meta", {}).get("folderUid")
+            model = dashboard["dashboard"]
+        else:
+            model = dashboard
+        library_panels, datasources = references(model)
+        dependencies = {(LIBRARY_ELEMENT, uid) for uid in library_panels} | {(DATASOURCE, uid) for uid in datasources}
+        if folder_uid:
+            dependencies.add((FOLDER, folder_uid))
+        return self._add(DASHBOARD, model.get("uid"), {"dashboard": model, "folderUid": folder_uid}, dependencies)
+
+    def add_export(self, path: Union[str, Path]):
+        """
+        Add the dashboards of an archive written by `DashboardExport`.
+        """
+        for record in read_export(path):
+            self.add_dashboard(record)
+
+    def levels(self) -> List[List[ImportObject]]:
+        """
+        Group the objects into levels, where each object only depends on objects
+        of earlier levels, and raise `ValueError` on cyclic dependencies.
+        """
+        dependents: Dict[Key, List[Key]] = collections.defaultdict(list)
+        remaining: Dict[Key, int] = {}
+        for key, item in self.objects.items():
+            dependencies = [dependency for dependency in item.dependencies if dependency in self.objects]
+            remaining[key] = len(dependencies)
+            for dependency in dependencies:
+                dependents[dependency].append(key)
+
+        levels = []
+        level = sorted(key for key, count in remaining.items() if count == 0)
+        while level:
+            levels.append([self.objects[key] for key in level])
+            following = []
+            for key in level:
+                for dependent in dependents[key]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        following.append(dependent)
+            level = sorted(following)
+
+        if sum(len(level) for level in levels) < len(self.objects):
+            cycle = sorted(key for key, count in remaining.items() if count > 0)
+            raise ValueError(f"Cyclic dependencies between {cycle}")
+        return levels
+
+    @staticmethod
+    def _blocked(item: ImportObject, result: ImportResult) -> Optional[Key]:
+        for dependency in sorted(item.dependencies):
+            if dependency in result.errors or dependency in result.skipped:
+                return dependency
+        return None
+
+    def _schedule(self, levels: List[List[ImportObject]], result: ImportResult) -> Iterator[List[ImportObject]]:
+        """
+        Yield the objects of each level, which do not depend on failed objects.
+        """
+        for level in levels:
+            items = []
+            for item in level:
+                blocker = self._blocked(item, result)
+                if blocker is None:
+                    items.append(item)
+                else:
+                    result.skipped[item.key] = blocker
+            yield items
+
+    def _record(self, outcome, result: ImportResult):
+        if outcome.ok:
+            result.imported.append(outcome.item.key)
+        else:
+            result.errors[outcome.item.key] = outcome.error
+
+    @staticmethod
+    def _conflict(ex: GrafanaClientError, overwrite: bool) -> bool:
+        return overwrite and ex.status_code in CONFLICT_STATUS_CODES
+
+    @staticmethod
+    def _dashboard_body(item: ImportObject, overwrite: bool) -> Dict[str, Any]:
+        # Numeric IDs differ between instances, dashboards are identified by UID.
+        model = {**item.payload["dashboard"], "id": None}
+        body = {"dashboard": model, "overwrite": overwrite}
+        if item.payload["folderUid"]:
+            body["folderUid"] = item.payload["folderUid"]
+        return body
+
+    def _import(self, api, item: ImportObject, overwrite: bool) -> Any:
+        payload = item.payload
+        try:
+            if item.kind == DATASOURCE:
+                return api.datasource.create_datasource(payload)
+            if item.kind == FOLDER:
+                return api.folder.create_folder(payload["title"], uid=item.uid, parent_uid=payload.get("parentUid"))
+            if item.kind == LIBRARY_ELEMENT:
+                return api.libraryelement.create_library_element(
+                    payload, name=payload.get("name"), uid=item.uid, folder_uid=payload.get("folderUid")
+                )
+            return api.dashboard.update_dashboard(self._dashboard_body(item, overwrite))
+        except GrafanaClientError as ex:
+            # Dashboards are saved with `overwrite` already, so their conflicts can not be resolved by updating.
+            if item.kind == DASHBOARD or not self._conflict(ex, overwrite):
+                raise
+        if item.kind == DATASOURCE:
+            return api.datasource.update_datasource_by_uid(item.uid, payload)
+        if item.kind == FOLDER:
+            return api.folder.update_folder(item.uid, title=payload["title"], overwrite=True)
+        return api.libraryelement.update_library_element(
+            item.uid, payload, name=payload.get("name"), folder_uid=payload.get("folderUid")
+        )
+
+    async def _aimport(self, api, item: ImportObject, overwrite: bool) -> Any:
+        payload = item.payload
+        try:
+            if item.kind == DATASOURCE:
+                return await api.datasource.create_datasource(payload)
+            if item.kind == FOLDER:
+                return await api.folder.create_folder(
+                    payload["title"], uid=item.uid, parent_uid=payload.get("parentUid")
+                )
+            if item.kind == LIBRARY_ELEMENT:
+                return await api.libraryelement.create_library_element(
+                    payload, name=payload.get("name"), uid=item.uid, folder_uid=payload.get("folderUid")
+                )
+            return await api.dashboard.update_dashboard(self._dashboard_body(item, overwrite))
+        except GrafanaClientError as ex:
+            # Dashboards are saved with `overwrite` already, so their conflicts can not be resolved by updating.
+            if item.kind == DASHBOARD or not self._conflict(ex, overwrite):
+                raise
+        if item.kind == DATASOURCE:
+            return await api.datasource.update_datasource_by_uid(item.uid, payload)
+        if item.kind == FOLDER:
+            return await api.folder.update_folder(item.uid, title=payload["title"], overwrite=True)
+        return await api.libraryelement.update_library_element(
+            item.uid, payload, name=payload.get("name"), folder_uid=payload.get("folderUid")
+        )
+
+    def run(
+        self,
+        api,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        overwrite: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ) -> ImportResult:
+        """
+        Import the objects using the synchronous API, level by level, with at most
+        `concurrency` objects at a time. Existing objects are updated, unless
+        `overwrite` is false, in which case they fail with a conflict.
+        """
+        levels = self.levels()
+        result = ImportResult(levels=len(levels))
+        started = time.perf_counter()
+        for items in self._schedule(levels, result):
+            for outcome in run_bulk(
+                lambda item: self._import(api, item, overwrite), items, concurrency=concurrency, ordered=False
+            ):
+                self._record(outcome, result)
+                if progress is not None:
+                    progress(len(result.imported) + len(result.errors) + len(result.skipped), len(self.objects))
+        result.duration = time.perf_counter() - started
+        return result
+
+    async def arun(
+        self,
+        api,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        overwrite: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ) -> ImportResult:
+        """
+        Import the objects using the asynchronous API.
+        """
+        levels = self.levels()
+        result = ImportResult(levels=len(levels))
+        started = time.perf_counter()
+        for items in self._schedule(levels, result):
+            outcomes = arun_bulk(
+                lambda item: self._aimport(api, item, overwrite), items, concurrency=concurrency, ordered=False
+            )
+            async for outcome in outcomes:
+                self._record(outcome, result)
+                if progress is not None:
+                    progress(len(result.imported) + len(result.errors) + len(result.skipped), len(self.objects))
+        result.duration = time.perf_counter() - started
+        return result
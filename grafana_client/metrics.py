@@ -0,0 +1,204 @@
+"""
+About
+=====
+Client-side request metrics for `GrafanaClient` and `AsyncGrafanaClient`,
+rendered in the OpenMetrics or Prometheus text exposition formats, without
+depending on a Prometheus client library.
+
+Metrics are aggregated per HTTP verb and route template, like
+`GET /dashboards/uid/{uid}`, in order to keep their cardinality low:
+
+- `grafana_client_requests_total`: Responses, by status code.
+- `grafana_client_request_duration_seconds`: Histogram of response times.
+- `grafana_client_errors_total`: Failed attempts, by exception class.
+- `grafana_client_retries_total`: Retry attempts.
+- `grafana_client_requests_in_flight`: Requests waiting for a response.
+- `grafana_client_request_bytes_total`, `grafana_client_response_bytes_total`:
+  Body sizes.
+"""
+
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .hooks import RequestInfo
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Aggregate request metrics of one or more clients.
+
+    >>> metrics = MetricsRegistry()
+    >>> grafana = GrafanaApi.from_url(url, metrics=metrics)  # doctest: +SKIP
+    >>> print(metrics.render())  # doctest: +SKIP
+
+    :param namespace: Prefix of all metric names.
+    :param buckets: Upper bounds of the duration histogram buckets, in seconds.
+    """
+
+    def __init__(self, namespace: str = "grafana_client", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._requests: Dict[Labels, int] = {}
+        self._errors: Dict[Labels, int] = {}
+        self._retries: Dict[Labels, int] = {}
+        self._in_flight: Dict[Labels, int] = {}
+        self._request_bytes: Dict[Labels, int] = {}
+        self._response_bytes: Dict[Labels, int] = {}
+        self._durations: Dict[Labels, Histogram] = {}
+
+    def attach(self, client) -> None:
+        """
+        Register the hooks collecting metrics on a `GrafanaClient` or `AsyncGrafanaClient`.
+        """
+        client.add_hook("before_request", self.before_request)
+        client.add_hook("after_response", self.after_response)
+        client.add_hook("on_error", self.on_error)
+
+    @staticmethod
+    def _labels(info: RequestInfo, **extra) -> Labels:
+        return (("method", info.verb), ("route", info.route), *((key, str(value)) for key, value in extra.items()))
+
+    @staticmethod
+    def _increment(series: Dict[Labels, int], labels: Labels, value: int = 1):
+        series[labels] = series.get(labels, 0) + value
+
+    def before_request(self, info: RequestInfo) -> None:
+        labels = self._labels(info)
+        with self._lock:
+            self._increment(self._in_flight, labels)
+            if info.attempt > 0:
+                self._increment(self._retries, labels)
+
+    def after_response(self, info: RequestInfo) -> None:
+        labels = self._labels(info)
+        with self._lock:
+            self._increment(self._in_flight, labels, -1)
+            self._increment(self._requests, self._labels(info, status=info.status_code))
+            if info.request_bytes:
+                self._increment(self._request_bytes, labels, info.request_bytes)
+            if info.response_bytes:
+                self._increment(self._response_bytes, labels, info.response_bytes)
+            histogram = self._durations.get(labels)
+            if histogram is None:
+                histogram = self._durations[labels] = Histogram(self.buckets)
+            histogram.observe(info.timings.total)
+
+    def on_error(self, info: RequestInfo) -> None:
+        with self._lock:
+            # Attempts which received a response have been accounted for already.
+            if info.status_code is None:
+                self._increment(self._in_flight, self._labels(info), -1)
+            self._increment(self._errors, self._labels(info, exception=type(info.error).__name__))
+
+    def clear(self) -> None:
+        with self._lock:
+            for series in [
+                self._requests,
+                self._errors,
+                self._retries,
+                self._in_flight,
+                self._request_bytes,
+                self._response_bytes,
+                self._durations,
+            ]:
+                series.clear()
+
+    def render(self, openmetrics: bool = True) -> str:
+        """
+        Render all metrics in the OpenMetrics text format, or in the Prometheus
+        text format 0.0.4, when `openmetrics` is false.
+        """
+        lines: List[str] = []
+
+        def counter(name: str, help_text: str, series: Dict[Labels, int]):
+            # OpenMetrics names counter families without the `_total` suffix.
+            family = name if openmetrics else f"{name}_total"
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}_total{format_labels(labels)} {value}")
+
+        prefix = self.namespace
+        with self._lock:
+            counter(f"{prefix}_requests", "Responses received, by status code.", self._requests)
+            counter(f"{prefix}_errors", "Failed request attempts, by exception class.", self._errors)
+            counter(f"{prefix}_retries", "Retry attempts.", self._retries)
+            counter(f"{prefix}_request_bytes", "Request body bytes sent.", self._request_bytes)
+            counter(f"{prefix}_response_bytes", "Response body bytes received.", self._response_bytes)
+
+            name = f"{prefix}_requests_in_flight"
+            lines.append(f"# HELP {name} Requests waiting for a response.")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in sorted(self._in_flight.items()):
+                lines.append(f"{name}{format_labels(labels)} {value}")
+
+            name = f"{prefix}_request_duration_seconds"
+            lines.append(f"# HELP {name} Response times in seconds.")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(self._durations.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(bound)),))} {cumulative}")
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Union[str, Path]) -> None:
+        """
+        Write all metrics to a file for the textfile collector of the Prometheus
+        node exporter. The file is replaced atomically, so the collector never
+        reads partially written files.
+        """
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render(openmetrics=False))
+            Path(tmp).chmod(0o644)
+            Path(tmp).replace(path)
+        except BaseException:
+            Path(tmp).unlink()
+            raise
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: Optional[float]) -> str:
+    return repr(float(value))
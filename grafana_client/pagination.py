@@ -0,0 +1,352 @@
+"""
+About
+=====
+Lazy pagination over the paged search endpoints of the Grafana HTTP API, like
+`/users/search`, `/teams/search`, or `/serviceaccounts/search`.
+
+Items are yielded page by page, so memory use is bounded by the page size and
+the prefetch window, instead of growing with the number of items. Once the
+first page reveals the total number of items, using its `totalCount` field, the
+remaining pages are requested concurrently, at most `prefetch` pages at a time,
+and yielded in order. While an earlier page is slow, at most `prefetch` later
+pages are held back, and no further pages are requested until it completes.
+Endpoints without `totalCount` are paged serially, until an empty page, or a
+page shorter than `perpage`.
+
+Endpoints paged using `limit` and `page`, without reporting a total, like
+`/search`, are enumerated by `paginate_partitions()`. The search is split into
+partitions, for example one per folder, which are paged concurrently, and pages
+of the same partition can be requested speculatively ahead. Hits are yielded in
+the order of completion, and de-duplicated by a key field, like `uid`.
+"""
+
+import asyncio
+import dataclasses
+import math
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+# Number of items requested per page by the lazy iterators of the API elements.
+DEFAULT_PERPAGE = 1000
+
+# Number of pages requested concurrently, once the number of pages is known.
+DEFAULT_PREFETCH = 4
+
+# Maximum number of hits returned by the `/search` endpoint per request.
+SEARCH_LIMIT = 5000
+
+
+def page_params(params: Optional[Dict[str, Any]], page: int, perpage: Optional[int]) -> Dict[str, Any]:
+    params = {**(params or {}), "page": page}
+    if perpage is not None:
+        params["perpage"] = perpage
+    return params
+
+
+def page_items(response: Any, items_key: Optional[str]) -> List[Any]:
+    """
+    Return the items of a page, either the page itself, or the array at `items_key`.
+    """
+    if items_key is None:
+        return response or []
+    return response.get(items_key) or []
+
+
+def last_page(response: Any, items: List[Any], start: int, perpage: Optional[int]) -> Optional[int]:
+    """
+    Compute the number of the last page from the `totalCount` field of the first
+    page, using the page size reported by the server, the requested one, or the
+    number of items on the first page. Returns `None` when the total is unknown.
+    """
+    if not isinstance(response, dict) or response.get("totalCount") is None:
+        return None
+    size = response.get("perPage") or perpage or len(items)
+    if not size:
+        return start
+    return max(start, math.ceil(response["totalCount"] / size))
+
+
+def is_last(items: List[Any], perpage: Optional[int]) -> bool:
+    return not items or (perpage is not None and len(items) < perpage)
+
+
+def paginate(
+    fetch: Callable[[int], Any],
+    items_key: Optional[str] = None,
+    perpage: Optional[int] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+    start: int = 1,
+    pages: bool = False,
+) -> Iterator[Any]:
+    """
+    Fetch the first page, and return an iterator over the items of all pages.
+
+    :param fetch: Function returning the response for a page number.
+    :param items_key: Field of the response containing the items, `None` if the response is the array of items.
+    :param perpage: Requested page size, used for detecting the last page.
+    :param prefetch: Maximum number of pages requested concurrently, once the number of pages is known.
+    :param start: Number of the first page.
+    :param pages: Yield page responses instead of items.
+    """
+    if prefetch < 1:
+        raise ValueError("Argument `prefetch` must be at least 1")
+    return _paginate(fetch, fetch(start), items_key, perpage, prefetch, start, pages)
+
+
+def _paginate(
+    fetch: Callable[[int], Any],
+    response: Any,
+    items_key: Optional[str],
+    perpage: Optional[int],
+    prefetch: int,
+    start: int,
+    pages: bool,
+) -> Iterator[Any]:
+    items = page_items(response, items_key)
+    yield from [response] if pages else items
+    last = last_page(response, items, start, perpage)
+    if last is not None:
+        from .bulk import run_bulk
+
+        results = run_bulk(fetch, range(start + 1, last + 1), concurrency=prefetch)
+        try:
+            for result in results:
+                response = result.unwrap()
+                yield from [response] if pages else page_items(response, items_key)
+        finally:
+            results.close()
+        return
+    page = start
+    while not is_last(items, perpage):
+        page += 1
+        response = fetch(page)
+        items = page_items(response, items_key)
+        yield from [response] if pages else items
+
+
+async def apaginate(
+    fetch: Callable[[int], Awaitable[Any]],
+    items_key: Optional[str] = None,
+    perpage: Optional[int] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+    start: int = 1,
+    pages: bool = False,
+) -> AsyncIterator[Any]:
+    """
+    Fetch the first page, and return an asynchronous iterator over the items of
+    all pages, see `paginate()`.
+    """
+    if prefetch < 1:
+        raise ValueError("Argument `prefetch` must be at least 1")
+    return _apaginate(fetch, await fetch(start), items_key, perpage, prefetch, start, pages)
+
+
+async def _apaginate(
+    fetch: Callable[[int], Awaitable[Any]],
+    response: Any,
+    items_key: Optional[str],
+    perpage: Optional[int],
+    prefetch: int,
+    start: int,
+    pages: bool,
+) -> AsyncIterator[Any]:
+    items = page_items(response, items_key)
+    for item in [response] if pages else items:
+        yield item
+    last = last_page(response, items, start, perpage)
+    if last is not None:
+        from .bulk import arun_bulk
+
+        results = arun_bulk(fetch, range(start + 1, last + 1), concurrency=prefetch)
+        try:
+            async for result in results:
+                response = result.unwrap()
+                for item in [response] if pages else page_items(response, items_key):
+                    yield item
+        finally:
+            await results.aclose()
+        return
+    page = start
+    while not is_last(items, perpage):
+        page += 1
+        response = await fetch(page)
+        items = page_items(response, items_key)
+        for item in [response] if pages else items:
+            yield item
+
+
+@dataclasses.dataclass
+class Partition:
+    """
+    Paging state of one partition of a search.
+
+    :param params: Query parameters selecting the partition.
+    :param next_page: Number of the next page to request.
+    :param full: Highest page number known to be full.
+    :param last: Number of the last page, once a short page has been received.
+    """
+
+    params: Dict[str, Any]
+    next_page: int = 1
+    full: int = 0
+    last: Optional[int] = None
+
+
+class PartitionScheduler:
+    """
+    Decide which pages of which partitions to request next, and de-duplicate hits.
+
+    Each partition is paged until a page shorter than `limit`. Up to `prefetch`
+    pages beyond the last full page are requested ahead, speculatively, while at
+    most `concurrency` requests are in flight overall.
+    """
+
+    def __init__(
+        self,
+        partitions: Sequence[Dict[str, Any]],
+        limit: int,
+        concurrency: int,
+        prefetch: Optional[int] = None,
+        key: Optional[str] = None,
+    ):
+        if limit < 1:
+            raise ValueError("Argument `limit` must be at least 1")
+        if concurrency < 1:
+            raise ValueError("Argument `concurrency` must be at least 1")
+        if prefetch is None:
+            # Speculate on a single partition only, to not waste requests on small partitions.
+            prefetch = concurrency if len(partitions) == 1 else 1
+        if prefetch < 1:
+            raise ValueError("Argument `prefetch` must be at least 1")
+        self.partitions = [Partition(params=dict(params)) for params in partitions]
+        self.limit = limit
+        self.concurrency = concurrency
+        self.prefetch = prefetch
+        self.key = key
+        self.seen: Set[Any] = set()
+        self.requests = 0
+        self.duplicates = 0
+
+    def schedule(self, in_flight: int) -> List[Tuple[Partition, int]]:
+        """
+        Return the pages to request, given the number of requests in flight.
+        """
+        units = []
+        progressed = True
+        while progressed and in_flight + len(units) < self.concurrency:
+            progressed = False
+            for partition in self.partitions:
+                if in_flight + len(units) >= self.concurrency:
+                    break
+                if partition.last is None and partition.next_page <= partition.full + self.prefetch:
+                    units.append((partition, partition.next_page))
+                    partition.next_page += 1
+                    progressed = True
+        self.requests += len(units)
+        return units
+
+    def complete(self, partition: Partition, page: int, hits: List[Any]) -> List[Any]:
+        """
+        Record the hits of a page, and return the ones not seen before.
+        """
+        if len(hits) < self.limit:
+            partition.last = page if partition.last is None else min(partition.last, page)
+        else:
+            partition.full = max(partition.full, page)
+        if partition.last is not None:
+            self.partitions = [candidate for candidate in self.partitions if candidate is not partition]
+        if self.key is None:
+            return hits
+        fresh = []
+        for hit in hits:
+            value = hit.get(self.key) if isinstance(hit, dict) else None
+            if value is not None:
+                if value in self.seen:
+                    self.duplicates += 1
+                    continue
+                self.seen.add(value)
+            fresh.append(hit)
+        return fresh
+
+
+def paginate_partitions(
+    fetch: Callable[[Dict[str, Any], int], List[Any]],
+    partitions: Sequence[Dict[str, Any]],
+    limit: int = SEARCH_LIMIT,
+    concurrency: int = DEFAULT_PREFETCH,
+    prefetch: Optional[int] = None,
+    key: Optional[str] = None,
+) -> Iterator[Any]:
+    """
+    Page through all partitions on a thread pool, and yield their hits in the
+    order of completion.
+
+    :param fetch: Function returning the hits for the parameters of a partition, and a page number.
+    :param partitions: Query parameters selecting each partition.
+    :param limit: Number of hits per page.
+    :param concurrency: Maximum number of requests in flight.
+    :param prefetch: Maximum number of pages requested ahead per partition, by default
+                     `concurrency` for a single partition, and 1 otherwise.
+    :param key: Field for de-duplicating hits, like `uid`.
+    """
+    scheduler = PartitionScheduler(partitions, limit, concurrency, prefetch, key)
+    return _paginate_partitions(fetch, scheduler)
+
+
+def _paginate_partitions(
+    fetch: Callable[[Dict[str, Any], int], List[Any]], scheduler: PartitionScheduler
+) -> Iterator[Any]:
+    with ThreadPoolExecutor(max_workers=scheduler.concurrency, thread_name_prefix="grafana-search") as executor:
+        pending: Dict[Future, Tuple[Partition, int]] = {}
+        try:
+            while True:
+                for partition, page in scheduler.schedule(len(pending)):
+                    pending[executor.submit(fetch, partition.params, page)] = (partition, page)
+                if not pending:
+                    break
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    partition, page = pending.pop(future)
+                    yield from scheduler.complete(partition, page, future.result())
+        finally:
+            # When failing, or when the consumer stops early, do not start the queued requests.
+            for future in pending:
+                future.cancel()
+
+
+def apaginate_partitions(
+    fetch: Callable[[Dict[str, Any], int], Awaitable[List[Any]]],
+    partitions: Sequence[Dict[str, Any]],
+    limit: int = SEARCH_LIMIT,
+    concurrency: int = DEFAULT_PREFETCH,
+    prefetch: Optional[int] = None,
+    key: Optional[str] = None,
+) -> AsyncIterator[Any]:
+    """
+    Page through all partitions as tasks on the event loop, and yield their hits
+    in the order of completion, see `paginate_partitions()`.
+    """
+    scheduler = PartitionScheduler(partitions, limit, concurrency, prefetch, key)
+    return _apaginate_partitions(fetch, scheduler)
+
+
+async def _apaginate_partitions(
+    fetch: Callable[[Dict[str, Any], int], Awaitable[List[Any]]], scheduler: PartitionScheduler
+) -> AsyncIterator[Any]:
+    pending: Dict[asyncio.Future, Tuple[Partition, int]] = {}
+    try:
+        while True:
+            for partition, page in scheduler.schedule(len(pending)):
+                pending[asyncio.ensure_future(fetch(partition.params, page))] = (partition, page)
+            if not pending:
+                break
+            completed, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in completed:
+                partition, page = pending.pop(task)
+                for hit in scheduler.complete(partition, page, task.result()):
+                    yield hit
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,164 @@
+"""
+About
+=====
+Client-side rate limiting for `GrafanaClient` and `AsyncGrafanaClient`.
+
+The token buckets use a reservation model: each request takes a token right
+away, possibly driving the bucket into debt, and the caller sleeps exactly as
+long as it takes to pay it back. This way, blocking threads and awaiting
+coroutines never poll. All buckets are thread-safe, so a single `RateLimiter`
+can be shared between several `GrafanaApi` and `AsyncGrafanaApi` instances
+within the same process.
+"""
+
+import asyncio
+import threading
+import time
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+class TokenBucket:
+    """
+    A token bucket, refilled continuously at `rate` tokens per second, holding
+    up to `burst` tokens.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("Rate must be a positive number")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, and return the number of seconds to wait
+        until the reservation is covered.
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiterStats:
+    """
+    Wait-time statistics of a rate limiter, or one of its endpoint rules.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.delayed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, delay: float):
+        self.requests += 1
+        if delay > 0:
+            self.delayed += 1
+            self.wait_total += delay
+            self.wait_max = max(self.wait_max, delay)
+
+    def asdict(self):
+        return {
+            "requests": self.requests,
+            "delayed": self.delayed,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max,
+            "wait_mean": self.wait_total / self.requests if self.requests else 0.0,
+        }
+
+
+BucketSpec = Union[TokenBucket, float, Tuple[float, float]]
+
+
+class RateLimiter:
+    """
+    Throttle requests using a global token bucket, and/or token buckets per
+    endpoint pattern.
+
+    Endpoint patterns are shell-style wildcards matched against the request
+    path, optionally prefixed by an HTTP verb, like `/search*`, or
+    `POST /dashboards/*`. All matching buckets apply. Buckets can be specified
+    by rate, by `(rate, burst)` tuple, or as `TokenBucket` instances, which
+    can also be shared between several rate limiters.
+
+    >>> limiter = RateLimiter(rate=50, endpoints={"/ds/query": 5, "POST /dashboards/*": (1, 5)})
+    """
+
+    def __init__(
+        self,
+        rate: Optional[BucketSpec] = None,
+        burst: Optional[float] = None,
+        endpoints: Optional[Dict[str, BucketSpec]] = None,
+    ):
+        self.bucket = self._make_bucket(rate, burst) if rate is not None else None
+        self.rules: List[Tuple[str, Optional[str], str, TokenBucket]] = []
+        for pattern, spec in (endpoints or {}).items():
+            method, _, path = pattern.rpartition(" ")
+            self.rules.append((pattern, method.upper() or None, path, self._make_bucket(spec)))
+        self._lock = threading.Lock()
+        self._stats = RateLimiterStats()
+        self._rule_stats: Dict[str, RateLimiterStats] = {pattern: RateLimiterStats() for pattern, *_ in self.rules}
+
+    @staticmethod
+    def _make_bucket(spec: BucketSpec, burst: Optional[float] = None) -> TokenBucket:
+        if isinstance(spec, TokenBucket):
+            return spec
+        if isinstance(spec, tuple):
+            return TokenBucket(*spec)
+        return TokenBucket(spec, burst)
+
+    def reserve(self, verb: str, url: str) -> float:
+        """
+        Take a token from all applicable buckets, and return the number of seconds to wait.
+        """
+        path = url.split("?", 1)[0]
+        verb = verb.upper()
+        delay = self.bucket.reserve() if self.bucket is not None else 0.0
+        rule_delays = []
+        for pattern, method, path_pattern, bucket in self.rules:
+            if (method is None or method == verb) and fnmatchcase(path, path_pattern):
+                rule_delay = bucket.reserve()
+                rule_delays.append((pattern, rule_delay))
+                delay = max(delay, rule_delay)
+        with self._lock:
+            self._stats.record(delay)
+            for pattern, rule_delay in rule_delays:
+                self._rule_stats[pattern].record(rule_delay)
+        return delay
+
+    def acquire(self, verb: str, url: str) -> float:
+        """
+        Block the current thread until the request may be sent.
+        """
+        delay = self.reserve(verb, url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, verb: str, url: str) -> float:
+        """
+        Suspend the current coroutine until the request may be sent.
+        """
+        delay = self.reserve(verb, url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def stats(self) -> Dict:
+        """
+        Return wait-time statistics, in total, and per endpoint pattern.
+        """
+        with self._lock:
+            data = self._stats.asdict()
+            data["endpoints"] = {pattern: stats.asdict() for pattern, stats in self._rule_stats.items()}
+        return data
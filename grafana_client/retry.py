@@ -0,0 +1,122 @@
+"""
+About
+=====
+Retry policy for the request runners of `GrafanaClient` and `AsyncGrafanaClient`.
+
+The policy implements capped exponential backoff with full jitter, honors the
+`Retry-After` response header, and respects per-verb idempotency rules, so that
+non-idempotent requests are only repeated when the server signalled it did not
+process them.
+"""
+
+import dataclasses
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"])
+
+
+@dataclasses.dataclass
+class RetryPolicy:
+    """
+    Configure how failed requests are retried.
+
+    :param total: Maximum number of retries, not counting the initial attempt.
+    :param backoff_factor: Base delay in seconds, doubled on each retry.
+    :param backoff_max: Upper bound for a single backoff delay in seconds.
+    :param jitter: Use "full jitter", i.e. pick the delay uniformly between zero and the computed backoff.
+    :param status_forcelist: HTTP status codes which are considered transient.
+    :param idempotent_methods: HTTP verbs which are safe to repeat on any transient failure.
+    :param non_idempotent_status: Status codes where also non-idempotent verbs are repeated,
+                                  because the server rejected the request before processing it.
+    :param respect_retry_after: Whether to honor the `Retry-After` response header.
+    :param retry_after_max: Upper bound for a delay obtained from `Retry-After`.
+    :param budget: Upper bound for the total time in seconds spent waiting between attempts.
+    """
+
+    total: int = 3
+    backoff_factor: float = 0.5
+    backoff_max: float = 30.0
+    jitter: bool = True
+    status_forcelist: FrozenSet[int] = frozenset([429, 502, 503, 504])
+    idempotent_methods: FrozenSet[str] = IDEMPOTENT_METHODS
+    non_idempotent_status: FrozenSet[int] = frozenset([429])
+    respect_retry_after: bool = True
+    retry_after_max: float = 120.0
+    budget: Optional[float] = None
+
+    def is_retryable(self, method: str, status_code: Optional[int] = None) -> bool:
+        """
+        Decide whether a failed request may be repeated.
+
+        `status_code` is `None` for network-level failures like timeouts
+        or connection errors.
+        """
+        method = method.upper()
+        if status_code is None:
+            return method in self.idempotent_methods
+        if status_code not in self.status_forcelist:
+            return False
+        return method in self.idempotent_methods or status_code in self.non_idempotent_status
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Compute the delay before retry number `attempt`, counting from zero.
+        """
+        delay = min(self.backoff_max, self.backoff_factor * (2**attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)  # noqa: S311
+        return delay
+
+    def next_delay(
+        self,
+        method: str,
+        attempt: int,
+        elapsed: float,
+        status_code: Optional[int] = None,
+        headers=None,
+    ) -> Optional[float]:
+        """
+        Return the number of seconds to wait before the next attempt, or
+        `None` when the request must not be retried anymore.
+
+        :param attempt: Number of retries already performed.
+        :param elapsed: Total time in seconds already spent waiting.
+        """
+        if attempt >= self.total or not self.is_retryable(method, status_code):
+            return None
+
+        delay = None
+        if self.respect_retry_after and headers is not None:
+            delay = parse_retry_after(headers.get("Retry-After"))
+            if delay is not None:
+                delay = min(delay, self.retry_after_max)
+        if delay is None:
+            delay = self.backoff(attempt)
+
+        if self.budget is not None and elapsed + delay > self.budget:
+            return None
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Decode the value of a `Retry-After` header, which is either a number of
+    seconds, or an HTTP date. Returns `None` for missing or invalid values.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        then = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if then is None:
+        return None
+    return max(0.0, then.timestamp() - time.time())
@@ -0,0 +1,126 @@
+"""
+About
+=====
+Derive low-cardinality route templates from request paths, like
+`/dashboards/uid/{uid}` from `/dashboards/uid/cIBgcSjkk`.
+
+Route templates are used to key circuit breakers, rate limits, and request
+statistics per endpoint, without creating one entry per resource.
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+# Segments which announce the kind of identifier following them.
+ID_MARKERS = {
+    "uid": "{uid}",
+    "id": "{id}",
+    "name": "{name}",
+    "db": "{slug}",
+    "using": "{id}",
+}
+
+# Resource collections, which are followed by an identifier, unless the next
+# segment is one of the `KEYWORDS`.
+COLLECTIONS = {
+    "alert-notifications",
+    "alert-rules",
+    "alerts",
+    "annotations",
+    "contact-points",
+    "dashboards",
+    "datasources",
+    "folder",
+    "folders",
+    "groups",
+    "library-elements",
+    "members",
+    "mute-timings",
+    "orgs",
+    "playlists",
+    "plugins",
+    "proxy",
+    "roles",
+    "rule-groups",
+    "serviceaccounts",
+    "snapshots",
+    "snapshots-delete",
+    "teams",
+    "templates",
+    "tokens",
+    "users",
+    "versions",
+}
+
+# Literal path segments, which are never identifiers.
+KEYWORDS = {
+    "calculate-diff",
+    "correlations",
+    "db",
+    "graphite",
+    "home",
+    "id",
+    "import",
+    "lookup",
+    "name",
+    "permissions",
+    "search",
+    "states-for-dashboard",
+    "tags",
+    "uid",
+}
+
+NUMBER = re.compile(r"^-?\d+$")
+
+
+@lru_cache(maxsize=4096)
+def route_template(url: str) -> str:
+    """
+    Compute the route template for a request path relative to the API root.
+
+    >>> route_template("/folders/nErXDvCkzz/permissions")
+    '/folders/{uid}/permissions'
+    """
+    segments = url.split("?", 1)[0].strip("/").split("/")
+
+    # Everything after `/datasources/proxy/{id}` is defined by the data source.
+    if segments[:2] == ["datasources", "proxy"] and len(segments) > 2:
+        if segments[2] == "uid":
+            return "/datasources/proxy/uid/{uid}/{path}"
+        return "/datasources/proxy/{id}/{path}"
+
+    template = []
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index > 0 else None
+        if previous in ID_MARKERS and index >= 2:
+            template.append(ID_MARKERS[previous])
+        elif NUMBER.match(segment):
+            template.append("{id}")
+        elif previous in COLLECTIONS and segment not in KEYWORDS and segment not in COLLECTIONS:
+            template.append("{uid}")
+        else:
+            template.append(segment)
+    return "/" + "/".join(template)
+
+
+def datasource_of(url: str, json=None) -> Optional[str]:
+    """
+    Determine the data source addressed by a request, either from the path
+    of the data source APIs, or from the queries submitted to `/ds/query`.
+    """
+    path = url.split("?", 1)[0]
+    segments = path.strip("/").split("/")
+    if segments[0] == "datasources" and len(segments) >= 2:
+        if NUMBER.match(segments[1]):
+            return segments[1]
+        if len(segments) >= 3 and segments[1] in ["proxy", "uid", "id", "name"]:
+            if segments[1:3] == ["proxy", "uid"] and len(segments) >= 4:
+                return segments[3]
+            return segments[2]
+    elif path == "/ds/query" and isinstance(json, dict):
+        for query in json.get("queries") or []:
+            datasource = query.get("datasource") if isinstance(query, dict) else None
+            if isinstance(datasource, dict) and datasource.get("uid"):
+                return str(datasource["uid"])
+    return None
@@ -0,0 +1,361 @@
+"""
+About
+=====
+A local inverted index over the hits of the `/search` endpoint, answering
+dashboard searches without a round trip to the Grafana server.
+
+The index is built from a full enumeration of `/search`, using
+`Search.iter_dashboards()`, and indexes the tokens of titles and folder titles,
+tags, folder UIDs, and types. Queries support prefix matching of tokens, fuzzy
+matching within one edit, and the intersection of tags, like Grafana does, and
+return hits of the same shape as `Search.search_dashboards()`.
+
+Refreshing the index re-enumerates `/search`, and only re-indexes added,
+changed, and removed hits. The index can be saved to, and loaded from disk.
+"""
+
+import bisect
+import collections
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+FORMAT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Minimum length of query tokens to be matched fuzzily.
+FUZZY_MIN_LENGTH = 4
+
+Hit = Dict[str, Any]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def deletes(token: str) -> Set[str]:
+    """
+    Return the variants of a token with one character removed.
+    """
+    return {token[:index] + token[index + 1 :] for index in range(len(token))}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """
+    Whether two tokens differ by at most one insertion, deletion, substitution,
+    or transposition of adjacent characters.
+    """
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    prefix = 0
+    while prefix < len(a) and a[prefix] == b[prefix]:
+        prefix += 1
+    if len(a) < len(b):
+        return a[prefix:] == b[prefix + 1 :]
+    if a[prefix + 1 :] == b[prefix + 1 :]:
+        return True
+    return a[prefix : prefix + 2] == b[prefix : prefix + 2][::-1] and a[prefix + 2 :] == b[prefix + 2 :]
+
+
+class Field:
+    """
+    Postings of one field, mapping terms to the UIDs of the hits containing them,
+    with a sorted vocabulary for prefix matching, and a map of deletions for
+    fuzzy matching, both rebuilt on demand after changes.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = collections.defaultdict(set)
+        self._vocabulary: Optional[List[str]] = None
+        self._deletes: Optional[Dict[str, Set[str]]] = None
+
+    def add(self, term: str, uid: str):
+        postings = self.postings[term]
+        if not postings:
+            self._vocabulary = self._deletes = None
+        postings.add(uid)
+
+    def remove(self, term: str, uid: str):
+        postings = self.postings.get(term)
+        if postings is None:
+            return
+        postings.discard(uid)
+        if not postings:
+            del self.postings[term]
+            self._vocabulary = self._deletes = None
+
+    def exact(self, term: str) -> Set[str]:
+        return self.postings.get(term, set())
+
+    def prefix(self, prefix: str) -> Set[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        uids: Set[str] = set()
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            uids |= self.postings[term]
+        return uids
+
+    def fuzzy(self, token: str) -> Set[str]:
+        if self._deletes is None:
+            self._deletes = collections.defaultdict(set)
+            for term in self.postings:
+                self._deletes[term].add(term)
+                for variant in deletes(term):
+                    self._deletes[variant].add(term)
+        candidates: Set[str] = set(self._deletes.get(token, ()))
+        for variant in deletes(token):
+            candidates |= self._deletes.get(variant, set())
+        uids: Set[str] = set()
+        for term in candidates:
+            if within_one_edit(token, term):
+                uids |= self.postings[term]
+        return uids
+
+
+class SearchIndex:
+    """
+    Local inverted index over search hits.
+
+    >>> index = SearchIndex.build(grafana)
+    >>> index.search_dashboards(query="kube node", tag=["prod"], fuzzy=True)
+    >>> index.refresh(grafana)
+    >>> index.save("dashboards.json")
+    """
+
+    def __init__(self, hits: Iterable[Hit] = ()):
+        self.hits: Dict[str, Hit] = {}
+        self.fields: Dict[str, Field] = collections.defaultdict(Field)
+        self.built_at: Optional[float] = None
+        self.queries = 0
+        self._lock = threading.RLock()
+        self.update(hits)
+
+    @classmethod
+    def build(cls, api, **kwargs) -> "SearchIndex":
+        """
+        Build an index from a full enumeration of `/search`, using the synchronous
+        API. Keyword arguments are passed to `Search.iter_dashboards()`.
+        """
+        index = cls()
+        index.refresh(api, **kwargs)
+        return index
+
+    @classmethod
+    async def abuild(cls, api, **kwargs) -> "SearchIndex":
+        """
+        Build an index from a full enumeration of `/search`, using the asynchronous API.
+        """
+        index = cls()
+        await index.arefresh(api, **kwargs)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self.hits
+
+    @staticmethod
+    def terms(hit: Hit) -> Dict[str, Set[str]]:
+        """
+        Return the indexed terms of a hit, per field.
+        """
+        return {
+            "title": set(tokenize(hit.get("title"))),
+            "folder": set(tokenize(hit.get("folderTitle"))),
+            "folder_uid": {hit["folderUid"]} if hit.get("folderUid") else set(),
+            "tag": {tag.lower() for tag in hit.get("tags") or []},
+            "type": {hit["type"]} if hit.get("type") else set(),
+        }
+
+    def _index(self, uid: str, hit: Hit):
+        for name, terms in self.terms(hit).items():
+            for term in terms:
+                self.fields[name].add(term, uid)
+
+    def _unindex(self, uid: str, hit: Hit):
+        for name, terms in self.terms(hit).items():
+            for term in terms:
+                self.fields[name].remove(term, uid)
+
+    def upsert(self, hit: Hit) -> Optional[bool]:
+        """
+        Add or replace a hit. Returns `True` when added, `False` when changed,
+        and `None` when unchanged.
+        """
+        uid = hit["uid"]
+        with self._lock:
+            previous = self.hits.get(uid)
+            if previous == hit:
+                return None
+            if previous is not None:
+                self._unindex(uid, previous)
+            self.hits[uid] = hit
+            self._index(uid, hit)
+            return previous is None
+
+    def remove(self, uid: str) -> bool:
+        with self._lock:
+            hit = self.hits.pop(uid, None)
+            if hit is None:
+                return False
+            self._unindex(uid, hit)
+            return True
+
+    def update(self, hits: Iterable[Hit], complete: bool = False) -> Dict[str, int]:
+        """
+        Add or replace the given hits, and, when `complete` is true, remove all
+        hits not given. Only changed hits are re-indexed. Returns the number of
+        added, changed, and removed hits.
+        """
+        stats = {"added": 0, "changed": 0, "removed": 0}
+        seen = set()
+        for hit in hits:
+            seen.add(hit["uid"])
+            outcome = self.upsert(hit)
+            if outcome is True:
+                stats["added"] += 1
+            elif outcome is False:
+                stats["changed"] += 1
+        if complete:
+            with self._lock:
+                for uid in [uid for uid in self.hits if uid not in seen]:
+                    self.remove(uid)
+                    stats["removed"] += 1
+        return stats
+
+    def refresh(self, api, **kwargs) -> Dict[str, int]:
+        """
+        Re-enumerate `/search` using the synchronous API, and apply the differences.
+        Keyword arguments are passed to `Search.iter_dashboards()`.
+        """
+        stats = self.update(api.search.iter_dashboards(**kwargs), complete=True)
+        self.built_at = time.time()
+        return stats
+
+    async def arefresh(self, api, **kwargs) -> Dict[str, int]:
+        """
+        Re-enumerate `/search` using the asynchronous API, and apply the differences.
+        """
+        hits = [hit async for hit in await api.search.iter_dashboards(**kwargs)]
+        stats = self.update(hits, complete=True)
+        self.built_at = time.time()
+        return stats
+
+    def _match_text(self, field: str, text: str, fuzzy: bool) -> Optional[Set[str]]:
+        """
+        Match all tokens of `text` as prefixes of the terms of `field`, and,
+        when `fuzzy` is true, also within one edit.
+        """
+        result = None
+        for token in tokenize(text):
+            uids = self.fields[field].prefix(token)
+            if fuzzy and len(token) >= FUZZY_MIN_LENGTH:
+                uids = uids | self.fields[field].fuzzy(token)
+            result = uids if result is None else result & uids
+            if not result:
+                break
+        return result
+
+    def search_dashboards(
+        self,
+        query: Optional[str] = None,
+        tag: Union[str, List[str], None] = None,
+        type_: Optional[str] = None,
+        dashboard_uids: Optional[List[str]] = None,
+        folder_uids: Optional[List[str]] = None,
+        folder: Optional[str] = None,
+        starred: Optional[bool] = None,
+        limit: Optional[int] = None,
+        fuzzy: bool = False,
+    ) -> List[Hit]:
+        """
+        Search the index, like `Search.search_dashboards()`, and return the hits
+        sorted by title.
+
+        :param query: Match all tokens of the title, as prefixes.
+        :param tag: Match hits having all of the given tags.
+        :param type_: Match either `dash-db` or `dash-folder` hits.
+        :param dashboard_uids: Match hits having one of the given UIDs.
+        :param folder_uids: Match hits located in one of the given folders.
+        :param folder: Match all tokens of the folder title, as prefixes.
+        :param starred: Match hits starred by the user who built the index.
+        :param limit: Maximum number of hits.
+        :param fuzzy: Also match tokens of `query` and `folder` within one edit.
+        """
+        with self._lock:
+            self.queries += 1
+            candidates: List[Set[str]] = []
+            if query:
+                candidates.append(self._match_text("title", query, fuzzy) or set())
+            if folder:
+                candidates.append(self._match_text("folder", folder, fuzzy) or set())
+            if tag:
+                for value in [tag] if isinstance(tag, str) else tag:
+                    candidates.append(self.fields["tag"].exact(value.lower()))
+            if type_:
+                candidates.append(self.fields["type"].exact(type_))
+            if folder_uids:
+                candidates.append(set().union(*(self.fields["folder_uid"].exact(uid) for uid in folder_uids)))
+            if dashboard_uids:
+                candidates.append({uid for uid in dashboard_uids if uid in self.hits})
+            if candidates:
+                candidates.sort(key=len)
+                uids = set(candidates[0]).intersection(*candidates[1:])
+            else:
+                uids = set(self.hits)
+            hits = [self.hits[uid] for uid in uids]
+        if starred is not None:
+            hits = [hit for hit in hits if bool(hit.get("isStarred")) == bool(starred)]
+        hits.sort(key=lambda hit: ((hit.get("title") or "").lower(), hit["uid"]))
+        return hits[:limit] if limit else hits
+
+    def save(self, path: Union[str, Path]):
+        """
+        Save the hits to a JSON file, atomically replacing an existing file.
+        The postings are rebuilt when loading.
+        """
+        path = Path(path)
+        with self._lock:
+            document = {"version": FORMAT_VERSION, "built_at": self.built_at, "hits": list(self.hits.values())}
+        descriptor, name = tempfile.mkstemp(prefix=".searchindex-", dir=path.resolve().parent)
+        temporary = Path(name)
+        try:
+            with os.fdopen(descriptor, "w") as file:
+                json.dump(document, file)
+            temporary.replace(path)
+        except BaseException:
+            temporary.unlink()
+            raise
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SearchIndex":
+        with Path(path).open() as file:
+            document = json.load(file)
+        if document.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index format version: {document.get('version')}")
+        index = cls(document["hits"])
+        index.built_at = document.get("built_at")
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": len(self.hits),
+                "terms": sum(len(field.postings) for field in self.fields.values()),
+                "queries": self.queries,
+                "built_at": self.built_at,
+            }
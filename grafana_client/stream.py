@@ -0,0 +1,394 @@
+"""
+About
+=====
+Incremental JSON decoding with field projection, for very large responses.
+
+`JsonItemStream` is a push parser: it receives text in chunks of arbitrary
+size, and returns the items of a JSON array as soon as they have been received
+completely. The array can be the top-level value of the document, or nested
+within objects, like `{"totalCount": 42, "serviceAccounts": [...]}`.
+
+A projection of dotted field names, like `["uid", "title", "meta.folderUid"]`,
+selects the fields to decode. Other values are skipped on the text level, so
+unneeded keys, like the `panels` of a dashboard, are never materialized.
+"""
+
+import codecs
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+# Number of bytes to read from the network at once when streaming a response.
+CHUNK_SIZE = 65536
+
+Projection = Optional[Dict[str, Any]]
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+STRUCTURAL = re.compile(r'["\[\]{}]')
+SCALAR = re.compile(r"[^ \t\n\r,\]}]+")
+
+# Characters ending a scalar value.
+DELIMITERS = " \t\n\r,]}"
+
+_decoder = json.JSONDecoder()
+
+# Parser states.
+VALUE = "value"
+KEY = "key"
+SKIP = "skip"
+ITEMS = "items"
+ITEM = "item"
+DONE = "done"
+
+
+def make_projection(fields: Optional[Sequence[str]]) -> Projection:
+    """
+    Convert a list of dotted field names into a projection tree.
+
+    >>> make_projection(["uid", "meta.folderUid", "meta.url"])
+    {'uid': None, 'meta': {'folderUid': None, 'url': None}}
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = [fields]
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        parts = field.split(".")
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                # The parent has been selected as a whole already.
+                break
+            node[part] = child
+            node = child
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return WHITESPACE.match(text, pos).end()
+
+
+def _scan_container(text: str, pos: int, depth: int):
+    """
+    Scan an object or array, starting within it at the given nesting depth.
+
+    Returns `(pos, depth, complete)`. When the text ends before the container
+    does, scanning can be resumed at the returned position and depth.
+    """
+    while True:
+        match = STRUCTURAL.search(text, pos)
+        if match is None:
+            return len(text), depth, False
+        index = match.start()
+        char = text[index]
+        if char == '"':
+            try:
+                _, pos = scanstring(text, index + 1)
+            except ValueError:
+                # Unterminated string, resume at its opening quote.
+                return index, depth, False
+            continue
+        pos = index + 1
+        if char in "[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos, 0, True
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """
+    Return the end position of the complete JSON value starting at `pos`, without decoding it.
+    """
+    char = text[pos]
+    if char in "[{":
+        return _scan_container(text, pos + 1, 1)[0]
+    if char == '"':
+        return scanstring(text, pos + 1)[1]
+    return SCALAR.match(text, pos).end()
+
+
+def _expect(text: str, pos: int, char: str) -> int:
+    if text[pos] != char:
+        raise json.JSONDecodeError(f"Expecting '{char}'", text, pos)
+    return pos + 1
+
+
+def decode_projected(text: str, pos: int = 0, projection: Projection = None):
+    """
+    Decode the JSON value starting at `pos`, keeping only the projected fields.
+    Projections apply to objects, and to all objects within arrays.
+
+    Returns `(value, end)`.
+    """
+    pos = _skip_whitespace(text, pos)
+    if projection is None:
+        return _decoder.raw_decode(text, pos)
+    char = text[pos]
+    if char == "{":
+        result = {}
+        pos = _skip_whitespace(text, pos + 1)
+        if text[pos] == "}":
+            return result, pos + 1
+        while True:
+            pos = _expect(text, pos, '"')
+            key, pos = scanstring(text, pos)
+            pos = _skip_whitespace(text, _expect(text, _skip_whitespace(text, pos), ":"))
+            if key in projection:
+                result[key], pos = decode_projected(text, pos, projection[key])
+            else:
+                pos = _skip_value(text, pos)
+            pos = _skip_whitespace(text, pos)
+            if text[pos] == "}":
+                return result, pos + 1
+            pos = _skip_whitespace(text, _expect(text, pos, ","))
+    if char == "[":
+        result = []
+        pos = _skip_whitespace(text, pos + 1)
+        if text[pos] == "]":
+            return result, pos + 1
+        while True:
+            value, pos = decode_projected(text, pos, projection)
+            result.append(value)
+            pos = _skip_whitespace(text, pos)
+            if text[pos] == "]":
+                return result, pos + 1
+            pos = _expect(text, pos, ",")
+    return _decoder.raw_decode(text, pos)
+
+
+def loads(text: str, fields: Optional[Sequence[str]] = None):
+    """
+    Decode a complete JSON document, keeping only the given fields.
+    """
+    try:
+        value, end = decode_projected(text, 0, make_projection(fields))
+    except IndexError:
+        raise json.JSONDecodeError("Unexpected end of JSON document", text, len(text))
+    end = _skip_whitespace(text, end)
+    if end != len(text):
+        raise json.JSONDecodeError("Extra data", text, end)
+    return value
+
+
+class JsonItemStream:
+    """
+    Push parser yielding the items of a JSON array incrementally.
+
+    :param path: Dotted path of keys leading to the array within nested
+                 objects. `None` addresses a top-level array.
+    :param fields: Dotted field names to keep from each item, or `None` to keep all.
+
+    >>> stream = JsonItemStream(fields=["uid"])
+    >>> stream.feed('[{"uid": "a", "panels": []}, {"ui')
+    [{'uid': 'a'}]
+    >>> stream.feed('d": "b"}]')
+    [{'uid': 'b'}]
+    >>> stream.close()
+    []
+    """
+
+    def __init__(self, path: Optional[str] = None, fields: Optional[Sequence[str]] = None):
+        self.path: List[str] = path.split(".") if path else []
+        self.projection = make_projection(fields)
+        self.count = 0
+        self._buffer = ""
+        self._pos = 0
+        self._state = VALUE
+        self._level = 0
+        self._separator = False
+        self._start = 0
+        self._scan_pos = 0
+        self._depth = 0
+        self._required = 0
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add a chunk of text, and return all items which have been completed by it.
+        """
+        self._buffer += text
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the document, and return the remaining items.
+        """
+        items = self._parse(final=True)
+        if self._state != DONE:
+            raise json.JSONDecodeError("Unexpected end of JSON document", self._buffer, len(self._buffer))
+        return items
+
+    def _decode_item(self, text: str, final: bool):
+        """
+        Try to decode the item starting at `self._start`. Returns `None` while
+        the item is incomplete.
+
+        Decoding is attempted again only after the buffered part of the item
+        has doubled, which keeps the total effort linear for items spanning
+        many chunks.
+        """
+        available = len(text) - self._start
+        if available < self._required and not final:
+            return None
+        try:
+            value, end = decode_projected(text, self._start, self.projection)
+        except (IndexError, ValueError):
+            if final:
+                raise
+            self._required = 2 * available
+            return None
+        # Numbers and literals are only complete when followed by a delimiter,
+        # `[-2.` decodes to `-2`, stopping before the incomplete fraction.
+        if not final and text[end - 1] not in '}]"' and (end >= len(text) or text[end] not in DELIMITERS):
+            self._required = available + 1
+            return None
+        self._required = 0
+        return value, end
+
+    def _scan(self, text: str, final: bool) -> Optional[int]:
+        """
+        Resumable scan for the end of the value starting at `self._start`.
+        """
+        if self._depth == 0:
+            char = text[self._start]
+            if char == '"':
+                try:
+                    return scanstring(text, self._start + 1)[1]
+                except ValueError:
+                    return None
+            if char not in "[{":
+                end = SCALAR.match(text, self._start).end()
+                if end == len(text) and not final:
+                    return None
+                return end
+            self._depth = 1
+            self._scan_pos = self._start + 1
+        self._scan_pos, self._depth, complete = _scan_container(text, self._scan_pos, self._depth)
+        return self._scan_pos if complete else None
+
+    def _parse(self, final: bool) -> List[Any]:
+        text = self._buffer
+        pos = self._pos
+        items = []
+        while self._state != DONE:
+            if self._state == ITEM:
+                decoded = self._decode_item(text, final)
+                if decoded is None:
+                    break
+                value, pos = decoded
+                items.append(value)
+                self._state = ITEMS
+                continue
+
+            if self._state == SKIP:
+                end = self._scan(text, final)
+                if end is None:
+                    break
+                self._depth = 0
+                self._state = KEY
+                pos = end
+                continue
+
+            pos = _skip_whitespace(text, pos)
+            if pos >= len(text):
+                break
+            char = text[pos]
+
+            if self._state == VALUE:
+                if self._level < len(self.path):
+                    _expect(text, pos, "{")
+                    self._state = KEY
+                else:
+                    _expect(text, pos, "[")
+                    self._state = ITEMS
+                self._separator = False
+                pos += 1
+
+            elif self._state == KEY:
+                if char == "}":
+                    # The addressed key is not present.
+                    self._state = DONE
+                elif self._separator:
+                    pos = _expect(text, pos, ",")
+                    self._separator = False
+                else:
+                    _expect(text, pos, '"')
+                    try:
+                        key, end = scanstring(text, pos + 1)
+                    except ValueError:
+                        break
+                    end = _skip_whitespace(text, end)
+                    if end >= len(text):
+                        break
+                    end = _skip_whitespace(text, _expect(text, end, ":"))
+                    if end >= len(text):
+                        break
+                    pos = end
+                    self._separator = True
+                    if key == self.path[self._level]:
+                        self._level += 1
+                        self._state = VALUE
+                    else:
+                        self._start = pos
+                        self._state = SKIP
+
+            elif self._state == ITEMS:
+                if char == "]":
+                    self._state = DONE
+                elif self._separator:
+                    pos = _expect(text, pos, ",")
+                    self._separator = False
+                else:
+                    self._start = pos
+                    self._state = ITEM
+                    self._separator = True
+                    self.count += 1
+
+        # Discard consumed text, keeping the value currently being scanned.
+        keep = self._start if self._state in (ITEM, SKIP) else pos
+        if keep:
+            self._buffer = text[keep:]
+            self._start -= keep
+            self._scan_pos -= keep
+            pos -= keep
+        self._pos = max(pos, 0)
+        return items
+
+
+def iter_items(
+    chunks: Iterable[Union[bytes, str]], path: Optional[str] = None, fields: Optional[Sequence[str]] = None
+) -> Iterator[Any]:
+    """
+    Yield array items from an iterable of UTF-8 encoded byte chunks, or text chunks.
+    """
+    stream = JsonItemStream(path=path, fields=fields)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        yield from stream.feed(chunk)
+    yield from stream.feed(decoder.decode(b"", final=True))
+    yield from stream.close()
+
+
+async def aiter_items(
+    chunks: AsyncIterator[Union[bytes, str]], path: Optional[str] = None, fields: Optional[Sequence[str]] = None
+) -> AsyncIterator[Any]:
+    """
+    Yield array items from an asynchronous iterable of byte chunks, or text chunks.
+    """
+    stream = JsonItemStream(path=path, fields=fields)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        for item in stream.feed(chunk):
+            yield item
+    for item in stream.feed(decoder.decode(b"", final=True)) + stream.close():
+        yield item
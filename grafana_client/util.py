@@ -1,3 +1,4 @@
+import json
 import logging
 import sys
 
@@ -46,3 +47,11 @@ def format_param_value(maybe_list):
         return ",".join([str(x) for x in maybe_list])
     else:
         return maybe_list
+
+
+def request_key(*parts) -> str:
+    """
+    Compute a stable key identifying a request from its components, like
+    URL, query parameters, and headers.
+    """
+    return json.dumps(parts, sort_keys=True, default=str)
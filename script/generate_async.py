@@ -103,11 +103,13 @@ def process(source: Path, target: Path):
 
         module_dump = module_dump.replace("self.client.", "await self.client.")
 
-        for relative_import in [".base", "..client", "..knowledge", "..model"]:
+        for relative_import in [".base", "..capabilities", "..client", "..knowledge", "..model", "..pagination"]:
             module_dump = module_dump.replace(f"from {relative_import}", f"from .{relative_import}")
 
         module_dump = module_dump.replace("self.api.version", "await self.api.version")
         module_dump = module_dump.replace("= self.", "= await self.")
+        # Methods delegating to other methods, like `*_by_uid` wrappers, return their awaited result.
+        module_dump = module_dump.replace("return self.", "return await self.")
 
         module_processed.append(module_path)
         target_path = Path(str(module_path).replace(str(source), str(target)))
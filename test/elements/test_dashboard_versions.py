@@ -181,3 +181,25 @@ class DashboardVersionsTestCase(unittest.TestCase):
                 base_dashboard_id=1, base_version_id=1, new_dashboard_id=1, new_version_id=2, diff_type="foobar"
             )
         self.assertEqual(str(ctx.exception), "diff_type must be either 'json' or 'basic'")
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+
+    from ..util import make_response
+
+    class AsyncDashboardVersionsTestCase(IsolatedAsyncioTestCase):
+        async def test_wrappers_are_awaited(self):
+            grafana = AsyncGrafanaApi.from_url()
+            grafana.client.s.request = AsyncMock(return_value=make_response(200, [{"version": 2}]))
+            versions = await grafana.dashboard_versions.get_dashboard_versions_by_uid("abc", limit=1)
+            self.assertEqual(versions, [{"version": 2}])
+            self.assertEqual(grafana.client.s.request.call_args.kwargs["params"], {"limit": 1})
+            grafana.client.s.request.return_value = make_response(200, {"version": 2})
+            version = await grafana.dashboard_versions.get_dashboard_version_by_uid("abc", version_id=2)
+            self.assertEqual(version, {"version": 2})
@@ -0,0 +1,338 @@
+import threading
+import time
+import unittest
+
+from grafana_client import BulkResult, GrafanaApi
+from grafana_client.bulk import run_bulk
+from grafana_client.client import GrafanaClientError
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+
+class BulkTestCase(unittest.TestCase):
+    @requests_mock.Mocker()
+    def test_dashboards(self, m):
+        uids = [f"uid-{index}" for index in range(20)]
+        for uid in uids:
+            m.get(
+                f"http://localhost:3000/api/dashboards/uid/{uid}",
+                json={"dashboard": {"uid": uid}},
+                headers=JSON_HEADERS,
+            )
+        grafana = GrafanaApi.from_url()
+        progress = []
+        results = list(
+            grafana.bulk(
+                grafana.dashboard.get_dashboard, uids, concurrency=4, progress=lambda *args: progress.append(args)
+            )
+        )
+        self.assertEqual([result.value["dashboard"]["uid"] for result in results], uids)
+        self.assertEqual([result.index for result in results], list(range(20)))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(progress), 20)
+        self.assertEqual(progress[-1], (20, 20))
+
+    @requests_mock.Mocker()
+    def test_errors(self, m):
+        m.get("http://localhost:3000/api/dashboards/uid/foo", json={"dashboard": {"uid": "foo"}}, headers=JSON_HEADERS)
+        m.get("http://localhost:3000/api/dashboards/uid/bar", json={"message": "Dashboard not found"}, status_code=404)
+        grafana = GrafanaApi.from_url()
+        foo, bar = grafana.bulk(grafana.dashboard.get_dashboard, ["foo", "bar"])
+        self.assertTrue(foo.ok)
+        self.assertEqual(foo.unwrap(), {"dashboard": {"uid": "foo"}})
+        self.assertFalse(bar.ok)
+        self.assertEqual(bar.item, "bar")
+        self.assertIsInstance(bar.error, GrafanaClientError)
+        self.assertRaises(GrafanaClientError, bar.unwrap)
+
+    def test_as_completed(self):
+        def fn(delay):
+            time.sleep(delay)
+            return delay
+
+        results = list(run_bulk(fn, [0.2, 0.01], concurrency=2, ordered=False))
+        self.assertEqual([result.value for result in results], [0.01, 0.2])
+        self.assertEqual([result.index for result in results], [1, 0])
+
+    def test_timeout(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def fn(item):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            try:
+                if item == "stuck":
+                    release.wait(5)
+                return item
+            finally:
+                with lock:
+                    running -= 1
+
+        start = time.perf_counter()
+        results = list(run_bulk(fn, ["a", "stuck", "b", "c"], concurrency=2, timeout=0.05))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual([result.ok for result in results], [True, False, True, True])
+        self.assertIsInstance(results[1].error, TimeoutError)
+        # The abandoned call still occupies a worker.
+        self.assertEqual(peak, 2)
+
+    def test_bounded_concurrency(self):
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+        consumed = []
+
+        def items():
+            for index in range(50):
+                consumed.append(index)
+                yield index
+
+        def fn(item):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.001)
+            with lock:
+                running -= 1
+                finished.append(item)
+            return item
+
+        finished = []
+        progress = []
+        results = run_bulk(fn, items(), concurrency=3, progress=lambda *args: progress.append(args))
+        first = next(results)
+        self.assertEqual(first, BulkResult(index=0, item=0, value=0))
+        # Only consuming items for the free slots.
+        self.assertLessEqual(len(consumed) - len(finished), 3)
+        self.assertEqual([result.value for result in results], list(range(1, 50)))
+        self.assertLessEqual(peak, 3)
+        self.assertEqual(progress[-1], (50, None))
+
+    def test_no_head_of_line_blocking(self):
+        others = threading.Semaphore(0)
+
+        def fn(item):
+            if item == 0:
+                # Only completes when as many following calls as the concurrency went ahead.
+                for _ in range(2):
+                    others.acquire(timeout=5)
+            else:
+                others.release()
+            return item
+
+        start = time.perf_counter()
+        results = list(run_bulk(fn, range(10), concurrency=2))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual([result.value for result in results], list(range(10)))
+
+    def test_bounded_buffer(self):
+        consumed = []
+        seen = []
+
+        def items():
+            for index in range(100):
+                consumed.append(index)
+                yield index
+
+        def fn(item):
+            if item == 0:
+                time.sleep(0.2)
+                seen.append(len(consumed))
+            return item
+
+        results = list(run_bulk(fn, items(), concurrency=3))
+        self.assertEqual([result.value for result in results], list(range(100)))
+        # At most `concurrency` results are held back, in addition to the pending calls.
+        self.assertLessEqual(seen[0], 6)
+
+    def test_stop_early(self):
+        calls = []
+        results = run_bulk(calls.append, range(1000), concurrency=2)
+        next(results)
+        results.close()
+        self.assertLessEqual(len(calls), 3)
+
+    def test_invalid_concurrency(self):
+        self.assertRaises(ValueError, run_bulk, print, [], concurrency=0)
+
+
+try:
+    import asyncio
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+    from grafana_client.bulk import arun_bulk
+    from grafana_client.client import GrafanaUnauthorizedError
+
+    from .util import make_response
+
+    class AsyncBulkTestCase(IsolatedAsyncioTestCase):
+        async def test_map(self):
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(verb, url, **kwargs):  # noqa: ARG001
+                return make_response(200, {"dashboard": {"uid": url.rsplit("/", 1)[-1]}})
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            uids = [f"uid-{index}" for index in range(20)]
+            results = [result async for result in grafana.map(grafana.dashboard.get_dashboard, uids, concurrency=4)]
+            self.assertEqual([result.value["dashboard"]["uid"] for result in results], uids)
+
+        async def test_map_slow_head(self):
+            grafana = AsyncGrafanaApi.from_url()
+            requested = []
+            seen = []
+
+            async def request(verb, url, **kwargs):  # noqa: ARG001
+                uid = url.rsplit("/", 1)[-1]
+                requested.append(uid)
+                if uid == "uid-0":
+                    await asyncio.sleep(0.2)
+                    seen.append(len(requested))
+                return make_response(200, {"dashboard": {"uid": uid}})
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            uids = [f"uid-{index}" for index in range(100)]
+            results = [result async for result in grafana.map(grafana.dashboard.get_dashboard, uids, concurrency=4)]
+            self.assertEqual([result.value["dashboard"]["uid"] for result in results], uids)
+            # Pending calls, and results held back, are bounded by the concurrency.
+            self.assertLessEqual(seen[0], 8)
+
+        async def test_as_completed(self):
+            async def fn(delay):
+                await asyncio.sleep(delay)
+                return delay
+
+            grafana = AsyncGrafanaApi.from_url()
+            results = [result async for result in grafana.as_completed(fn, [0.2, 0.01], concurrency=2)]
+            self.assertEqual([result.value for result in results], [0.01, 0.2])
+
+        async def test_bounded_concurrency(self):
+            running = 0
+            peak = 0
+            consumed = []
+
+            def items():
+                for index in range(50):
+                    consumed.append(index)
+                    yield index
+
+            async def fn(item):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.001)
+                running -= 1
+                finished.append(item)
+                return item
+
+            finished = []
+            results = arun_bulk(fn, items(), concurrency=3)
+            first = await results.__anext__()
+            self.assertEqual(first.value, 0)
+            # Only consuming items for the free slots.
+            self.assertLessEqual(len(consumed) - len(finished), 3)
+            self.assertEqual([result.value async for result in results], list(range(1, 50)))
+            self.assertLessEqual(peak, 3)
+
+        async def test_async_iterable(self):
+            async def items():
+                for index in range(5):
+                    yield index
+
+            async def fn(item):
+                return item * 2
+
+            results = [result.value async for result in arun_bulk(fn, items(), concurrency=2)]
+            self.assertEqual(results, [0, 2, 4, 6, 8])
+
+        async def test_no_head_of_line_blocking(self):
+            others = asyncio.Semaphore(0)
+
+            async def fn(item):
+                if item == 0:
+                    # Only completes when as many following calls as the concurrency went ahead.
+                    for _ in range(2):
+                        await asyncio.wait_for(others.acquire(), 5)
+                else:
+                    others.release()
+                return item
+
+            start = time.perf_counter()
+            results = [result.value async for result in arun_bulk(fn, range(10), concurrency=2)]
+            self.assertLess(time.perf_counter() - start, 1)
+            self.assertEqual(results, list(range(10)))
+
+        async def test_bounded_buffer(self):
+            consumed = []
+            seen = []
+
+            def items():
+                for index in range(100):
+                    consumed.append(index)
+                    yield index
+
+            async def fn(item):
+                if item == 0:
+                    await asyncio.sleep(0.2)
+                    seen.append(len(consumed))
+                return item
+
+            results = [result.value async for result in arun_bulk(fn, items(), concurrency=3)]
+            self.assertEqual(results, list(range(100)))
+            # At most `concurrency` results are held back, in addition to the pending calls.
+            self.assertLessEqual(seen[0], 6)
+
+        async def test_timeout(self):
+            async def fn(delay):
+                await asyncio.sleep(delay)
+                return delay
+
+            results = [result async for result in arun_bulk(fn, [0, 5, 0], timeout=0.05)]
+            self.assertEqual([result.ok for result in results], [True, False, True])
+            self.assertIsInstance(results[1].error, asyncio.TimeoutError)
+
+        async def test_fatal(self):
+            cancelled = []
+
+            async def fn(item):
+                if item == 1:
+                    raise GrafanaUnauthorizedError({"message": "Unauthorized"})
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(item)
+                    raise
+
+            results = arun_bulk(fn, range(1000), concurrency=4, ordered=False, fatal=(GrafanaUnauthorizedError,))
+            with self.assertRaises(GrafanaUnauthorizedError):
+                async for _ in results:
+                    pass
+            self.assertEqual(sorted(cancelled), [0, 2, 3])
+
+        async def test_stop_early(self):
+            started = []
+
+            async def fn(item):
+                started.append(item)
+                await asyncio.sleep(0.01 * item)
+                return item
+
+            results = arun_bulk(fn, range(1000), concurrency=2)
+            self.assertEqual((await results.__anext__()).value, 0)
+            await results.aclose()
+            self.assertLessEqual(len(started), 3)
+
+        def test_invalid_concurrency(self):
+            self.assertRaises(ValueError, arun_bulk, print, [], concurrency=0)
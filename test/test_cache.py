@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import patch
+
+from grafana_client import GrafanaApi, ResponseCache
+from grafana_client.cache import is_below
+from grafana_client.client import GrafanaServerError
+
+from .compat import requests_mock
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+HEALTH = {"commit": "14e988bd22", "database": "ok", "version": "9.0.1"}
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(ttl=60, maxsize=3, ttls={"/health": 300, "/search": 0})
+        self.grafana = GrafanaApi(("admin", "admin"), host="localhost", protocol="http", cache=self.cache)
+
+    def test_ttl_for(self):
+        self.assertEqual(self.cache.ttl_for("/health"), 300)
+        self.assertEqual(self.cache.ttl_for("/search"), 0)
+        self.assertEqual(self.cache.ttl_for("/folders"), 60)
+
+    def test_is_below(self):
+        self.assertTrue(is_below("/folders/abc", "/folders"))
+        self.assertTrue(is_below("/folders", "/folders"))
+        self.assertFalse(is_below("/foldersabc", "/folders"))
+
+    @requests_mock.Mocker()
+    def test_hit(self, m):
+        m.get("http://localhost/api/health", json=HEALTH)
+        self.assertEqual(self.grafana.health.check(), HEALTH)
+        self.assertEqual(self.grafana.health.check(), HEALTH)
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["hit_ratio"], 0.5)
+
+    @requests_mock.Mocker()
+    def test_hit_returns_independent_copies(self, m):
+        m.get("http://localhost/api/health", json=HEALTH)
+        self.grafana.health.check()["version"] = "garbage"
+        self.assertEqual(self.grafana.health.check(), HEALTH)
+
+    @requests_mock.Mocker()
+    def test_params_are_part_of_key(self, m):
+        m.get("http://localhost/api/folders", json=[])
+        self.grafana.folder.get_all_folders()
+        self.grafana.folder.get_all_folders(parent_uid="foo")
+        self.grafana.folder.get_all_folders(parent_uid="foo")
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_ttl_zero_disables_caching(self, m):
+        m.get("http://localhost/api/search", json=[])
+        self.grafana.search.search_dashboards()
+        self.grafana.search.search_dashboards()
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(len(self.cache), 0)
+
+    @requests_mock.Mocker()
+    def test_expiry(self, m):
+        m.get("http://localhost/api/folders", json=[])
+        with patch("grafana_client.cache.time.monotonic", return_value=1000.0):
+            self.grafana.folder.get_all_folders()
+        with patch("grafana_client.cache.time.monotonic", return_value=1061.0):
+            self.grafana.folder.get_all_folders()
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_lru_eviction(self, m):
+        m.get(requests_mock.ANY, json={})
+        for uid in ["a", "b", "c"]:
+            self.grafana.folder.get_folder(uid)
+        self.grafana.folder.get_folder("a")
+        self.grafana.folder.get_folder("d")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.grafana.folder.get_folder("a")
+        self.assertEqual(m.call_count, 4)
+        self.grafana.folder.get_folder("b")
+        self.assertEqual(m.call_count, 5)
+
+    @requests_mock.Mocker()
+    def test_revalidation(self, m):
+        m.register_uri(
+            "GET",
+            "http://localhost/api/folders/abc",
+            [
+                {"json": {"uid": "abc"}, "headers": {**JSON_HEADERS, "ETag": '"v1"'}},
+                {"status_code": 304, "text": ""},
+            ],
+        )
+        with patch("grafana_client.cache.time.monotonic", return_value=1000.0):
+            self.grafana.folder.get_folder("abc")
+        with patch("grafana_client.cache.time.monotonic", return_value=2000.0):
+            self.assertEqual(self.grafana.folder.get_folder("abc"), {"uid": "abc"})
+            self.assertEqual(m.last_request.headers["If-None-Match"], '"v1"')
+            self.grafana.folder.get_folder("abc")
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+
+    @requests_mock.Mocker()
+    def test_write_invalidates_resource_and_collection(self, m):
+        m.get("http://localhost/api/folders", json=[])
+        m.get("http://localhost/api/folders/abc", json={"uid": "abc"})
+        m.get("http://localhost/api/folders/abcdef", json={"uid": "abcdef"})
+        m.get("http://localhost/api/folders/abc/permissions", json=[])
+        m.put("http://localhost/api/folders/abc", json={"uid": "abc"})
+        self.cache.maxsize = 10
+        self.grafana.folder.get_all_folders()
+        self.grafana.folder.get_folder("abc")
+        self.grafana.folder.get_folder("abcdef")
+        self.grafana.folder.get_folder_permissions("abc")
+        self.assertEqual(len(self.cache), 4)
+
+        self.grafana.folder.update_folder("abc", title="foo")
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.stats()["invalidations"], 3)
+
+    @requests_mock.Mocker()
+    def test_failed_write_invalidates(self, m):
+        m.get("http://localhost/api/folders/abc", json={"uid": "abc"})
+        m.delete("http://localhost/api/folders/abc", status_code=500, json={"message": "error"})
+        self.grafana.folder.get_folder("abc")
+        with self.assertRaises(GrafanaServerError):
+            self.grafana.folder.delete_folder("abc")
+        self.assertEqual(len(self.cache), 0)
+
+    def test_dependencies(self):
+        self.cache.ttls = {}
+        response = type("Response", (), {"headers": {}})()
+        self.cache.store("search", "/search", response)
+        self.assertEqual(self.cache.invalidate("/dashboards/db"), 1)
+
+    @requests_mock.Mocker()
+    def test_update_dashboard_invalidates_dashboard(self, m):
+        m.register_uri(
+            "GET",
+            "http://localhost/api/dashboards/uid/abc",
+            [
+                {"json": {"dashboard": {"version": 1}}, "headers": JSON_HEADERS},
+                {"json": {"dashboard": {"version": 2}}, "headers": JSON_HEADERS},
+            ],
+        )
+        m.post("http://localhost/api/dashboards/db", json={"status": "success"})
+        self.assertEqual(self.grafana.dashboard.get_dashboard("abc")["dashboard"]["version"], 1)
+        self.grafana.dashboard.update_dashboard({"dashboard": {"uid": "abc"}, "overwrite": True})
+        self.assertEqual(self.grafana.dashboard.get_dashboard("abc")["dashboard"]["version"], 2)
+
+    @requests_mock.Mocker()
+    def test_shared_between_instances_and_users(self, m):
+        m.get("http://localhost/api/folders/abc", json={"instance": "localhost"})
+        m.get("http://other/api/folders/abc", json={"instance": "other"})
+        other = GrafanaApi(("admin", "admin"), host="other", protocol="http", cache=self.cache)
+        self.assertEqual(self.grafana.folder.get_folder("abc"), {"instance": "localhost"})
+        self.assertEqual(other.folder.get_folder("abc"), {"instance": "other"})
+
+        viewer = GrafanaApi(("viewer", "viewer"), host="localhost", protocol="http", cache=self.cache)
+        viewer.folder.get_folder("abc")
+        self.assertEqual(m.call_count, 3)
+        self.grafana.folder.get_folder("abc")
+        self.assertEqual(m.call_count, 3)
+
+        # Writes invalidate the entries of all users of the same instance only.
+        m.delete("http://localhost/api/folders/abc", json={})
+        self.grafana.folder.delete_folder("abc")
+        self.assertEqual(len(self.cache), 1)
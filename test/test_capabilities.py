@@ -0,0 +1,114 @@
+import os
+import unittest
+from unittest import mock
+
+from verlib2 import Version
+
+from grafana_client import AsyncGrafanaApi, Capabilities, GrafanaApi
+
+from .compat import requests_mock
+from .util import JSON_HEADERS, make_response
+
+HEALTH = {"commit": "14e988bd22", "database": "ok", "version": "10.4.1"}
+
+
+class CapabilitiesTestCase(unittest.TestCase):
+    def test_from_health(self):
+        capabilities = Capabilities.from_health(HEALTH)
+        self.assertEqual(capabilities.version, Version("10.4.1"))
+        self.assertEqual(capabilities.version_string, "10.4.1")
+        self.assertEqual(capabilities.commit, "14e988bd22")
+        self.assertFalse(capabilities.pinned)
+        self.assertFalse(capabilities.dashboard_by_slug)
+        self.assertTrue(capabilities.library_elements)
+        self.assertTrue(capabilities.native_datasource_health)
+        self.assertFalse(capabilities.datasource_permissions)
+
+    def test_legacy_version(self):
+        capabilities = Capabilities.from_version("7.5.17")
+        self.assertTrue(capabilities.dashboard_by_slug)
+        self.assertFalse(capabilities.library_elements)
+        self.assertFalse(capabilities.native_datasource_health)
+        self.assertTrue(capabilities.datasource_permissions)
+
+    def test_datasource_permissions(self):
+        self.assertTrue(Capabilities.from_version("10.2.2").datasource_permissions)
+        self.assertFalse(Capabilities.from_version("10.2.3").datasource_permissions)
+
+    def test_version_aliases(self):
+        from grafana_client.elements import dashboard, datasource, libraryelement
+
+        self.assertEqual(dashboard.VERSION_8, Version("8"))
+        self.assertEqual(libraryelement.VERSION_8_2, Version("8.2"))
+        self.assertEqual((datasource.VERSION_9, datasource.VERSION_10_2_2), (Version("9"), Version("10.2.2")))
+
+    def test_unknown_version(self):
+        capabilities = Capabilities.from_health({"database": "ok"})
+        self.assertIsNone(capabilities.version)
+        self.assertIsNone(capabilities.library_elements)
+        self.assertIsNone(capabilities.dashboard_by_slug)
+        self.assertIsNone(capabilities.datasource_permissions)
+
+    def test_to_dict(self):
+        self.assertEqual(Capabilities.from_version("9.0.1", pinned=True).to_dict()["pinned"], True)
+
+
+class ApiCapabilitiesTestCase(unittest.TestCase):
+    @requests_mock.Mocker()
+    def test_probed_once(self, m):
+        m.get("http://localhost:3000/api/health", json=HEALTH, headers=JSON_HEADERS)
+        m.get("http://localhost:3000/api/library-elements/foo", json={"result": {}}, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url()
+        grafana.libraryelement.get_library_element("foo")
+        grafana.libraryelement.get_library_element("foo")
+        self.assertIs(grafana.capabilities, grafana.capabilities)
+        self.assertEqual([request.path for request in m.request_history].count("/api/health"), 1)
+
+    @requests_mock.Mocker()
+    def test_pinned_version(self, m):
+        grafana = GrafanaApi.from_url(grafana_version="7.5.17")
+        self.assertEqual(grafana.version, "7.5.17")
+        self.assertTrue(grafana.capabilities.pinned)
+        with self.assertRaises(DeprecationWarning):
+            grafana.libraryelement.get_library_element("foo")
+        self.assertEqual(m.call_count, 0)
+
+    @mock.patch.dict(os.environ, {"GRAFANA_VERSION": "10.4.1"})
+    def test_pinned_version_from_env(self):
+        grafana = GrafanaApi.from_env()
+        self.assertEqual(grafana.capabilities.version, Version("10.4.1"))
+        self.assertTrue(grafana.capabilities.pinned)
+
+    @requests_mock.Mocker()
+    def test_connect_refreshes(self, m):
+        m.get("http://localhost:3000/api/health", json=HEALTH, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url()
+        grafana._grafana_info = {"version": "9.0.1"}
+        self.assertEqual(grafana.capabilities.version, Version("9.0.1"))
+        grafana.connect()
+        self.assertEqual(grafana.capabilities.version, Version("10.4.1"))
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+
+    class AsyncApiCapabilitiesTestCase(IsolatedAsyncioTestCase):
+        async def test_probed_once(self):
+            grafana = AsyncGrafanaApi.from_url()
+            grafana.client.s.request = AsyncMock(return_value=make_response(200, HEALTH))
+            first = await grafana.capabilities
+            second = await grafana.capabilities
+            self.assertIs(first, second)
+            self.assertEqual(first.version, Version("10.4.1"))
+            self.assertEqual(grafana.client.s.request.call_count, 1)
+
+        async def test_pinned_version(self):
+            grafana = AsyncGrafanaApi.from_url(grafana_version="7.5.17")
+            grafana.client.s.request = AsyncMock()
+            with self.assertRaises(DeprecationWarning):
+                await grafana.libraryelement.get_library_element("foo")
+            grafana.client.s.request.assert_not_called()
@@ -0,0 +1,156 @@
+import unittest
+from unittest.mock import Mock
+
+import niquests
+
+from grafana_client import CircuitBreaker, GrafanaApi
+from grafana_client.client import GrafanaCircuitOpenError, GrafanaClientError, GrafanaServerError, GrafanaTimeoutError
+from grafana_client.model import DatasourceIdentifier
+
+from .compat import requests_mock
+from .util import make_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.changes = []
+        self.breaker = CircuitBreaker(
+            failure_threshold=2,
+            recovery_timeout=10,
+            clock=self.clock,
+            on_state_change=lambda *args: self.changes.append(args),
+        )
+        self.key = "GET /health"
+
+    def fail(self):
+        self.breaker.before_request(self.key)
+        self.breaker.record(self.key, GrafanaServerError(503, None, "unavailable"))
+
+    def test_key_for(self):
+        self.assertEqual(self.breaker.key_for("get", "/dashboards/uid/abc"), "GET /dashboards/uid/{uid}")
+        self.assertEqual(
+            self.breaker.key_for("POST", "/ds/query", {"queries": [{"datasource": {"uid": "abc"}}]}),
+            "POST /ds/query [datasource=abc]",
+        )
+        self.breaker.per_datasource = False
+        self.assertEqual(
+            self.breaker.key_for("POST", "/datasources/proxy/5/query"), "POST /datasources/proxy/{id}/{path}"
+        )
+
+    def test_is_failure(self):
+        self.assertFalse(self.breaker.is_failure(None))
+        self.assertFalse(self.breaker.is_failure(GrafanaClientError(404, None, "not found")))
+        self.assertTrue(self.breaker.is_failure(GrafanaServerError(500, None, "error")))
+        self.assertTrue(self.breaker.is_failure(GrafanaTimeoutError(0, None, "timeout")))
+        self.assertTrue(self.breaker.is_failure(niquests.exceptions.ConnectionError("refused")))
+
+    def test_lifecycle(self):
+        self.fail()
+        self.assertEqual(self.breaker.state(self.key), "closed")
+        self.fail()
+        self.assertEqual(self.breaker.state(self.key), "open")
+
+        with self.assertRaises(GrafanaCircuitOpenError) as ctx:
+            self.breaker.before_request(self.key)
+        self.assertEqual(ctx.exception.retry_in, 10)
+        self.assertIsInstance(ctx.exception, GrafanaServerError)
+
+        # After the recovery timeout, a single trial request passes.
+        self.clock.now += 10
+        self.breaker.before_request(self.key)
+        self.assertEqual(self.breaker.state(self.key), "half-open")
+        self.assertRaises(GrafanaCircuitOpenError, lambda: self.breaker.before_request(self.key))
+
+        # A failing trial request reopens the circuit.
+        self.breaker.record(self.key, GrafanaTimeoutError(0, None, "timeout"))
+        self.assertEqual(self.breaker.state(self.key), "open")
+
+        # A succeeding trial request closes the circuit.
+        self.clock.now += 10
+        self.breaker.before_request(self.key)
+        self.breaker.record(self.key)
+        self.assertEqual(self.breaker.state(self.key), "closed")
+
+        self.assertEqual(
+            [change[1:] for change in self.changes],
+            [
+                ("closed", "open"),
+                ("open", "half-open"),
+                ("half-open", "open"),
+                ("open", "half-open"),
+                ("half-open", "closed"),
+            ],
+        )
+
+    def test_success_resets_failures(self):
+        self.fail()
+        self.breaker.record(self.key)
+        self.fail()
+        self.assertEqual(self.breaker.state(self.key), "closed")
+
+    def test_lost_trial_is_replaced(self):
+        self.fail()
+        self.fail()
+        self.clock.now += 10
+        self.breaker.before_request(self.key)
+        self.clock.now += 10
+        self.breaker.before_request(self.key)
+
+    def test_states_and_reset(self):
+        self.fail()
+        self.fail()
+        self.clock.now += 4
+        self.assertRaises(GrafanaCircuitOpenError, lambda: self.breaker.before_request(self.key))
+        states = self.breaker.states()
+        self.assertEqual(states[self.key]["state"], "open")
+        self.assertEqual(states[self.key]["total_failures"], 2)
+        self.assertEqual(states[self.key]["total_rejected"], 1)
+        self.assertEqual(states[self.key]["retry_in"], 6)
+        self.breaker.reset()
+        self.assertEqual(self.breaker.states(), {})
+
+
+class CircuitBreakerClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        self.grafana = GrafanaApi.from_url("http://localhost", circuit_breaker=self.breaker)
+
+    @requests_mock.Mocker()
+    def test_fail_fast(self, m):
+        m.get("http://localhost/api/datasources/uid/down/health", status_code=502, json={"message": "bad gateway"})
+        m.get("http://localhost/api/datasources/uid/up/health", json={"status": "OK"})
+        for _ in range(2):
+            self.assertRaises(GrafanaServerError, lambda: self.grafana.datasource.health("down"))
+        self.assertRaises(GrafanaCircuitOpenError, lambda: self.grafana.datasource.health("down"))
+        self.assertEqual(m.call_count, 2)
+
+        # Other data sources are not affected.
+        self.assertEqual(self.grafana.datasource.health("up"), {"status": "OK"})
+        self.assertEqual(self.breaker.state("GET /datasources/uid/{uid}/health [datasource=down]"), "open")
+
+    @requests_mock.Mocker()
+    def test_client_errors_do_not_open(self, m):
+        m.get("http://localhost/api/folders/foo", status_code=404, json={"message": "not found"})
+        for _ in range(3):
+            self.assertRaises(GrafanaClientError, lambda: self.grafana.folder.get_folder("foo"))
+        self.assertEqual(m.call_count, 3)
+
+    def test_health_check_fails_fast(self):
+        datasource = {"id": 1, "uid": "abc", "type": "prometheus", "access": "proxy", "url": "http://prometheus"}
+        self.grafana.client.s.request = Mock(return_value=make_response(503, {"message": "unavailable"}))
+        self.grafana._grafana_info = {"version": "9.0.1"}
+        self.grafana.datasource.get = Mock(return_value=datasource)
+        for _ in range(3):
+            response = self.grafana.datasource.health_check(DatasourceIdentifier(uid="abc"))
+            self.assertFalse(response.success)
+        self.assertEqual(self.grafana.client.s.request.call_count, 2)
+        self.assertIn("Circuit open", response.message)
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from grafana_client import AsyncGrafanaApi, GrafanaApi
+from grafana_client.client import GrafanaServerError
+from grafana_client.coalesce import SingleFlight
+
+from .util import make_response
+
+HEALTH = {"commit": "14e988bd22", "database": "ok", "version": "9.0.1"}
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def test_sequential_calls_are_not_coalesced(self):
+        flights = SingleFlight()
+        self.assertEqual(flights.do("foo", lambda: 1), 1)
+        self.assertEqual(flights.do("foo", lambda: 2), 2)
+        self.assertEqual(flights.stats(), {"requests": 2, "coalesced": 0, "in_flight": 0})
+
+    def test_concurrent_calls_are_coalesced(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return {"value": 42}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            leader = executor.submit(flights.do, "foo", fn)
+            started.wait()
+            followers = [executor.submit(flights.do, "foo", fn) for _ in range(7)]
+            while flights.coalesced < 7:
+                time.sleep(0.001)
+            release.set()
+            results = [leader.result()] + [future.result() for future in followers]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_errors_are_shared(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fn():
+            started.set()
+            release.wait()
+            raise ValueError("failed")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flights.do, "foo", fn)
+            started.wait()
+            follower = executor.submit(flights.do, "foo", fn)
+            while flights.coalesced < 1:
+                time.sleep(0.001)
+            release.set()
+            self.assertRaises(ValueError, leader.result)
+            self.assertRaises(ValueError, follower.result)
+        self.assertEqual(len(flights), 0)
+
+
+class SyncCoalesceTestCase(unittest.TestCase):
+    def test_disabled_by_default(self):
+        grafana = GrafanaApi.from_url()
+        self.assertIsNone(grafana.client.flights)
+
+    def test_identical_gets(self):
+        grafana = GrafanaApi.from_url(coalesce=True)
+
+        def request(*args, **kwargs):  # noqa: ARG001
+            time.sleep(0.05)
+            return make_response(200, HEALTH)
+
+        grafana.client.s.request = Mock(side_effect=request)
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(lambda _: grafana.health.check(), range(10)))
+
+        self.assertEqual(results, [HEALTH] * 10)
+        self.assertLess(grafana.client.s.request.call_count, 10)
+        self.assertEqual(grafana.client.flights.requests + grafana.client.flights.coalesced, 10)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+
+    class AsyncCoalesceTestCase(IsolatedAsyncioTestCase):
+        def setUp(self):
+            self.grafana = AsyncGrafanaApi.from_url(coalesce=True)
+
+        def mock_request(self, status_code=200, payload=None):
+            async def request(*args, **kwargs):  # noqa: ARG001
+                await asyncio.sleep(0.01)
+                return make_response(status_code, payload)
+
+            self.grafana.client.s.request = AsyncMock(side_effect=request)
+
+        async def test_identical_gets(self):
+            self.mock_request(payload=HEALTH)
+            results = await asyncio.gather(*[self.grafana.health.check() for _ in range(50)])
+            self.assertEqual(self.grafana.client.s.request.await_count, 1)
+            self.assertTrue(all(result is results[0] for result in results))
+            self.assertEqual(self.grafana.client.flights.stats(), {"requests": 1, "coalesced": 49, "in_flight": 0})
+
+        async def test_different_gets(self):
+            self.mock_request(payload={})
+            await asyncio.gather(self.grafana.folder.get_folder("a"), self.grafana.folder.get_folder("b"))
+            self.assertEqual(self.grafana.client.s.request.await_count, 2)
+
+        async def test_writes_are_not_coalesced(self):
+            self.mock_request(payload={})
+            await asyncio.gather(*[self.grafana.folder.create_folder("foo") for _ in range(3)])
+            self.assertEqual(self.grafana.client.s.request.await_count, 3)
+
+        async def test_errors_are_shared(self):
+            self.mock_request(status_code=503, payload={"message": "unavailable"})
+            results = await asyncio.gather(*[self.grafana.health.check() for _ in range(3)], return_exceptions=True)
+            self.assertTrue(all(isinstance(result, GrafanaServerError) for result in results))
+            self.assertEqual(self.grafana.client.s.request.await_count, 1)
+
+        async def test_cancelled_caller_does_not_cancel_others(self):
+            self.mock_request(payload=HEALTH)
+            first = asyncio.ensure_future(self.grafana.health.check())
+            second = asyncio.ensure_future(self.grafana.health.check())
+            await asyncio.sleep(0)
+            first.cancel()
+            self.assertEqual(await second, HEALTH)
+            self.assertTrue(first.cancelled())
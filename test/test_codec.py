@@ -0,0 +1,91 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from grafana_client import GrafanaApi, JsonCodec
+from grafana_client.codec import OrjsonCodec, UjsonCodec, get_codec
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+PAYLOAD = {"dashboard": {"uid": "cIBgcSjkk", "title": "Überblick"}, "overwrite": True}
+
+
+def installed(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+class JsonCodecTestCase(unittest.TestCase):
+    def test_stdlib(self):
+        codec = get_codec("json")
+        self.assertEqual(type(codec), JsonCodec)
+        data = codec.dumps(PAYLOAD)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(codec.loads(data), PAYLOAD)
+        self.assertRaises(ValueError, codec.dumps, {"value": float("nan")})
+        self.assertRaises(json.JSONDecodeError, codec.loads, b"")
+
+    def test_instance(self):
+        codec = JsonCodec()
+        self.assertIs(get_codec(codec), codec)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError) as ctx:
+            get_codec("foobar")
+        self.assertEqual(str(ctx.exception), "Unknown JSON codec `foobar`, use one of auto, orjson, ujson, json")
+
+    @unittest.skipUnless(installed("orjson"), "orjson not installed")
+    def test_orjson(self):
+        codec = get_codec("orjson")
+        self.assertEqual(codec.name, "orjson")
+        self.assertEqual(codec.loads(codec.dumps(PAYLOAD)), PAYLOAD)
+        self.assertEqual(codec.loads(codec.dumps({1: "one"})), {"1": "one"})
+        self.assertRaises(json.JSONDecodeError, codec.loads, b"")
+
+    @unittest.skipUnless(installed("ujson"), "ujson not installed")
+    def test_ujson(self):
+        codec = get_codec("ujson")
+        self.assertEqual(codec.loads(codec.dumps(PAYLOAD)), PAYLOAD)
+        self.assertRaises(json.JSONDecodeError, codec.loads, b"")
+
+    def test_auto_fallback(self):
+        with mock.patch.object(OrjsonCodec, "__init__", side_effect=ImportError), mock.patch.object(
+            UjsonCodec, "__init__", side_effect=ImportError
+        ):
+            self.assertEqual(type(get_codec("auto")), JsonCodec)
+
+
+class ClientJsonCodecTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grafana = GrafanaApi.from_url(json_codec="json")
+
+    def test_default(self):
+        self.assertIsNone(GrafanaApi.from_url().client.json_codec)
+
+    @mock.patch.dict(os.environ, {"GRAFANA_JSON_CODEC": "json"})
+    def test_from_env(self):
+        self.assertEqual(type(GrafanaApi.from_env().client.json_codec), JsonCodec)
+
+    @requests_mock.Mocker()
+    def test_encode_request(self, m):
+        m.post("http://localhost:3000/api/dashboards/db", json={"status": "success"}, headers=JSON_HEADERS)
+        result = self.grafana.dashboard.update_dashboard(PAYLOAD)
+        self.assertEqual(result, {"status": "success"})
+        self.assertEqual(m.last_request.headers["Content-Type"], "application/json")
+        self.assertIsInstance(m.last_request.body, bytes)
+        self.assertEqual(json.loads(m.last_request.body), PAYLOAD)
+
+    @requests_mock.Mocker()
+    def test_decode_response(self, m):
+        m.get("http://localhost:3000/api/dashboards/uid/cIBgcSjkk", json=PAYLOAD, headers=JSON_HEADERS)
+        self.assertEqual(self.grafana.dashboard.get_dashboard("cIBgcSjkk"), PAYLOAD)
+
+    @requests_mock.Mocker()
+    def test_decode_empty_response(self, m):
+        m.post("http://localhost:3000/api/annotations", text="")
+        self.assertEqual(self.grafana.client.POST("/annotations", json={}, accept_empty_json=True), "")
@@ -0,0 +1,95 @@
+import gzip
+import json
+import os
+import unittest
+import zlib
+
+from grafana_client import GrafanaApi, RequestCompression
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+DASHBOARD = {
+    "dashboard": {
+        "uid": "cIBgcSjkk",
+        "title": "Production Overview",
+        "panels": [{"id": index, "type": "timeseries", "title": "Requests per second"} for index in range(100)],
+    },
+    "overwrite": True,
+}
+
+
+class RequestCompressionTestCase(unittest.TestCase):
+    def test_gzip(self):
+        compression = RequestCompression(threshold=100)
+        body = json.dumps(DASHBOARD).encode()
+        result, encoding = compression.compress(body)
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(gzip.decompress(result), body)
+
+    def test_deflate(self):
+        compression = RequestCompression(encoding="deflate", threshold=100, level=9)
+        body = json.dumps(DASHBOARD)
+        result, encoding = compression.compress(body)
+        self.assertEqual(encoding, "deflate")
+        self.assertEqual(zlib.decompress(result), body.encode())
+
+    def test_below_threshold(self):
+        compression = RequestCompression(threshold=1024)
+        self.assertEqual(compression.compress(b'{"uid": "foo"}'), (b'{"uid": "foo"}', None))
+
+    def test_incompressible(self):
+        compression = RequestCompression(threshold=0)
+        body = os.urandom(256)
+        self.assertEqual(compression.compress(body), (body, None))
+
+    def test_stats(self):
+        compression = RequestCompression(threshold=100)
+        body = json.dumps(DASHBOARD).encode()
+        compressed, _ = compression.compress(body)
+        compression.compress(b"{}")
+        stats = compression.stats()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["compressed"], 1)
+        self.assertEqual(stats["bytes_raw"], len(body) + 2)
+        self.assertEqual(stats["bytes_sent"], len(compressed) + 2)
+        self.assertEqual(stats["bytes_saved"], len(body) - len(compressed))
+        self.assertLess(stats["ratio"], 0.2)
+
+    def test_invalid_encoding(self):
+        self.assertRaises(ValueError, RequestCompression, encoding="br")
+
+
+class ClientCompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.compression = RequestCompression(threshold=1024)
+        self.grafana = GrafanaApi.from_url(compression=self.compression)
+
+    @requests_mock.Mocker()
+    def test_compressed_request(self, m):
+        m.post("http://localhost:3000/api/dashboards/db", json={"status": "success"}, headers=JSON_HEADERS)
+        self.grafana.dashboard.update_dashboard(DASHBOARD)
+        request = m.last_request
+        self.assertEqual(request.headers["Content-Encoding"], "gzip")
+        self.assertEqual(request.headers["Content-Type"], "application/json")
+        self.assertEqual(gzip.decompress(request.body), json.dumps(DASHBOARD, separators=(",", ":")).encode())
+        self.assertEqual(self.grafana.client.stats()["compression"]["compressed"], 1)
+
+    @requests_mock.Mocker()
+    def test_small_request(self, m):
+        m.post("http://localhost:3000/api/folders", json={"uid": "foo"}, headers=JSON_HEADERS)
+        self.grafana.folder.create_folder("Foo")
+        request = m.last_request
+        self.assertNotIn("Content-Encoding", request.headers)
+        self.assertNotIn(b" ", request.body)
+        self.assertEqual(self.grafana.client.stats(), {"compression": self.compression.stats()})
+
+    @requests_mock.Mocker()
+    def test_get_request(self, m):
+        m.get("http://localhost:3000/api/health", json={"database": "ok"}, headers=JSON_HEADERS)
+        self.grafana.health.check()
+        self.assertNotIn("Content-Encoding", m.last_request.headers)
+        self.assertEqual(self.compression.stats()["requests"], 0)
+
+    def test_stats_without_components(self):
+        self.assertEqual(GrafanaApi.from_url().client.stats(), {})
@@ -0,0 +1,177 @@
+import copy
+import re
+import time
+import unittest
+
+from grafana_client import GrafanaApi
+from grafana_client.diff import ADD, REMOVE, REPLACE, Change, diff_dashboards, iter_version_diffs
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+DASHBOARD = {
+    "uid": "overview",
+    "title": "Overview",
+    "version": 3,
+    "panels": [
+        {
+            "id": 1,
+            "type": "timeseries",
+            "gridPos": {"x": 0, "y": 0, "w": 12, "h": 8},
+            "targets": [{"refId": "A", "expr": "up"}, {"refId": "B", "expr": "rate(errors[5m])"}],
+        },
+        {"id": 2, "type": "stat", "gridPos": {"x": 12, "y": 0, "w": 12, "h": 8}},
+    ],
+    "templating": {"list": [{"name": "job", "query": "label_values(job)"}]},
+    "tags": ["prod", "k8s"],
+}
+
+
+def changes(old, new, **kwargs):
+    return [change.to_dict() for change in diff_dashboards(old, new, **kwargs)]
+
+
+class DiffTestCase(unittest.TestCase):
+    def setUp(self):
+        self.new = copy.deepcopy(DASHBOARD)
+
+    def test_unchanged(self):
+        self.new["version"] = 4
+        self.assertEqual(diff_dashboards(DASHBOARD, self.new), [])
+        self.assertEqual(
+            changes(DASHBOARD, self.new, ignore=()), [{"op": REPLACE, "path": "/version", "old": 3, "new": 4}]
+        )
+
+    def test_reorder_panels_and_targets(self):
+        self.new["panels"].reverse()
+        self.new["panels"][1]["targets"].reverse()
+        self.assertEqual(diff_dashboards(DASHBOARD, self.new), [])
+
+    def test_nested_changes(self):
+        self.new["panels"].reverse()
+        self.new["panels"][1]["targets"][1]["expr"] = "rate(errors[1m])"
+        del self.new["panels"][1]["targets"][0]
+        self.new["panels"][1]["targets"].append({"refId": "C", "expr": "down"})
+        self.assertEqual(
+            changes(DASHBOARD, self.new),
+            [
+                {"op": REMOVE, "path": "/panels/id=1/targets/refId=A", "old": {"refId": "A", "expr": "up"}},
+                {
+                    "op": REPLACE,
+                    "path": "/panels/id=1/targets/refId=B/expr",
+                    "old": "rate(errors[5m])",
+                    "new": "rate(errors[1m])",
+                },
+                {"op": ADD, "path": "/panels/id=1/targets/refId=C", "new": {"refId": "C", "expr": "down"}},
+            ],
+        )
+
+    def test_panels_added_and_removed(self):
+        del self.new["panels"][1]
+        self.new["panels"].append({"id": 3, "type": "text"})
+        result = diff_dashboards(DASHBOARD, self.new)
+        self.assertEqual(
+            [(change.op, change.path) for change in result],
+            [
+                (REMOVE, ("panels", "id=2")),
+                (ADD, ("panels", "id=3")),
+            ],
+        )
+
+    def test_grid_position_key(self):
+        old = {"panels": [{"gridPos": {"x": 0, "y": 0}, "title": "A"}, {"gridPos": {"x": 0, "y": 8}, "title": "B"}]}
+        new = {"panels": [{"gridPos": {"x": 0, "y": 8}, "title": "B"}, {"gridPos": {"x": 0, "y": 0}, "title": "C"}]}
+        self.assertEqual(
+            changes(old, new), [{"op": REPLACE, "path": "/panels/gridPos=0,0/title", "old": "A", "new": "C"}]
+        )
+
+    def test_positional(self):
+        self.new["tags"] = ["k8s"]
+        self.new["templating"]["list"].append({"query": "unnamed"})
+        self.assertEqual(
+            changes(DASHBOARD, self.new),
+            [
+                {"op": ADD, "path": "/templating/list/1", "new": {"query": "unnamed"}},
+                {"op": REPLACE, "path": "/tags/0", "old": "prod", "new": "k8s"},
+                {"op": REMOVE, "path": "/tags/1", "old": "k8s"},
+            ],
+        )
+
+    def test_type_change(self):
+        self.assertEqual(changes({"a": 1}, {"a": "1"}), [{"op": REPLACE, "path": "/a", "old": 1, "new": "1"}])
+        self.assertEqual(
+            changes({"a/b": {}}, {"a/b": None}), [{"op": REPLACE, "path": "/a~1b", "old": {}, "new": None}]
+        )
+
+    def test_ignore(self):
+        self.new["panels"][0]["gridPos"]["y"] = 4
+        self.assertEqual(diff_dashboards(DASHBOARD, self.new, ignore=["/panels/id=1/gridPos"]), [])
+
+    def test_change(self):
+        change = Change(ADD, ("panels", "id=1"), new={})
+        self.assertEqual(change.pointer, "/panels/id=1")
+
+    def test_speed(self):
+        panels = [
+            {"id": index, "gridPos": {"x": 0, "y": index}, "targets": [{"refId": "A", "expr": f"metric_{index}"}]}
+            for index in range(500)
+        ]
+        old = {"panels": panels}
+        new = copy.deepcopy(old)
+        new["panels"][250]["targets"][0]["expr"] = "changed"
+        start = time.perf_counter()
+        for _ in range(100):
+            result = diff_dashboards(old, new)
+        self.assertEqual(len(result), 1)
+        self.assertLess((time.perf_counter() - start) / 100, 0.01)
+
+    @requests_mock.Mocker()
+    def test_version_history(self, m):
+        versions = {}
+        for number in range(1, 5):
+            data = copy.deepcopy(DASHBOARD)
+            data["version"] = number
+            data["panels"][0]["targets"][0]["expr"] = f"up{number}"
+            versions[number] = {"version": number, "createdBy": "admin", "message": f"Save {number}", "data": data}
+        m.get(
+            "http://localhost:3000/api/dashboards/uid/overview/versions",
+            json={"versions": [{"version": number} for number in reversed(versions)]},
+            headers=JSON_HEADERS,
+        )
+        m.get(
+            re.compile(r"http://localhost:3000/api/dashboards/uid/overview/versions/\d+"),
+            json=lambda request, context: versions[int(request.url.rsplit("/", 1)[1])],  # noqa: ARG005
+            headers=JSON_HEADERS,
+        )
+        grafana = GrafanaApi.from_url()
+        diffs = list(iter_version_diffs(grafana, "overview", concurrency=2))
+        self.assertEqual([(diff.base, diff.new) for diff in diffs], [(1, 2), (2, 3), (3, 4)])
+        self.assertEqual(diffs[-1].message, "Save 4")
+        self.assertEqual(diffs[-1].changes[0].to_dict()["new"], "up4")
+        self.assertEqual(len(diffs[-1].changes), 1)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+    from grafana_client.diff import aiter_version_diffs
+
+    from .util import make_response
+
+    class AsyncDiffTestCase(IsolatedAsyncioTestCase):
+        async def test_version_history(self):
+            async def request(verb, url, **kwargs):  # noqa: ARG001
+                if url.endswith("/versions"):
+                    return make_response(200, [{"version": 2}, {"version": 1}])
+                number = int(url.rsplit("/", 1)[1])
+                return make_response(200, {"version": number, "data": {"title": f"Version {number}"}})
+
+            grafana = AsyncGrafanaApi.from_url()
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            diffs = [diff async for diff in aiter_version_diffs(grafana, "overview")]
+            self.assertEqual(len(diffs), 1)
+            self.assertEqual(diffs[0].changes, [Change(REPLACE, ("title",), old="Version 1", new="Version 2")])
@@ -0,0 +1,206 @@
+import re
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from grafana_client import DashboardExport, GrafanaApi
+from grafana_client.export import read_export, state_path
+
+from .compat import requests_mock
+
+DASHBOARD_PATTERN = re.compile(r"http://localhost:3000/api/dashboards/uid/([^/]+)$")
+VERSIONS_PATTERN = re.compile(r"http://localhost:3000/api/dashboards/uid/([^/]+)/versions")
+
+
+class FakeGrafana:
+    """
+    Emulate `/search`, `/dashboards/uid/<uid>`, and `/dashboards/uid/<uid>/versions`.
+    """
+
+    def __init__(self, count: int):
+        self.versions = {f"dashboard-{index}": 1 for index in range(count)}
+        self.versions_available = True
+
+    def search(self, request, context):  # noqa: ARG002
+        params = {name: values[0] for name, values in parse_qs(urlparse(request.url).query).items()}
+        limit = int(params.get("limit", 5000))
+        page = int(params.get("page", 1))
+        hits = [{"uid": uid, "title": uid, "type": "dash-db"} for uid in self.versions]
+        return hits[(page - 1) * limit : page * limit]
+
+    def dashboard(self, request, context):
+        uid = DASHBOARD_PATTERN.match(request.url).group(1)
+        if uid not in self.versions:
+            context.status_code = 404
+            return {"message": "Dashboard not found"}
+        return {"dashboard": {"uid": uid, "title": uid, "version": self.versions[uid]}, "meta": {"slug": uid}}
+
+    def dashboard_versions(self, request, context):
+        uid = VERSIONS_PATTERN.match(request.url).group(1)
+        if not self.versions_available:
+            context.status_code = 403
+            return {"message": "Permission denied"}
+        return [{"uid": uid, "version": self.versions[uid]}]
+
+    def mount(self, m):
+        m.get("http://localhost:3000/api/search", json=self.search)
+        m.get(VERSIONS_PATTERN, json=self.dashboard_versions)
+        m.get(DASHBOARD_PATTERN, json=self.dashboard)
+
+
+def calls(m, pattern):
+    return [request for request in m.request_history if pattern.match(request.url)]
+
+
+class DashboardExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grafana = GrafanaApi.from_url()
+        self.server = FakeGrafana(10)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self, name="dashboards.jsonl.gz", **kwargs):
+        return DashboardExport(Path(self.directory.name) / name, concurrency=4, checkpoint_interval=3, **kwargs)
+
+    def read(self, name="dashboards.jsonl.gz"):
+        records = read_export(Path(self.directory.name) / name)
+        return {record["dashboard"]["uid"]: record["dashboard"]["version"] for record in records}
+
+    @requests_mock.Mocker()
+    def test_export(self, m):
+        self.server.mount(m)
+        result = self.export().run(self.grafana)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.exported, 10)
+        self.assertEqual(result.skipped, 0)
+        self.assertEqual(self.read(), self.server.versions)
+        self.assertEqual(calls(m, VERSIONS_PATTERN), [])
+
+    @requests_mock.Mocker()
+    def test_skip_unchanged(self, m):
+        self.server.mount(m)
+        self.export().run(self.grafana)
+        self.server.versions["dashboard-3"] = 2
+        m.reset_mock()
+
+        result = self.export().run(self.grafana)
+        self.assertEqual((result.exported, result.skipped), (1, 9))
+        self.assertEqual(
+            [request.url for request in calls(m, DASHBOARD_PATTERN)],
+            ["http://localhost:3000/api/dashboards/uid/dashboard-3"],
+        )
+        self.assertEqual(calls(m, VERSIONS_PATTERN)[0].qs, {"limit": ["1"]})
+        self.assertEqual(self.read()["dashboard-3"], 2)
+
+        result = self.export(skip_unchanged=False).run(self.grafana)
+        self.assertEqual(result.exported, 10)
+
+    @requests_mock.Mocker()
+    def test_versions_unavailable(self, m):
+        self.server.mount(m)
+        self.export().run(self.grafana)
+        self.server.versions_available = False
+        result = self.export().run(self.grafana)
+        self.assertEqual((result.exported, result.skipped), (0, 10))
+        self.assertEqual(len(calls(m, DASHBOARD_PATTERN)), 20)
+
+    @requests_mock.Mocker()
+    def test_removed(self, m):
+        self.server.mount(m)
+        self.export().run(self.grafana)
+        del self.server.versions["dashboard-0"]
+        result = self.export().run(self.grafana)
+        self.assertEqual(result.removed, ["dashboard-0"])
+        self.assertNotIn("dashboard-0", self.read())
+        self.assertEqual(len(self.read()), 9)
+
+    @requests_mock.Mocker()
+    def test_errors(self, m):
+        self.server.mount(m)
+        m.get("http://localhost:3000/api/dashboards/uid/dashboard-5", status_code=500, json={"message": "Failure"})
+        result = self.export().run(self.grafana)
+        self.assertFalse(result.ok)
+        self.assertEqual(list(result.errors), ["dashboard-5"])
+        self.assertEqual(result.exported, 9)
+        self.assertEqual(result.removed, [])
+
+    @requests_mock.Mocker()
+    def test_resume(self, m):
+        self.server.mount(m)
+
+        def interrupt(done, total):  # noqa: ARG001
+            if done == 7:
+                raise KeyboardInterrupt
+
+        self.assertRaises(KeyboardInterrupt, self.export(progress=interrupt).run, self.grafana)
+        path = Path(self.directory.name) / "dashboards.jsonl.gz"
+        # Records written after the last checkpoint are discarded, like a partially written gzip member.
+        with path.open("ab") as file:
+            file.write(b"\x1f\x8b\x08\x00garbage")
+        m.reset_mock()
+
+        result = self.export().run(self.grafana)
+        self.assertEqual(result.exported + result.skipped, 10)
+        self.assertEqual(result.skipped, 6)
+        self.assertEqual(len(calls(m, DASHBOARD_PATTERN)), 4)
+        self.assertEqual(self.read(), self.server.versions)
+
+    @requests_mock.Mocker()
+    def test_tar(self, m):
+        self.server.mount(m)
+        self.export("dashboards.tar.gz").run(self.grafana)
+        self.server.versions["dashboard-1"] = 5
+        self.export("dashboards.tar.gz").run(self.grafana)
+
+        path = Path(self.directory.name) / "dashboards.tar.gz"
+        with tarfile.open(path, "r:gz") as archive:
+            names = archive.getnames()
+        self.assertEqual(len(names), 11)
+        self.assertIn("dashboards/dashboard-1.json", names)
+        self.assertEqual(self.read("dashboards.tar.gz")["dashboard-1"], 5)
+        self.assertTrue(state_path(path).exists())
+
+    @requests_mock.Mocker()
+    def test_plain(self, m):
+        self.server.mount(m)
+        self.export("dashboards.jsonl").run(self.grafana)
+        path = Path(self.directory.name) / "dashboards.jsonl"
+        self.assertEqual(len(path.read_text().splitlines()), 10)
+        self.assertEqual(self.read("dashboards.jsonl"), self.server.versions)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+
+    from .util import make_response
+
+    class AsyncDashboardExportTestCase(IsolatedAsyncioTestCase):
+        async def test_export(self):
+            server = FakeGrafana(5)
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(verb, url, params=None, **kwargs):  # noqa: ARG001
+                if url.endswith("/api/search"):
+                    hits = [{"uid": uid, "type": "dash-db"} for uid in server.versions]
+                    return make_response(200, hits if int(params.get("page", 1)) == 1 else [])
+                if url.endswith("/versions"):
+                    uid = url.rsplit("/", 2)[-2]
+                    return make_response(200, [{"version": server.versions[uid]}])
+                uid = url.rsplit("/", 1)[-1]
+                return make_response(200, {"dashboard": {"uid": uid, "version": server.versions[uid]}})
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / "dashboards.jsonl.gz"
+                result = await DashboardExport(path).arun(grafana)
+                self.assertEqual(result.exported, 5)
+                self.assertEqual(len(list(read_export(path))), 5)
+                result = await DashboardExport(path).arun(grafana)
+                self.assertEqual((result.exported, result.skipped), (0, 5))
@@ -1,10 +1,12 @@
+import os
 import unittest
 from unittest.mock import Mock, patch
 
 import niquests
 
-from grafana_client.api import GrafanaApi
+from grafana_client.api import AsyncGrafanaApi, GrafanaApi
 from grafana_client.client import (
+    ConnectionSettings,
     GrafanaClientError,
     GrafanaServerError,
     GrafanaTimeoutError,
@@ -172,3 +174,68 @@ class TestGrafanaClient(unittest.TestCase):
         )
         response = grafana.alertingprovisioning.delete_alertrule("foobar")
         self.assertIsNone(response)
+
+    def test_grafana_client_connection_default(self):
+        grafana = GrafanaApi.from_url()
+        adapter = grafana.client.s.adapters["http://"]
+        self.assertIsNone(grafana.client.connection)
+        self.assertEqual(adapter._pool_maxsize, 10)
+        self.assertFalse(adapter._pool_block)
+
+    def test_grafana_client_connection_pool(self):
+        grafana = GrafanaApi.from_url(
+            connection=ConnectionSettings(pool_connections=4, pool_maxsize=50, pool_block=True, http_version="1.1"),
+        )
+        for prefix in ["http://", "https://"]:
+            adapter = grafana.client.s.adapters[prefix]
+            self.assertEqual(adapter._pool_connections, 4)
+            self.assertEqual(adapter._pool_maxsize, 50)
+            self.assertTrue(adapter._pool_block)
+            self.assertTrue(adapter._disable_http2)
+            self.assertTrue(adapter._disable_http3)
+
+    def test_grafana_client_connection_async(self):
+        grafana = AsyncGrafanaApi.from_url(
+            connection=ConnectionSettings(pool_maxsize=200, http_version=2, multiplexed=True),
+        )
+        adapter = grafana.client.s.adapters["https://"]
+        self.assertIsInstance(adapter, niquests.adapters.AsyncHTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, 200)
+        self.assertFalse(adapter._disable_http2)
+        self.assertTrue(adapter._disable_http3)
+        self.assertTrue(grafana.client.s.multiplexed)
+        self.assertEqual(grafana.client.s.headers["Connection"], "keep-alive")
+
+    def test_grafana_client_connection_no_keepalive(self):
+        grafana = AsyncGrafanaApi.from_url(connection=ConnectionSettings(keepalive=False))
+        self.assertEqual(grafana.client.s.headers["Connection"], "close")
+
+    def test_grafana_client_connection_invalid_http_version(self):
+        with self.assertRaises(ValueError):
+            ConnectionSettings(http_version="0.9")
+        # HTTP/3 can not be enforced, only disabled.
+        with self.assertRaises(ValueError):
+            ConnectionSettings(http_version=3)
+
+    def test_grafana_client_connection_default_http_version(self):
+        adapter = GrafanaApi.from_url().client.s.adapters["https://"]
+        self.assertFalse(adapter._disable_http2)
+        self.assertFalse(adapter._disable_http3)
+
+    def test_grafana_client_connection_from_env(self):
+        env = {
+            "GRAFANA_URL": "http://localhost:3000",
+            "GRAFANA_POOL_MAXSIZE": "42",
+            "GRAFANA_POOL_BLOCK": "true",
+            "GRAFANA_HTTP_VERSION": "2",
+        }
+        with patch.dict(os.environ, env):
+            grafana = GrafanaApi.from_env()
+        self.assertEqual(
+            grafana.client.connection, ConnectionSettings(pool_maxsize=42, pool_block=True, http_version="2")
+        )
+        self.assertEqual(grafana.client.s.adapters["http://"]._pool_maxsize, 42)
+
+    def test_grafana_client_connection_from_env_invalid(self):
+        with patch.dict(os.environ, {"GRAFANA_POOL_MAXSIZE": "many"}):
+            self.assertRaises(ValueError, lambda: GrafanaApi.from_env())
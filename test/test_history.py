@@ -0,0 +1,251 @@
+import copy
+import datetime
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from grafana_client import GrafanaApi, VersionHistory
+from grafana_client.diff import diff_dashboards
+from grafana_client.history import resolve, touched_datasources
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+VERSIONS_PATTERN = re.compile(r"http://localhost:3000/api/dashboards/uid/([^/]+)/versions(?:\?|$)")
+VERSION_PATTERN = re.compile(r"http://localhost:3000/api/dashboards/uid/([^/]+)/versions/(\d+)(?:\?|$)")
+
+MODEL = {
+    "title": "Overview",
+    "panels": [
+        {"id": 1, "datasource": {"uid": "prometheus"}, "targets": [{"refId": "A", "expr": "up"}]},
+        {"id": 2, "datasource": {"uid": "loki"}, "targets": [{"refId": "A", "expr": "{job='api'}"}]},
+    ],
+}
+
+
+def iso(days_ago: float) -> str:
+    moment = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_ago)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeGrafana:
+    """
+    Emulate `/search`, and the versions endpoints, listing versions newest first.
+    """
+
+    def __init__(self):
+        self.versions = {}
+
+    def save(self, uid, data, days_ago=0.0, user="admin"):
+        history = self.versions.setdefault(uid, [])
+        number = len(history) + 1
+        history.append(
+            {
+                "version": number,
+                "created": iso(days_ago),
+                "createdBy": user,
+                "message": f"Save {number}",
+                "data": {**copy.deepcopy(data), "uid": uid, "version": number},
+            }
+        )
+
+    def search(self, request, context):  # noqa: ARG002
+        page = int(parse_qs(urlparse(request.url).query).get("page", ["1"])[0])
+        hits = [{"uid": uid, "title": uid, "type": "dash-db", "folderUid": "folder"} for uid in self.versions]
+        return hits if page == 1 else []
+
+    def list_versions(self, request, context):  # noqa: ARG002
+        uid = VERSIONS_PATTERN.match(request.url).group(1)
+        limit = int(request.qs.get("limit", ["1000"])[0])
+        start = int(request.qs.get("start", ["0"])[0])
+        entries = [{"version": entry["version"], "createdBy": entry["createdBy"]} for entry in self.versions[uid]]
+        return list(reversed(entries))[start : start + limit]
+
+    def get_version(self, request, context):
+        uid, number = VERSION_PATTERN.match(request.url).groups()
+        if uid == "broken":
+            context.status_code = 500
+            return {"message": "Failure"}
+        return self.versions[uid][int(number) - 1]
+
+    def mount(self, m):
+        m.get("http://localhost:3000/api/search", json=self.search, headers=JSON_HEADERS)
+        m.get(VERSIONS_PATTERN, json=self.list_versions, headers=JSON_HEADERS)
+        m.get(VERSION_PATTERN, json=self.get_version, headers=JSON_HEADERS)
+
+
+class VersionHistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grafana = GrafanaApi.from_url()
+        self.server = FakeGrafana()
+        self.history = VersionHistory(page_size=2)
+        self.addCleanup(self.history.close)
+
+        self.server.save("overview", MODEL, days_ago=30)
+        model = copy.deepcopy(MODEL)
+        model["panels"][0]["targets"][0]["expr"] = "up == 0"
+        self.server.save("overview", model, days_ago=3, user="alice")
+        model["panels"][1]["targets"][0]["expr"] = "{job='web'}"
+        self.server.save("overview", model, days_ago=1, user="bob")
+        self.server.save("other", {"title": "Other", "panels": [{"id": 1, "datasource": {"uid": "loki"}}]})
+
+    def test_refresh(self):
+        with requests_mock.Mocker() as m:
+            self.server.mount(m)
+            result = self.history.refresh(self.grafana, concurrency=2)
+        self.assertTrue(result.ok)
+        self.assertEqual((result.dashboards, result.versions), (2, 4))
+        self.assertEqual(self.history.stats(), {"dashboards": 2, "versions": 4})
+        self.assertEqual(self.history.latest_versions(), {"overview": 3, "other": 1})
+
+    @requests_mock.Mocker()
+    def test_incremental(self, m):
+        self.server.mount(m)
+        self.history.refresh(self.grafana)
+        m.reset_mock()
+
+        result = self.history.refresh(self.grafana)
+        self.assertEqual(result.versions, 0)
+        # Only probing the most recent version of each dashboard.
+        probes = [request.url for request in m.request_history if "/versions" in request.url]
+        self.assertEqual(len(probes), 2)
+        self.assertTrue(all(url.endswith("versions?limit=1") for url in probes))
+
+        model = copy.deepcopy(MODEL)
+        model["title"] = "Renamed"
+        self.server.save("overview", model)
+        self.server.save("overview", model)
+        m.reset_mock()
+        result = self.history.refresh(self.grafana)
+        self.assertEqual(result.versions, 2)
+        fetched = [VERSION_PATTERN.match(request.url) for request in m.request_history]
+        fetched = sorted(int(match.group(2)) for match in fetched if match)
+        self.assertEqual(fetched, [4, 5])
+        self.assertEqual(self.history.latest_versions()["overview"], 5)
+
+    @requests_mock.Mocker()
+    def test_limit(self, m):
+        self.server.mount(m)
+        result = self.history.refresh(self.grafana, limit=2)
+        self.assertEqual(result.versions, 3)
+        self.assertEqual([row["version"] for row in self.history.versions(dashboard_uid="overview")], [3, 2])
+
+    @requests_mock.Mocker()
+    def test_limit_gap(self, m):
+        self.server.mount(m)
+        self.history.refresh(self.grafana)
+        model = copy.deepcopy(MODEL)
+        model["panels"][1]["targets"][0]["expr"] = "{job='db'}"
+        self.server.save("overview", model)
+        model["title"] = "Renamed"
+        self.server.save("overview", model)
+        result = self.history.refresh(self.grafana, limit=1)
+        self.assertEqual(result.versions, 1)
+        self.assertIsNone(self.history.get_version("overview", 4))
+
+        # Not compared across the gap, so touching all referenced data sources.
+        row = self.history.versions(dashboard_uid="overview", limit=1)[0]
+        self.assertEqual((row["version"], row["changes"]), (5, None))
+        touching = self.history.versions(datasource_uid="prometheus", since=datetime.timedelta(hours=1))
+        self.assertEqual([row["version"] for row in touching], [5])
+
+        # The gap is not filled by later refreshes, which continue consecutively.
+        self.server.save("overview", {**model, "title": "Again"})
+        self.history.refresh(self.grafana)
+        self.assertIsNone(self.history.get_version("overview", 4))
+        row = self.history.versions(dashboard_uid="overview", limit=1)[0]
+        self.assertEqual((row["version"], row["changes"]), (6, 1))
+
+    @requests_mock.Mocker()
+    def test_queries(self, m):
+        self.server.mount(m)
+        self.history.refresh(self.grafana)
+
+        touching = self.history.versions(datasource_uid="prometheus")
+        self.assertEqual(
+            [(row["dashboard_uid"], row["version"]) for row in touching], [("overview", 2), ("overview", 1)]
+        )
+        touching = self.history.versions(datasource_uid="loki", since=datetime.timedelta(days=7))
+        self.assertEqual([(row["dashboard_uid"], row["version"]) for row in touching], [("other", 1), ("overview", 3)])
+        referencing = self.history.versions(datasource_uid="prometheus", touched=False)
+        self.assertEqual(len(referencing), 3)
+
+        self.assertEqual([row["version"] for row in self.history.versions(created_by="alice")], [2])
+        self.assertEqual(len(self.history.versions(until=datetime.timedelta(days=2))), 2)
+        row = self.history.versions(dashboard_uid="overview", limit=1)[0]
+        self.assertEqual(
+            (row["version"], row["title"], row["folder_uid"], row["changes"]), (3, "overview", "folder", 1)
+        )
+
+    @requests_mock.Mocker()
+    def test_changes(self, m):
+        self.server.mount(m)
+        self.history.refresh(self.grafana)
+        changes = self.history.changes("overview", 2)
+        self.assertEqual([change.pointer for change in changes], ["/panels/id=1/targets/refId=A/expr"])
+        self.assertEqual(self.history.get_version("overview", 1)["title"], "Overview")
+        self.assertIsNone(self.history.get_version("overview", 9))
+        self.assertRaises(LookupError, self.history.changes, "unknown", 1)
+
+    @requests_mock.Mocker()
+    def test_errors(self, m):
+        self.server.save("broken", MODEL)
+        self.server.mount(m)
+        result = self.history.refresh(self.grafana)
+        self.assertEqual(list(result.errors), ["broken"])
+        self.assertNotIn("broken", self.history.latest_versions())
+        self.assertEqual(result.versions, 4)
+
+    @requests_mock.Mocker()
+    def test_persistence(self, m):
+        self.server.mount(m)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "history.sqlite"
+            with VersionHistory(path) as history:
+                history.refresh(self.grafana)
+            with VersionHistory(path) as history:
+                self.assertEqual(history.stats()["versions"], 4)
+
+    def test_touched_datasources(self):
+        old = copy.deepcopy(MODEL)
+        new = copy.deepcopy(MODEL)
+        new["panels"][0]["datasource"] = {"uid": "mimir"}
+        new["templating"] = {"list": [{"name": "job", "datasource": {"uid": "tempo"}}]}
+        self.assertEqual(touched_datasources(old, new, diff_dashboards(old, new)), {"prometheus", "mimir", "tempo"})
+        value, panel = resolve(new, ("panels", "id=2", "targets", "refId=A", "expr"))
+        self.assertEqual(value, "{job='api'}")
+        self.assertEqual(panel["id"], 2)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+
+    from .util import make_response
+
+    class AsyncVersionHistoryTestCase(IsolatedAsyncioTestCase):
+        async def test_refresh(self):
+            server = FakeGrafana()
+            server.save("overview", MODEL)
+            server.save("overview", {**MODEL, "title": "Renamed"})
+
+            async def request(verb, url, params=None, **kwargs):  # noqa: ARG001
+                if url.endswith("/api/search"):
+                    hits = [{"uid": "overview", "type": "dash-db"}]
+                    return make_response(200, hits if int(params.get("page", 1)) == 1 else [])
+                if url.endswith("/versions"):
+                    return make_response(200, {"versions": [{"version": 2}, {"version": 1}]})
+                return make_response(200, server.versions["overview"][int(url.rsplit("/", 1)[1]) - 1])
+
+            grafana = AsyncGrafanaApi.from_url()
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            with VersionHistory() as history:
+                result = await history.arefresh(grafana)
+                self.assertEqual(result.versions, 2)
+                self.assertEqual([change.pointer for change in history.changes("overview", 2)], ["/title"])
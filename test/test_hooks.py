@@ -0,0 +1,132 @@
+import json
+import unittest
+from unittest import mock
+
+import niquests
+
+from grafana_client import AsyncGrafanaApi, GrafanaApi, RequestHooks, RetryPolicy
+from grafana_client.client import GrafanaBadInputError, GrafanaServerError, GrafanaTimeoutError
+
+from .compat import requests_mock
+from .util import JSON_HEADERS, make_response
+
+DASHBOARD = {"dashboard": {"uid": "cIBgcSjkk", "title": "Production Overview"}}
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def hooks(self):
+        return RequestHooks(
+            before_request=[lambda info: self.events.append(("before_request", info))],
+            after_response=[lambda info: self.events.append(("after_response", info))],
+            on_error=[lambda info: self.events.append(("on_error", info))],
+        )
+
+    def names(self):
+        return [name for name, _ in self.events]
+
+
+class RequestHooksTestCase(unittest.TestCase):
+    def setUp(self):
+        self.recorder = Recorder()
+        self.grafana = GrafanaApi.from_url(organization_id=2, hooks=self.recorder.hooks())
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(GrafanaApi.from_url().client.hooks)
+
+    @requests_mock.Mocker()
+    def test_successful_request(self, m):
+        m.get("http://localhost:3000/api/dashboards/uid/cIBgcSjkk", json=DASHBOARD, headers=JSON_HEADERS)
+        self.grafana.dashboard.get_dashboard("cIBgcSjkk")
+        self.assertEqual(self.recorder.names(), ["before_request", "after_response"])
+        info = self.recorder.events[-1][1]
+        self.assertEqual(info.verb, "GET")
+        self.assertEqual(info.url, "/dashboards/uid/cIBgcSjkk")
+        self.assertEqual(info.route, "/dashboards/uid/{uid}")
+        self.assertEqual(info.status_code, 200)
+        self.assertEqual(info.attempt, 0)
+        self.assertEqual(info.organization_id, 2)
+        self.assertEqual(info.request_bytes, 0)
+        self.assertEqual(info.response_bytes, len(json.dumps(DASHBOARD)))
+        self.assertGreaterEqual(info.timings.total, 0)
+        self.assertIsNone(info.error)
+
+    @requests_mock.Mocker()
+    def test_request_bytes(self, m):
+        m.post("http://localhost:3000/api/dashboards/db", json={"status": "success"}, headers=JSON_HEADERS)
+        self.grafana.dashboard.update_dashboard(DASHBOARD)
+        info = self.recorder.events[-1][1]
+        self.assertEqual(info.route, "/dashboards/db")
+        self.assertEqual(info.request_bytes, len(m.last_request.body))
+
+    @requests_mock.Mocker()
+    def test_organization_header(self, m):
+        m.get("http://localhost:3000/api/org", json={"id": 3}, headers=JSON_HEADERS)
+        self.grafana.client.GET("/org", headers={"X-Grafana-Org-Id": "3"})
+        self.assertEqual(self.recorder.events[-1][1].organization_id, 3)
+        self.grafana.client.for_org("4").GET("/org")
+        self.assertEqual(self.recorder.events[-1][1].organization_id, 4)
+
+    @requests_mock.Mocker()
+    def test_invalid_organization_header(self, m):
+        m.get(
+            "http://localhost:3000/api/org", status_code=400, json={"message": "Invalid org id"}, headers=JSON_HEADERS
+        )
+        with self.assertRaises(GrafanaBadInputError):
+            self.grafana.client.GET("/org", headers={"X-Grafana-Org-Id": "main"})
+        self.assertEqual(m.call_count, 1)
+        self.assertIsNone(self.recorder.events[-1][1].organization_id)
+
+    @requests_mock.Mocker()
+    def test_error_with_retries(self, m):
+        self.grafana.client.retry = RetryPolicy(total=1, backoff_factor=0)
+        m.get("http://localhost:3000/api/health", json={"message": "Unavailable"}, status_code=503)
+        self.assertRaises(GrafanaServerError, self.grafana.health.check)
+        self.assertEqual(
+            self.recorder.names(),
+            ["before_request", "after_response", "on_error", "before_request", "after_response", "on_error"],
+        )
+        info = self.recorder.events[-1][1]
+        self.assertEqual(info.attempt, 1)
+        self.assertEqual(info.status_code, 503)
+        self.assertIsInstance(info.error, GrafanaServerError)
+
+    def test_timeout(self):
+        with mock.patch.object(self.grafana.client.s, "request", side_effect=niquests.exceptions.ConnectTimeout):
+            self.assertRaises(GrafanaTimeoutError, self.grafana.health.check)
+        self.assertEqual(self.recorder.names(), ["before_request", "on_error"])
+        info = self.recorder.events[-1][1]
+        self.assertIsNone(info.status_code)
+        self.assertIsNotNone(info.timings.total)
+
+    @requests_mock.Mocker()
+    def test_failing_callback(self, m):
+        m.get("http://localhost:3000/api/health", json={"database": "ok"}, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url()
+        grafana.client.add_hook("before_request", lambda info: 1 / 0)  # noqa: ARG005
+        with self.assertLogs("grafana_client.hooks", level="ERROR"):
+            self.assertEqual(grafana.health.check(), {"database": "ok"})
+
+    def test_unknown_event(self):
+        self.assertRaises(ValueError, RequestHooks().register, "on_success", print)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+
+    class AsyncRequestHooksTestCase(IsolatedAsyncioTestCase):
+        async def test_hooks(self):
+            recorder = Recorder()
+            grafana = AsyncGrafanaApi.from_url(hooks=recorder.hooks())
+            grafana.client.s.request = AsyncMock(return_value=make_response(200, DASHBOARD))
+            await grafana.dashboard.get_dashboard("cIBgcSjkk")
+            self.assertEqual(recorder.names(), ["before_request", "after_response"])
+            info = recorder.events[-1][1]
+            self.assertEqual(info.route, "/dashboards/uid/{uid}")
+            self.assertEqual(info.response_bytes, len(make_response(200, DASHBOARD).content))
@@ -0,0 +1,231 @@
+import json
+import re
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from grafana_client import GrafanaApi, ImportPlan
+from grafana_client.importer import DASHBOARD, DATASOURCE, FOLDER, LIBRARY_ELEMENT, references
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+DASHBOARD_MODEL = {
+    "uid": "dashboard-1",
+    "id": 42,
+    "title": "Overview",
+    "panels": [
+        {"type": "row", "panels": [{"libraryPanel": {"uid": "panel-1", "name": "CPU"}}]},
+        {
+            "type": "timeseries",
+            "datasource": {"type": "prometheus", "uid": "prometheus"},
+            "targets": [{"datasource": {"uid": "loki"}}],
+        },
+    ],
+    "templating": {"list": [{"datasource": {"uid": "${datasource}"}}]},
+}
+
+
+def make_plan():
+    plan = ImportPlan()
+    plan.add_dashboard({"dashboard": DASHBOARD_MODEL, "meta": {"folderUid": "child"}})
+    plan.add_library_element(
+        {"uid": "panel-1", "name": "CPU", "kind": 1, "folderUid": "parent", "model": {"datasource": {"uid": "loki"}}}
+    )
+    plan.add_folder({"uid": "child", "title": "Child", "parentUid": "parent"})
+    plan.add_folder({"uid": "parent", "title": "Parent"})
+    plan.add_datasource({"uid": "prometheus", "name": "Prometheus", "type": "prometheus"})
+    plan.add_datasource({"uid": "loki", "name": "Loki", "type": "loki"})
+    return plan
+
+
+class FakeGrafana:
+    """
+    Record the objects created, and check that their dependencies have been created before.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.created = []
+        self.failing = set()
+        self.lock = threading.Lock()
+
+    def create(self, kind):
+        def respond(request, context):  # noqa: ARG001
+            body = request.json()
+            uid = body["dashboard"]["uid"] if kind == DASHBOARD else body["uid"]
+            if (kind, uid) in self.failing:
+                context.status_code = 500
+                return {"message": "Failure"}
+            with self.lock:
+                missing = [
+                    dependency
+                    for dependency in self.plan.objects[(kind, uid)].dependencies
+                    if dependency in self.plan.objects and dependency not in self.created
+                ]
+                if missing:
+                    context.status_code = 400
+                    return {"message": f"Missing dependencies {missing}"}
+                self.created.append((kind, uid))
+            return {"uid": uid}
+
+        return respond
+
+    def mount(self, m):
+        m.get("http://localhost:3000/api/health", json={"version": "11.0.0"}, headers=JSON_HEADERS)
+        m.post("http://localhost:3000/api/datasources", json=self.create(DATASOURCE), headers=JSON_HEADERS)
+        m.post("http://localhost:3000/api/folders", json=self.create(FOLDER), headers=JSON_HEADERS)
+        m.post("http://localhost:3000/api/library-elements", json=self.create(LIBRARY_ELEMENT), headers=JSON_HEADERS)
+        m.post("http://localhost:3000/api/dashboards/db", json=self.create(DASHBOARD), headers=JSON_HEADERS)
+
+
+class ImportPlanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grafana = GrafanaApi.from_url()
+        self.plan = make_plan()
+
+    def test_references(self):
+        library_panels, datasources = references(DASHBOARD_MODEL)
+        self.assertEqual(library_panels, {"panel-1"})
+        self.assertEqual(datasources, {"prometheus", "loki", "${datasource}"})
+
+    def test_levels(self):
+        levels = [[item.key for item in level] for level in self.plan.levels()]
+        self.assertEqual(
+            levels,
+            [
+                [(DATASOURCE, "loki"), (DATASOURCE, "prometheus"), (FOLDER, "parent")],
+                [(FOLDER, "child"), (LIBRARY_ELEMENT, "panel-1")],
+                [(DASHBOARD, "dashboard-1")],
+            ],
+        )
+
+    def test_cycle(self):
+        self.plan.add_folder({"uid": "parent", "title": "Parent", "parentUid": "child"})
+        with self.assertRaises(ValueError) as context:
+            self.plan.levels()
+        self.assertIn("('folder', 'child')", str(context.exception))
+
+    def test_missing_uid(self):
+        self.assertRaises(ValueError, self.plan.add_folder, {"title": "Untitled"})
+
+    @requests_mock.Mocker()
+    def test_run(self, m):
+        server = FakeGrafana(self.plan)
+        server.mount(m)
+        progress = []
+        result = self.plan.run(self.grafana, concurrency=4, progress=lambda *args: progress.append(args))
+        self.assertTrue(result.ok, result.errors)
+        self.assertEqual(result.levels, 3)
+        self.assertEqual(sorted(result.imported), sorted(self.plan.objects))
+        self.assertEqual(len(server.created), 6)
+        self.assertEqual(progress[-1], (6, 6))
+
+        body = m.request_history[-1].json()
+        self.assertEqual(body["folderUid"], "child")
+        self.assertTrue(body["overwrite"])
+        self.assertIsNone(body["dashboard"]["id"])
+
+    @requests_mock.Mocker()
+    def test_failures(self, m):
+        server = FakeGrafana(self.plan)
+        server.mount(m)
+        server.failing.add((FOLDER, "parent"))
+        self.plan.add_dashboard({"uid": "dashboard-2", "title": "Independent"})
+        result = self.plan.run(self.grafana)
+        self.assertFalse(result.ok)
+        self.assertEqual(list(result.errors), [(FOLDER, "parent")])
+        self.assertEqual(
+            result.skipped,
+            {
+                (FOLDER, "child"): (FOLDER, "parent"),
+                (LIBRARY_ELEMENT, "panel-1"): (FOLDER, "parent"),
+                (DASHBOARD, "dashboard-1"): (FOLDER, "child"),
+            },
+        )
+        self.assertIn((DASHBOARD, "dashboard-2"), result.imported)
+
+    @requests_mock.Mocker()
+    def test_overwrite(self, m):
+        m.post("http://localhost:3000/api/datasources", status_code=409, json={"message": "Data source exists"})
+        m.post("http://localhost:3000/api/folders", status_code=409, json={"message": "Folder exists"})
+        m.put("http://localhost:3000/api/datasources/uid/loki", json={"message": "Updated"}, headers=JSON_HEADERS)
+        m.put("http://localhost:3000/api/folders/parent", json={"uid": "parent"}, headers=JSON_HEADERS)
+        plan = ImportPlan()
+        plan.add_datasource({"uid": "loki", "name": "Loki", "type": "loki"})
+        plan.add_folder({"uid": "parent", "title": "Parent"})
+
+        result = plan.run(self.grafana)
+        self.assertTrue(result.ok, result.errors)
+        self.assertEqual(m.request_history[-1].method, "PUT")
+
+        result = plan.run(self.grafana, overwrite=False)
+        self.assertEqual(sorted(result.errors), [(DATASOURCE, "loki"), (FOLDER, "parent")])
+
+    @requests_mock.Mocker()
+    def test_dashboard_conflict(self, m):
+        m.post(
+            "http://localhost:3000/api/dashboards/db",
+            status_code=412,
+            json={"message": "A dashboard with the same name in the folder already exists", "status": "name-exists"},
+        )
+        plan = ImportPlan()
+        plan.add_dashboard({"uid": "dashboard-1", "title": "Overview"})
+        result = plan.run(self.grafana)
+        self.assertEqual(result.imported, [])
+        self.assertEqual(list(result.errors), [(DASHBOARD, "dashboard-1")])
+        self.assertEqual([request.method for request in m.request_history], ["POST"])
+
+    def test_add_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "dashboards.jsonl"
+            records = [
+                {"dashboard": {"uid": "dashboard-1", "version": 1}, "meta": {"folderUid": "parent"}},
+                {"dashboard": {"uid": "dashboard-1", "version": 2}, "meta": {"folderUid": "parent"}},
+                {"dashboard": {"uid": "dashboard-2", "version": 1}, "meta": {}},
+            ]
+            path.write_text("".join(json.dumps(record) + "\n" for record in records))
+            plan = ImportPlan()
+            plan.add_export(path)
+        self.assertEqual(len(plan), 2)
+        self.assertEqual(plan.objects[(DASHBOARD, "dashboard-1")].payload["dashboard"]["version"], 2)
+        self.assertEqual(plan.objects[(DASHBOARD, "dashboard-1")].dependencies, {(FOLDER, "parent")})
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+
+    from .util import make_response
+
+    class AsyncImportPlanTestCase(IsolatedAsyncioTestCase):
+        async def test_run(self):
+            plan = ImportPlan()
+            plan.add_folder({"uid": "parent", "title": "Parent"})
+            plan.add_dashboard({"uid": "dashboard-1", "title": "Overview"}, folder_uid="parent")
+            created = []
+
+            async def request(verb, url, json=None, **kwargs):  # noqa: ARG001
+                created.append(re.sub(r".*/api", "", url))
+                return make_response(200, {"uid": "ok"})
+
+            grafana = AsyncGrafanaApi.from_url()
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            result = await plan.arun(grafana)
+            self.assertTrue(result.ok)
+            self.assertEqual(created, ["/folders", "/dashboards/db"])
+
+        async def test_dashboard_conflict(self):
+            plan = ImportPlan()
+            plan.add_dashboard({"uid": "dashboard-1", "title": "Overview"})
+            grafana = AsyncGrafanaApi.from_url()
+            grafana.client.s.request = AsyncMock(return_value=make_response(412, {"message": "Plugin dashboard"}))
+            result = await plan.arun(grafana)
+            self.assertEqual(result.imported, [])
+            self.assertEqual(list(result.errors), [(DASHBOARD, "dashboard-1")])
+            self.assertEqual(grafana.client.s.request.call_count, 1)
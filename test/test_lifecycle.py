@@ -0,0 +1,142 @@
+import threading
+import unittest
+from unittest import mock
+
+import niquests
+from verlib2 import Version
+
+from grafana_client import AsyncGrafanaApi, ConnectionSettings, GrafanaApi
+
+from .compat import requests_mock
+from .util import JSON_HEADERS, make_response
+
+HEALTH = {"commit": "14e988bd22", "database": "ok", "version": "10.4.1"}
+
+
+class LifecycleTestCase(unittest.TestCase):
+    @requests_mock.Mocker()
+    def test_context_manager(self, m):
+        m.get("http://localhost:3000/api/health", json=HEALTH, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url(connection=ConnectionSettings(warm_connections=3))
+        with mock.patch.object(grafana.client.s, "close") as close:
+            with grafana as api:
+                self.assertIs(api, grafana)
+                self.assertEqual(m.call_count, 3)
+                self.assertEqual(grafana.capabilities.version, Version("10.4.1"))
+                self.assertEqual(m.call_count, 3)
+            close.assert_called_once_with()
+
+    @requests_mock.Mocker()
+    def test_no_warming_by_default(self, m):
+        grafana = GrafanaApi.from_url()
+        with mock.patch.object(grafana.client.s, "close") as close:
+            with grafana:
+                pass
+            close.assert_called_once_with()
+        self.assertEqual(m.call_count, 0)
+
+    @requests_mock.Mocker()
+    def test_warm_limited_by_pool_size(self, m):
+        m.get("http://localhost:3000/api/health", json=HEALTH, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url(connection=ConnectionSettings(pool_maxsize=2))
+        self.assertEqual(grafana.client.warm(5), HEALTH)
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_prefetch(self, m):
+        m.get("http://localhost:3000/api/health", json=HEALTH, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url().open(prefetch=True)
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(grafana.capabilities.version, Version("10.4.1"))
+
+    def test_warm_failure(self):
+        grafana = GrafanaApi.from_url(connection=ConnectionSettings(warm_connections=2))
+        with mock.patch.object(grafana.client.s, "request", side_effect=niquests.exceptions.ConnectionError):
+            with self.assertLogs("grafana_client.client", level="WARNING"):
+                grafana.open()
+        self.assertIsNone(grafana._grafana_info)
+
+    def test_drain(self):
+        grafana = GrafanaApi.from_url()
+        started = threading.Event()
+        release = threading.Event()
+
+        def request(*args, **kwargs):  # noqa: ARG001
+            started.set()
+            release.wait(5)
+            return make_response(200, HEALTH)
+
+        with mock.patch.object(grafana.client.s, "request", side_effect=request):
+            thread = threading.Thread(target=grafana.health.check)
+            thread.start()
+            started.wait(5)
+            self.assertEqual(grafana.client.in_flight, 1)
+            with self.assertLogs("grafana_client.client", level="WARNING"):
+                self.assertFalse(grafana.close(timeout=0.01))
+            threading.Timer(0.05, release.set).start()
+            self.assertTrue(grafana.close(timeout=5))
+            thread.join()
+        self.assertEqual(grafana.client.in_flight, 0)
+
+    def test_in_flight_after_error(self):
+        grafana = GrafanaApi.from_url()
+        with mock.patch.object(grafana.client.s, "request", side_effect=niquests.exceptions.ConnectionError):
+            self.assertRaises(niquests.exceptions.ConnectionError, grafana.health.check)
+        self.assertEqual(grafana.client.in_flight, 0)
+
+
+try:
+    import asyncio
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+
+    class AsyncLifecycleTestCase(IsolatedAsyncioTestCase):
+        async def test_context_manager(self):
+            grafana = AsyncGrafanaApi.from_url(connection=ConnectionSettings(warm_connections=2))
+            grafana.client.s.request = AsyncMock(return_value=make_response(200, HEALTH))
+            grafana.client.s.close = AsyncMock()
+            async with grafana as api:
+                self.assertIs(api, grafana)
+                self.assertEqual(grafana.client.s.request.call_count, 2)
+                capabilities = await grafana.capabilities
+                self.assertEqual(capabilities.version, Version("10.4.1"))
+                self.assertEqual(grafana.client.s.request.call_count, 2)
+            grafana.client.s.close.assert_awaited_once_with()
+
+        async def test_drain(self):
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(*args, **kwargs):  # noqa: ARG001
+                await asyncio.sleep(0.05)
+                return make_response(200, HEALTH)
+
+            grafana.client.s.request = request
+            grafana.client.s.close = AsyncMock()
+            task = asyncio.ensure_future(grafana.health.check())
+            await asyncio.sleep(0)
+            self.assertEqual(grafana.client.in_flight, 1)
+            self.assertTrue(await grafana.close(timeout=5))
+            self.assertEqual(await task, HEALTH)
+            grafana.client.s.close.assert_awaited_once_with()
+
+        async def test_drain_deadline(self):
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(*args, **kwargs):  # noqa: ARG001
+                await asyncio.sleep(5)
+
+            grafana.client.s.request = request
+            grafana.client.s.close = AsyncMock()
+            task = asyncio.ensure_future(grafana.health.check())
+            await asyncio.sleep(0)
+            with self.assertLogs("grafana_client.client", level="WARNING"):
+                self.assertFalse(await grafana.close(timeout=0.02))
+            task.cancel()
+
+        def test_sync_context_manager(self):
+            with self.assertRaises(TypeError):
+                with AsyncGrafanaApi.from_url():
+                    pass
@@ -0,0 +1,138 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import niquests
+
+from grafana_client import AsyncGrafanaApi, GrafanaApi, MetricsRegistry, RetryPolicy
+from grafana_client.client import GrafanaServerError, GrafanaTimeoutError
+
+from .compat import requests_mock
+from .util import JSON_HEADERS, make_response
+
+DASHBOARD = {"dashboard": {"uid": "cIBgcSjkk", "title": "Production Overview"}}
+
+
+class MetricsRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry(buckets=[0.1, 1])
+        self.grafana = GrafanaApi.from_url(metrics=self.metrics, retry=RetryPolicy(total=1, backoff_factor=0))
+
+    @requests_mock.Mocker()
+    def test_requests(self, m):
+        m.get("http://localhost:3000/api/dashboards/uid/cIBgcSjkk", json=DASHBOARD, headers=JSON_HEADERS)
+        m.get("http://localhost:3000/api/dashboards/uid/foo", json=DASHBOARD, headers=JSON_HEADERS)
+        self.grafana.dashboard.get_dashboard("cIBgcSjkk")
+        self.grafana.dashboard.get_dashboard("foo")
+        text = self.metrics.render()
+        self.assertIn(
+            'grafana_client_requests_total{method="GET",route="/dashboards/uid/{uid}",status="200"} 2\n', text
+        )
+        self.assertIn('grafana_client_requests_in_flight{method="GET",route="/dashboards/uid/{uid}"} 0\n', text)
+        self.assertIn(
+            'grafana_client_request_duration_seconds_bucket{method="GET",route="/dashboards/uid/{uid}",le="0.1"} 2\n',
+            text,
+        )
+        self.assertIn(
+            'grafana_client_request_duration_seconds_bucket{method="GET",route="/dashboards/uid/{uid}",le="+Inf"} 2\n',
+            text,
+        )
+        self.assertIn(
+            'grafana_client_request_duration_seconds_count{method="GET",route="/dashboards/uid/{uid}"} 2', text
+        )
+        self.assertIn("# TYPE grafana_client_requests counter\n", text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+    @requests_mock.Mocker()
+    def test_errors_and_retries(self, m):
+        m.get("http://localhost:3000/api/health", json={"message": "Unavailable"}, status_code=503)
+        self.assertRaises(GrafanaServerError, self.grafana.health.check)
+        text = self.metrics.render()
+        self.assertIn('grafana_client_requests_total{method="GET",route="/health",status="503"} 2\n', text)
+        self.assertIn(
+            'grafana_client_errors_total{method="GET",route="/health",exception="GrafanaServerError"} 2\n', text
+        )
+        self.assertIn('grafana_client_retries_total{method="GET",route="/health"} 1\n', text)
+        self.assertIn('grafana_client_requests_in_flight{method="GET",route="/health"} 0\n', text)
+
+    def test_timeout(self):
+        with mock.patch.object(self.grafana.client.s, "request", side_effect=niquests.exceptions.ReadTimeout):
+            self.assertRaises(GrafanaTimeoutError, self.grafana.health.check)
+        text = self.metrics.render()
+        self.assertIn(
+            'grafana_client_errors_total{method="GET",route="/health",exception="GrafanaTimeoutError"} 2\n', text
+        )
+        self.assertIn('grafana_client_requests_in_flight{method="GET",route="/health"} 0\n', text)
+
+    def test_unexpected_error(self):
+        with mock.patch.object(self.grafana.client.s, "request", side_effect=RuntimeError("boom")):
+            self.assertRaises(RuntimeError, self.grafana.health.check)
+        text = self.metrics.render()
+        self.assertIn('grafana_client_errors_total{method="GET",route="/health",exception="RuntimeError"} 1\n', text)
+        self.assertIn('grafana_client_requests_in_flight{method="GET",route="/health"} 0\n', text)
+
+    @requests_mock.Mocker()
+    def test_prometheus_format(self, m):
+        m.post("http://localhost:3000/api/dashboards/db", json={"status": "success"}, headers=JSON_HEADERS)
+        self.grafana.dashboard.update_dashboard(DASHBOARD)
+        text = self.metrics.render(openmetrics=False)
+        self.assertIn("# TYPE grafana_client_requests_total counter\n", text)
+        self.assertIn('grafana_client_request_bytes_total{method="POST",route="/dashboards/db"} ', text)
+        self.assertNotIn("# EOF", text)
+
+    @requests_mock.Mocker()
+    def test_write_textfile(self, m):
+        m.get("http://localhost:3000/api/health", json={"database": "ok"}, headers=JSON_HEADERS)
+        self.grafana.health.check()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "grafana_client.prom"
+            self.metrics.write_textfile(path)
+            self.assertEqual(path.read_text(), self.metrics.render(openmetrics=False))
+            self.assertEqual([item.name for item in Path(tmpdir).iterdir()], ["grafana_client.prom"])
+
+    def test_escape_labels(self):
+        from grafana_client.metrics import format_labels
+
+        self.assertEqual(format_labels((("route", 'a"b\\c\n'),)), '{route="a\\"b\\\\c\\n"}')
+
+    @requests_mock.Mocker()
+    def test_clear(self, m):
+        m.get("http://localhost:3000/api/health", json={"database": "ok"}, headers=JSON_HEADERS)
+        self.grafana.health.check()
+        self.metrics.clear()
+        self.assertNotIn("/health", self.metrics.render())
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+
+    class AsyncMetricsRegistryTestCase(IsolatedAsyncioTestCase):
+        async def test_shared_registry(self):
+            metrics = MetricsRegistry()
+            grafana = AsyncGrafanaApi.from_url(metrics=metrics)
+            grafana.client.s.request = AsyncMock(return_value=make_response(200, {"database": "ok"}))
+            sync_grafana = GrafanaApi.from_url(metrics=metrics)
+            sync_grafana.client.s.request = mock.Mock(return_value=make_response(200, {"database": "ok"}))
+            await grafana.health.check()
+            sync_grafana.health.check()
+            self.assertIn(
+                'grafana_client_requests_total{method="GET",route="/health",status="200"} 2\n', metrics.render()
+            )
+
+        async def test_cancellation(self):
+            metrics = MetricsRegistry()
+            grafana = AsyncGrafanaApi.from_url(metrics=metrics)
+
+            async def request(*args, **kwargs):  # noqa: ARG001
+                await asyncio.sleep(10)
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(grafana.health.check(), 0.01)
+            self.assertIn('grafana_client_requests_in_flight{method="GET",route="/health"} 0\n', metrics.render())
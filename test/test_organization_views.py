@@ -0,0 +1,116 @@
+import unittest
+from unittest import mock
+
+from grafana_client import GrafanaApi, ResponseCache
+from grafana_client.client import GrafanaClientError
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+ORGANIZATIONS = [{"id": 1, "name": "Main Org."}, {"id": 2, "name": "Tenant"}]
+
+
+class OrganizationViewTestCase(unittest.TestCase):
+    @requests_mock.Mocker()
+    def test_for_org(self, m):
+        m.get(
+            "http://localhost:3000/api/org",
+            request_headers={"X-Grafana-Org-Id": "5"},
+            json={"id": 5, "name": "Tenant"},
+            headers=JSON_HEADERS,
+        )
+        grafana = GrafanaApi.from_url(organization_id=1)
+        view = grafana.for_org(5)
+        self.assertEqual(view.organization.get_current_organization(), {"id": 5, "name": "Tenant"})
+        self.assertIs(view.client.s, grafana.client.s)
+        self.assertEqual(view.client.organization_id, 5)
+        self.assertEqual(grafana.client.organization_id, 1)
+        self.assertEqual(grafana.client.s.headers["X-Grafana-Org-Id"], "1")
+
+    def test_elements_bound_to_view(self):
+        grafana = GrafanaApi.from_url()
+        self.assertIs(grafana.dashboard.client, grafana.client)
+        view = grafana.for_org(5)
+        self.assertIs(view.dashboard.client, view.client)
+        self.assertIs(view.dashboard.api, view)
+        self.assertIs(grafana.dashboard.client, grafana.client)
+
+    def test_nested_view(self):
+        grafana = GrafanaApi.from_url()
+        view = grafana.for_org(5).for_org(6)
+        self.assertIs(view.client.parent, grafana.client)
+        self.assertEqual(view.client.organization_id, 6)
+
+    @requests_mock.Mocker()
+    def test_explicit_header(self, m):
+        m.get("http://localhost:3000/api/org", json={"id": 7}, headers=JSON_HEADERS)
+        view = GrafanaApi.from_url().for_org(5)
+        view.client.GET("/org", headers={"X-Grafana-Org-Id": "7"})
+        self.assertEqual(m.last_request.headers["X-Grafana-Org-Id"], "7")
+
+    @requests_mock.Mocker()
+    def test_cache_per_org(self, m):
+        m.get("http://localhost:3000/api/org", json={"id": 0}, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url(cache=ResponseCache())
+        grafana.for_org(1).organization.get_current_organization()
+        grafana.for_org(2).organization.get_current_organization()
+        grafana.for_org(1).organization.get_current_organization()
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_shared_lifecycle(self, m):
+        m.get("http://localhost:3000/api/health", json={"version": "10.4.1"}, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url()
+        view = grafana.for_org(5)
+        with mock.patch.object(grafana.client, "_request_started", wraps=grafana.client._request_started) as started:
+            view.health.check()
+        started.assert_called_once_with()
+        self.assertEqual(grafana.client.in_flight, 0)
+        with mock.patch.object(grafana.client.s, "close") as close:
+            self.assertTrue(view.close())
+            close.assert_not_called()
+
+    @requests_mock.Mocker()
+    def test_for_each_org(self, m):
+        m.get("http://localhost:3000/api/orgs", json=ORGANIZATIONS, headers=JSON_HEADERS)
+        m.get(
+            "http://localhost:3000/api/search",
+            request_headers={"X-Grafana-Org-Id": "1"},
+            json=[{"uid": "foo"}],
+            headers=JSON_HEADERS,
+        )
+        m.get(
+            "http://localhost:3000/api/search",
+            request_headers={"X-Grafana-Org-Id": "2"},
+            json={"message": "Permission denied"},
+            status_code=403,
+        )
+        grafana = GrafanaApi.from_url()
+        result = grafana.for_each_org(lambda api: api.search.search_dashboards(), concurrency=2)
+        self.assertEqual(result.values, {1: [{"uid": "foo"}]})
+        self.assertIsInstance(result.errors[2], GrafanaClientError)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+
+    from .util import make_response
+
+    class AsyncOrganizationViewTestCase(IsolatedAsyncioTestCase):
+        async def test_for_each_org(self):
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(verb, url, headers=None, **kwargs):  # noqa: ARG001
+                if url.endswith("/orgs"):
+                    return make_response(200, ORGANIZATIONS)
+                return make_response(200, {"id": int(headers["X-Grafana-Org-Id"])})
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            result = await grafana.for_each_org(lambda api: api.organization.get_current_organization())
+            self.assertTrue(result.ok)
+            self.assertEqual(result.values, {1: {"id": 1}, 2: {"id": 2}})
@@ -0,0 +1,245 @@
+import threading
+import time
+import unittest
+
+from grafana_client import GrafanaApi
+from grafana_client.client import GrafanaServerError
+from grafana_client.pagination import paginate
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+
+def make_pages(total, perpage, items_key="items"):
+    def page(number):
+        start = (number - 1) * perpage
+        return {
+            "totalCount": total,
+            items_key: list(range(start, min(start + perpage, total))),
+            "page": number,
+            "perPage": perpage,
+        }
+
+    return page
+
+
+class PaginationTestCase(unittest.TestCase):
+    def test_prefetch(self):
+        lock = threading.Lock()
+        fetched = []
+        running = 0
+        peak = 0
+        page = make_pages(total=95, perpage=10)
+
+        def fetch(number):
+            nonlocal running, peak
+            with lock:
+                fetched.append(number)
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.005)
+            with lock:
+                running -= 1
+            return page(number)
+
+        items = paginate(fetch, items_key="items", perpage=10, prefetch=3)
+        self.assertEqual(fetched, [1])
+        self.assertEqual(list(items), list(range(95)))
+        self.assertEqual(sorted(fetched), list(range(1, 11)))
+        self.assertLessEqual(peak, 3)
+        self.assertGreater(peak, 1)
+
+    def test_bounded(self):
+        fetched = []
+        page = make_pages(total=10000, perpage=10)
+
+        def fetch(number):
+            fetched.append(number)
+            return page(number)
+
+        items = paginate(fetch, items_key="items", perpage=10, prefetch=2)
+        for _ in range(15):
+            next(items)
+        items.close()
+        self.assertLessEqual(len(fetched), 5)
+
+    def test_slow_page(self):
+        fetched = []
+        seen = []
+        page = make_pages(total=1000, perpage=10)
+
+        def fetch(number):
+            fetched.append(number)
+            if number == 2:
+                time.sleep(0.2)
+                seen.append(len(fetched))
+            return page(number)
+
+        items = paginate(fetch, items_key="items", perpage=10, prefetch=2)
+        self.assertEqual(list(items), list(range(1000)))
+        # The first page, the pending pages, and the pages held back.
+        self.assertLessEqual(seen[0], 5)
+
+    def test_page_size_from_first_page(self):
+        page = make_pages(total=5, perpage=2)
+        fetched = []
+
+        def fetch(number):
+            fetched.append(number)
+            response = page(number)
+            del response["perPage"]
+            return response
+
+        self.assertEqual(list(paginate(fetch, items_key="items")), [0, 1, 2, 3, 4])
+        self.assertEqual(sorted(fetched), [1, 2, 3])
+
+    def test_unknown_total(self):
+        pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+        fetched = []
+
+        def fetch(number):
+            fetched.append(number)
+            return pages.get(number, [])
+
+        self.assertEqual(list(paginate(fetch, perpage=2)), [1, 2, 3, 4, 5])
+        self.assertEqual(fetched, [1, 2, 3])
+
+        fetched.clear()
+        self.assertEqual(list(paginate(fetch)), [1, 2, 3, 4, 5])
+        self.assertEqual(fetched, [1, 2, 3, 4])
+
+    def test_pages(self):
+        page = make_pages(total=3, perpage=2)
+        self.assertEqual(list(paginate(page, items_key="items", pages=True)), [page(1), page(2)])
+
+    def test_error(self):
+        page = make_pages(total=30, perpage=10)
+
+        def fetch(number):
+            if number == 2:
+                raise GrafanaServerError(500, None, "Server Error 500")
+            return page(number)
+
+        items = paginate(fetch, items_key="items", perpage=10)
+        with self.assertRaises(GrafanaServerError):
+            list(items)
+
+    def test_invalid_prefetch(self):
+        self.assertRaises(ValueError, paginate, print, prefetch=0)
+
+    @requests_mock.Mocker()
+    def test_iter_teams(self, m):
+        page = make_pages(total=5, perpage=2, items_key="teams")
+        for number in range(1, 4):
+            m.get(
+                f"http://localhost:3000/api/teams/search?query=team&page={number}&perpage=2",
+                json=page(number),
+                headers=JSON_HEADERS,
+            )
+        grafana = GrafanaApi.from_url()
+        self.assertEqual(list(grafana.teams.iter_teams("team", perpage=2)), [0, 1, 2, 3, 4])
+        self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_iter_users(self, m):
+        m.get(
+            "http://localhost:3000/api/users/search?page=1&perpage=1000",
+            json={"totalCount": 1, "users": [{"login": "admin"}], "page": 1, "perPage": 1000},
+            headers=JSON_HEADERS,
+        )
+        grafana = GrafanaApi.from_url()
+        self.assertEqual(list(grafana.users.iter_users()), [{"login": "admin"}])
+
+    @requests_mock.Mocker()
+    def test_service_accounts_no_extra_page(self, m):
+        page = make_pages(total=3, perpage=2, items_key="serviceAccounts")
+        for number in range(1, 4):
+            m.get(
+                f"http://localhost:3000/api/serviceaccounts/search?page={number}&perpage=2",
+                json=page(number),
+                headers=JSON_HEADERS,
+            )
+        grafana = GrafanaApi.from_url()
+        self.assertEqual(grafana.serviceaccount.search(perpage=2), [page(1), page(2)])
+        self.assertEqual(m.call_count, 2)
+        m.reset_mock()
+        self.assertEqual(list(grafana.serviceaccount.iter_service_accounts(perpage=2)), [0, 1, 2])
+        self.assertEqual(m.call_count, 2)
+
+
+try:
+    import asyncio
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+    from grafana_client.pagination import apaginate
+
+    from .util import make_response
+
+    class AsyncPaginationTestCase(IsolatedAsyncioTestCase):
+        async def test_prefetch(self):
+            running = 0
+            peak = 0
+            page = make_pages(total=95, perpage=10)
+
+            async def fetch(number):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.001)
+                running -= 1
+                return page(number)
+
+            items = await apaginate(fetch, items_key="items", perpage=10, prefetch=3)
+            self.assertEqual([item async for item in items], list(range(95)))
+            self.assertLessEqual(peak, 3)
+
+        async def test_slow_page(self):
+            fetched = []
+            seen = []
+            page = make_pages(total=1000, perpage=10)
+
+            async def fetch(number):
+                fetched.append(number)
+                if number == 2:
+                    await asyncio.sleep(0.2)
+                    seen.append(len(fetched))
+                return page(number)
+
+            items = await apaginate(fetch, items_key="items", perpage=10, prefetch=2)
+            self.assertEqual([item async for item in items], list(range(1000)))
+            # The first page, the pending pages, and the pages held back.
+            self.assertLessEqual(seen[0], 5)
+
+        async def test_unknown_total(self):
+            pages = {1: [1, 2], 2: [3]}
+
+            async def fetch(number):
+                return pages.get(number, [])
+
+            self.assertEqual([item async for item in await apaginate(fetch, perpage=2)], [1, 2, 3])
+
+        async def test_iter_service_accounts(self):
+            page = make_pages(total=5, perpage=2, items_key="serviceAccounts")
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(verb, url, params=None, **kwargs):  # noqa: ARG001
+                return make_response(200, page(params["page"]))
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            items = await grafana.serviceaccount.iter_service_accounts(perpage=2)
+            self.assertEqual([item async for item in items], [0, 1, 2, 3, 4])
+            self.assertEqual(grafana.client.s.request.call_count, 3)
+
+        async def test_search_teams(self):
+            page = make_pages(total=3, perpage=2, items_key="teams")
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(verb, url, params=None, **kwargs):  # noqa: ARG001
+                return make_response(200, page(params["page"]))
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            self.assertEqual(await grafana.teams.search_teams(perpage=2), [0, 1, 2])
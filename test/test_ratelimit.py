@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch
+
+from grafana_client import AsyncGrafanaApi, GrafanaApi, RateLimiter, TokenBucket
+
+from .compat import requests_mock
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    def test_burst_then_throttle(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+    def test_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=1, clock=clock)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.1)
+        clock.now += 10
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.tokens, 0.0)
+
+    def test_invalid_rate(self):
+        self.assertRaises(ValueError, lambda: TokenBucket(rate=0))
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(
+            rate=TokenBucket(100, clock=self.clock),
+            endpoints={
+                "/ds/query": TokenBucket(1, clock=self.clock),
+                "POST /dashboards/*": TokenBucket(2, burst=1, clock=self.clock),
+            },
+        )
+
+    def test_endpoint_patterns(self):
+        self.assertEqual(self.limiter.reserve("POST", "/ds/query"), 0.0)
+        self.assertEqual(self.limiter.reserve("POST", "/ds/query?foo=bar"), 1.0)
+        self.assertEqual(self.limiter.reserve("GET", "/dashboards/uid/foo"), 0.0)
+        self.assertEqual(self.limiter.reserve("GET", "/dashboards/uid/foo"), 0.0)
+        self.assertEqual(self.limiter.reserve("POST", "/dashboards/db"), 0.0)
+        self.assertEqual(self.limiter.reserve("post", "/dashboards/db"), 0.5)
+
+    def test_stats(self):
+        for _ in range(3):
+            self.limiter.reserve("POST", "/ds/query")
+        stats = self.limiter.stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["delayed"], 2)
+        self.assertEqual(stats["wait_total"], 3.0)
+        self.assertEqual(stats["wait_max"], 2.0)
+        self.assertEqual(stats["endpoints"]["/ds/query"]["requests"], 3)
+        self.assertEqual(stats["endpoints"]["POST /dashboards/*"]["requests"], 0)
+
+    def test_specs(self):
+        limiter = RateLimiter(rate=5, burst=10, endpoints={"/search": (1, 2)})
+        self.assertEqual(limiter.bucket.burst, 10)
+        self.assertEqual(limiter.rules[0][3].rate, 1)
+        self.assertEqual(limiter.rules[0][3].burst, 2)
+
+    @requests_mock.Mocker()
+    def test_shared_between_clients(self, m):
+        m.get("http://localhost/api/health", json={})
+        limiter = RateLimiter(rate=TokenBucket(1, clock=self.clock))
+        first = GrafanaApi.from_url("http://localhost", rate_limiter=limiter)
+        second = GrafanaApi.from_url("http://localhost", rate_limiter=limiter)
+        with patch("grafana_client.ratelimit.time.sleep") as sleep:
+            first.health.check()
+            second.health.check()
+        sleep.assert_called_once_with(1.0)
+        self.assertEqual(m.call_count, 2)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from .util import make_response
+
+    class AsyncRateLimiterTestCase(IsolatedAsyncioTestCase):
+        async def test_async_client(self):
+            clock = FakeClock()
+            grafana = AsyncGrafanaApi.from_url(rate_limiter=RateLimiter(rate=TokenBucket(4, burst=1, clock=clock)))
+            grafana.client.s.request = AsyncMock(return_value=make_response(200, {}))
+            with patch("grafana_client.ratelimit.asyncio.sleep") as sleep:
+                await grafana.health.check()
+                await grafana.health.check()
+            sleep.assert_awaited_once_with(0.25)
+            self.assertEqual(grafana.client.rate_limiter.stats()["wait_total"], 0.25)
@@ -0,0 +1,197 @@
+import random
+import unittest
+from email.utils import formatdate
+from time import time
+from unittest.mock import patch
+
+import niquests
+
+from grafana_client import AsyncGrafanaApi, GrafanaApi
+from grafana_client.client import GrafanaClientError, GrafanaConnectionError, GrafanaServerError
+from grafana_client.retry import RetryPolicy, parse_retry_after
+
+from .compat import requests_mock
+from .util import JSON_HEADERS, make_response
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+    def test_idempotency_rules(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable("get", 503))
+        self.assertTrue(policy.is_retryable("DELETE", 502))
+        self.assertTrue(policy.is_retryable("GET", None))
+        self.assertFalse(policy.is_retryable("GET", 500))
+        self.assertFalse(policy.is_retryable("POST", 503))
+        self.assertFalse(policy.is_retryable("POST", None))
+        self.assertTrue(policy.is_retryable("POST", 429))
+
+    def test_backoff_capped_with_full_jitter(self):
+        policy = RetryPolicy(backoff_factor=1, backoff_max=4)
+        random.seed(42)
+        for attempt in range(10):
+            delay = policy.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(4, 2**attempt))
+
+    def test_backoff_without_jitter(self):
+        policy = RetryPolicy(backoff_factor=0.5, backoff_max=3, jitter=False)
+        self.assertEqual([policy.backoff(n) for n in range(5)], [0.5, 1.0, 2.0, 3, 3])
+
+    def test_next_delay_total(self):
+        policy = RetryPolicy(total=2, jitter=False)
+        self.assertEqual(policy.next_delay("GET", 0, 0.0, status_code=503), 0.5)
+        self.assertEqual(policy.next_delay("GET", 1, 0.5, status_code=503), 1.0)
+        self.assertIsNone(policy.next_delay("GET", 2, 1.5, status_code=503))
+
+    def test_next_delay_budget(self):
+        policy = RetryPolicy(total=10, jitter=False, budget=1.0)
+        self.assertEqual(policy.next_delay("GET", 0, 0.0), 0.5)
+        self.assertIsNone(policy.next_delay("GET", 1, 0.5))
+
+    def test_next_delay_retry_after(self):
+        policy = RetryPolicy(retry_after_max=10)
+        self.assertEqual(policy.next_delay("GET", 0, 0.0, status_code=429, headers={"Retry-After": "7"}), 7.0)
+        self.assertEqual(policy.next_delay("GET", 0, 0.0, status_code=429, headers={"Retry-After": "3600"}), 10)
+
+    def test_parse_retry_after(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertEqual(parse_retry_after("-5"), 0.0)
+        delay = parse_retry_after(formatdate(time() + 30, usegmt=True))
+        self.assertTrue(25 <= delay <= 30)
+
+
+class RetryClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grafana = GrafanaApi(
+            ("admin", "admin"),
+            host="localhost",
+            url_path_prefix="",
+            protocol="http",
+            retry=RetryPolicy(total=3, backoff_factor=0),
+        )
+
+    def test_int_shortcut(self):
+        grafana = GrafanaApi.from_url("http://localhost:3000", retry=5)
+        self.assertEqual(grafana.client.retry.total, 5)
+
+    def test_disabled_by_default(self):
+        grafana = GrafanaApi.from_url("http://localhost:3000")
+        self.assertIsNone(grafana.client.retry)
+
+    @requests_mock.Mocker()
+    def test_retry_success(self, m):
+        m.register_uri(
+            "GET",
+            "http://localhost/api/health",
+            [
+                {"status_code": 503, "json": {"message": "unavailable"}, "headers": JSON_HEADERS},
+                {"status_code": 502, "text": "bad gateway"},
+                {"status_code": 200, "json": {"version": "9.0.1"}, "headers": JSON_HEADERS},
+            ],
+        )
+        self.assertEqual(self.grafana.health.check(), {"version": "9.0.1"})
+        self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_retry_exhausted(self, m):
+        m.get("http://localhost/api/health", status_code=503, json={"message": "unavailable"})
+        with self.assertRaises(GrafanaServerError) as ctx:
+            self.grafana.health.check()
+        self.assertEqual(m.call_count, 4)
+        self.assertEqual(ctx.exception.retries, 3)
+        self.assertEqual(ctx.exception.retry_wait, 0.0)
+
+    def test_retry_exhausted_connection_error(self):
+        grafana = GrafanaApi.from_url("http://127.0.0.1:9", retry=RetryPolicy(total=2, backoff_factor=0))
+        with self.assertRaises(GrafanaConnectionError) as ctx:
+            grafana.health.check()
+        self.assertIsInstance(ctx.exception, niquests.exceptions.ConnectionError)
+        self.assertIsInstance(ctx.exception.__cause__, niquests.exceptions.ConnectionError)
+        self.assertEqual(ctx.exception.retries, 2)
+        self.assertEqual(ctx.exception.retry_wait, 0.0)
+
+    @requests_mock.Mocker()
+    def test_no_retry_non_idempotent(self, m):
+        m.post("http://localhost/api/folders", status_code=503, json={"message": "unavailable"})
+        with self.assertRaises(GrafanaServerError) as ctx:
+            self.grafana.folder.create_folder("foo")
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(ctx.exception.retries, 0)
+
+    @requests_mock.Mocker()
+    def test_retry_non_idempotent_too_many_requests(self, m):
+        m.register_uri(
+            "POST",
+            "http://localhost/api/folders",
+            [
+                {"status_code": 429, "json": {"message": "slow down"}, "headers": JSON_HEADERS},
+                {"status_code": 200, "json": {"uid": "foo"}, "headers": JSON_HEADERS},
+            ],
+        )
+        self.assertEqual(self.grafana.folder.create_folder("foo"), {"uid": "foo"})
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_no_retry_client_error(self, m):
+        m.get("http://localhost/api/folders/foo", status_code=404, json={"message": "not found"})
+        with self.assertRaises(GrafanaClientError):
+            self.grafana.folder.get_folder("foo")
+        self.assertEqual(m.call_count, 1)
+
+    @requests_mock.Mocker()
+    def test_retry_after_honored(self, m):
+        m.register_uri(
+            "GET",
+            "http://localhost/api/health",
+            [
+                {"status_code": 429, "json": {"message": "slow down"}, "headers": {**JSON_HEADERS, "Retry-After": "2"}},
+                {"status_code": 200, "json": {"version": "9.0.1"}, "headers": JSON_HEADERS},
+            ],
+        )
+        with patch("grafana_client.client.time.sleep") as sleep:
+            self.grafana.health.check()
+        sleep.assert_called_once_with(2.0)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+
+    class AsyncRetryClientTestCase(IsolatedAsyncioTestCase):
+        async def test_retry_success(self):
+            grafana = AsyncGrafanaApi(
+                ("admin", "admin"), host="localhost", protocol="http", retry=RetryPolicy(total=2, backoff_factor=0)
+            )
+            grafana.client.s.request = AsyncMock(
+                side_effect=[
+                    make_response(503, {"message": "unavailable"}),
+                    make_response(200, {"version": "9.0.1"}),
+                ]
+            )
+            self.assertEqual(await grafana.health.check(), {"version": "9.0.1"})
+            self.assertEqual(grafana.client.s.request.await_count, 2)
+
+        async def test_retry_exhausted(self):
+            grafana = AsyncGrafanaApi(
+                ("admin", "admin"), host="localhost", protocol="http", retry=RetryPolicy(total=2, backoff_factor=0)
+            )
+            grafana.client.s.request = AsyncMock(return_value=make_response(502, {"message": "bad gateway"}))
+            with self.assertRaises(GrafanaServerError) as ctx:
+                await grafana.health.check()
+            self.assertEqual(grafana.client.s.request.await_count, 3)
+            self.assertEqual(ctx.exception.retries, 2)
+
+        async def test_retry_exhausted_connection_error(self):
+            grafana = AsyncGrafanaApi(
+                ("admin", "admin"), host="localhost", protocol="http", retry=RetryPolicy(total=2, backoff_factor=0)
+            )
+            grafana.client.s.request = AsyncMock(side_effect=niquests.exceptions.ConnectionError("refused"))
+            with self.assertRaises(GrafanaConnectionError) as ctx:
+                await grafana.health.check()
+            self.assertEqual(grafana.client.s.request.await_count, 3)
+            self.assertEqual(ctx.exception.retries, 2)
@@ -0,0 +1,53 @@
+import unittest
+
+from parameterized import parameterized
+
+from grafana_client.routes import datasource_of, route_template
+
+
+class RouteTemplateTestCase(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("/health", "/health"),
+            ("/search?query=foo", "/search"),
+            ("/dashboards/db", "/dashboards/db"),
+            ("/dashboards/db/my-dashboard", "/dashboards/db/{slug}"),
+            ("/dashboards/uid/cIBgcSjkk", "/dashboards/uid/{uid}"),
+            ("/dashboards/uid/cIBgcSjkk/versions/3", "/dashboards/uid/{uid}/versions/{id}"),
+            ("/folders", "/folders"),
+            ("/folders/nErXDvCkzz/permissions", "/folders/{uid}/permissions"),
+            ("/folders/id/42", "/folders/id/{id}"),
+            ("/users/lookup?loginOrEmail=admin", "/users/lookup"),
+            ("/users/2/orgs", "/users/{id}/orgs"),
+            ("/orgs/name/Main%20Org.", "/orgs/name/{name}"),
+            ("/teams/search?query=foo&page=1", "/teams/search"),
+            ("/teams/5/groups/ldap-group", "/teams/{id}/groups/{uid}"),
+            ("/user/using/2", "/user/using/{id}"),
+            ("/access-control/folders/abc/users/5", "/access-control/folders/{uid}/users/{id}"),
+            ("/v1/provisioning/alert-rules/rule1", "/v1/provisioning/alert-rules/{uid}"),
+            ("/v1/provisioning/folder/abc/rule-groups/group", "/v1/provisioning/folder/{uid}/rule-groups/{uid}"),
+            ("/datasources/uid/abc/health", "/datasources/uid/{uid}/health"),
+            ("/datasources/proxy/5/query?db=foo", "/datasources/proxy/{id}/{path}"),
+            ("/datasources/proxy/uid/abc/api/v1/query", "/datasources/proxy/uid/{uid}/{path}"),
+            ("/ds/query", "/ds/query"),
+        ]
+    )
+    def test_route_template(self, url, template):
+        self.assertEqual(route_template(url), template)
+
+
+class DatasourceOfTestCase(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("/datasources/proxy/5/query", None, "5"),
+            ("/datasources/proxy/uid/abc/api/v1/query", None, "abc"),
+            ("/datasources/uid/abc/health", None, "abc"),
+            ("/datasources/7", None, "7"),
+            ("/ds/query", {"queries": [{"refId": "A", "datasource": {"uid": "abc"}}]}, "abc"),
+            ("/ds/query", {"queries": [{"refId": "A"}]}, None),
+            ("/datasources", None, None),
+            ("/search", None, None),
+        ]
+    )
+    def test_datasource_of(self, url, json, datasource):
+        self.assertEqual(datasource_of(url, json), datasource)
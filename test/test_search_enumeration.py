@@ -0,0 +1,143 @@
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from grafana_client import GrafanaApi
+from grafana_client.pagination import PartitionScheduler
+
+from .compat import requests_mock
+
+FOLDERS = [{"uid": f"folder-{index}", "title": f"Folder {index}", "type": "dash-folder"} for index in range(3)]
+DASHBOARDS = [
+    {"uid": f"dashboard-{index}", "title": f"Dashboard {index}", "type": "dash-db", "folderUid": f"folder-{index % 4}"}
+    for index in range(23)
+]
+for dashboard in DASHBOARDS:
+    # Dashboards of the fourth folder are located in the `General` folder.
+    if dashboard["folderUid"] == "folder-3":
+        del dashboard["folderUid"]
+
+
+def search(params):
+    """
+    Emulate paging and filtering of the `/search` endpoint.
+    """
+    hits = FOLDERS + DASHBOARDS
+    if "type" in params:
+        hits = [hit for hit in hits if hit["type"] == params["type"]]
+    if "folderUIDs" in params:
+        hits = [hit for hit in hits if hit.get("folderUid") in params["folderUIDs"].split(",")]
+    if params.get("folderIds") == "0":
+        hits = [hit for hit in hits if hit["type"] == "dash-db" and "folderUid" not in hit]
+    limit = int(params.get("limit", 5000))
+    page = int(params.get("page", 1))
+    return hits[(page - 1) * limit : page * limit]
+
+
+def respond(request, context):  # noqa: ARG001
+    params = {name: values[0] for name, values in parse_qs(urlparse(request.url).query).items()}
+    return search(params)
+
+
+class SearchEnumerationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grafana = GrafanaApi.from_url()
+
+    def uids(self, hits):
+        uids = [hit["uid"] for hit in hits]
+        self.assertEqual(len(uids), len(set(uids)))
+        return sorted(uids)
+
+    @requests_mock.Mocker()
+    def test_serial(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = self.grafana.search.iter_dashboards(limit=5, concurrency=1)
+        self.assertEqual(self.uids(hits), self.uids(FOLDERS + DASHBOARDS))
+        self.assertEqual(m.call_count, 6)
+
+    @requests_mock.Mocker()
+    def test_speculative(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = self.grafana.search.iter_dashboards(limit=5, concurrency=4)
+        self.assertEqual(self.uids(hits), self.uids(FOLDERS + DASHBOARDS))
+        self.assertLessEqual(m.call_count, 6 + 3)
+
+    @requests_mock.Mocker()
+    def test_partition_by_type(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = self.grafana.search.iter_dashboards(partition_by="type", limit=5, concurrency=2)
+        self.assertEqual(self.uids(hits), self.uids(FOLDERS + DASHBOARDS))
+
+    @requests_mock.Mocker()
+    def test_partition_by_folder(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = list(self.grafana.search.iter_dashboards(partition_by="folder", limit=5, concurrency=4))
+        self.assertEqual(self.uids(hits), self.uids(DASHBOARDS))
+        self.assertTrue(any("folderIds=0" in request.url for request in m.request_history))
+
+    @requests_mock.Mocker()
+    def test_partition_by_given_folders(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = self.grafana.search.iter_dashboards(partition_by="folder", folder_uids=["folder-1", "folder-2"])
+        expected = [hit for hit in DASHBOARDS if hit.get("folderUid") in ["folder-1", "folder-2"]]
+        self.assertEqual(self.uids(hits), self.uids(expected))
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_deduplicate(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = self.grafana.client.paginate_partitions(
+            "/search", [{"type": "dash-db"}, {}], limit=5, concurrency=3, key="uid"
+        )
+        self.assertEqual(self.uids(hits), self.uids(FOLDERS + DASHBOARDS))
+
+    @requests_mock.Mocker()
+    def test_fields(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = list(self.grafana.search.iter_dashboards(type_="dash-db", limit=10, fields=["title"]))
+        self.assertEqual(len(hits), len(DASHBOARDS))
+        self.assertEqual(set(hits[0]), {"title", "uid"})
+
+    @requests_mock.Mocker()
+    def test_search_dashboards_page(self, m):
+        m.get("http://localhost:3000/api/search", json=respond)
+        hits = self.grafana.search.search_dashboards(type_="dash-db", limit=10, page=3)
+        self.assertEqual(self.uids(hits), self.uids(DASHBOARDS[20:]))
+
+    def test_unknown_partitioning(self):
+        self.assertRaises(ValueError, self.grafana.search.iter_dashboards, partition_by="tag")
+
+    def test_scheduler(self):
+        scheduler = PartitionScheduler([{}], limit=10, concurrency=3)
+        units = scheduler.schedule(0)
+        self.assertEqual([page for _, page in units], [1, 2, 3])
+        partition = units[0][0]
+        self.assertEqual(scheduler.complete(partition, 1, [{}] * 10), [{}] * 10)
+        self.assertEqual([page for _, page in scheduler.schedule(2)], [4])
+        scheduler.complete(partition, 2, [{}] * 3)
+        self.assertEqual(scheduler.schedule(0), [])
+
+        scheduler = PartitionScheduler([{"type": "dash-db"}, {"type": "dash-folder"}], limit=10, concurrency=8)
+        self.assertEqual([page for _, page in scheduler.schedule(0)], [1, 1])
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+
+    from .util import make_response
+
+    class AsyncSearchEnumerationTestCase(IsolatedAsyncioTestCase):
+        async def test_partition_by_folder(self):
+            grafana = AsyncGrafanaApi.from_url()
+
+            async def request(verb, url, params=None, **kwargs):  # noqa: ARG001
+                return make_response(200, search({name: str(value) for name, value in params.items()}))
+
+            grafana.client.s.request = AsyncMock(side_effect=request)
+            hits = await grafana.search.iter_dashboards(partition_by="folder", limit=5, concurrency=4)
+            uids = [hit["uid"] async for hit in hits]
+            self.assertEqual(sorted(uids), sorted(hit["uid"] for hit in DASHBOARDS))
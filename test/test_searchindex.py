@@ -0,0 +1,137 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from grafana_client import GrafanaApi, SearchIndex
+from grafana_client.searchindex import within_one_edit
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+HITS = [
+    {"uid": "f1", "title": "Infrastructure", "type": "dash-folder", "tags": []},
+    {
+        "uid": "d1",
+        "title": "Kubernetes Node Exporter",
+        "type": "dash-db",
+        "tags": ["prod", "k8s"],
+        "folderUid": "f1",
+        "folderTitle": "Infrastructure",
+        "isStarred": True,
+    },
+    {
+        "uid": "d2",
+        "title": "Kubernetes Cluster Overview",
+        "type": "dash-db",
+        "tags": ["prod"],
+        "folderUid": "f1",
+        "folderTitle": "Infrastructure",
+    },
+    {"uid": "d3", "title": "Business KPIs", "type": "dash-db", "tags": ["Staging"]},
+]
+
+
+def uids(hits):
+    return [hit["uid"] for hit in hits]
+
+
+class SearchIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex(HITS)
+
+    def test_query_prefix(self):
+        self.assertEqual(uids(self.index.search_dashboards(query="kube")), ["d2", "d1"])
+        self.assertEqual(uids(self.index.search_dashboards(query="kube node")), ["d1"])
+        self.assertEqual(uids(self.index.search_dashboards(query="node kube")), ["d1"])
+        self.assertEqual(self.index.search_dashboards(query="ube"), [])
+
+    def test_query_fuzzy(self):
+        self.assertEqual(self.index.search_dashboards(query="kubernetse"), [])
+        self.assertEqual(uids(self.index.search_dashboards(query="kubernetse", fuzzy=True)), ["d2", "d1"])
+        self.assertEqual(uids(self.index.search_dashboards(query="clustr", fuzzy=True)), ["d2"])
+
+    def test_tags(self):
+        self.assertEqual(uids(self.index.search_dashboards(tag="prod")), ["d2", "d1"])
+        self.assertEqual(uids(self.index.search_dashboards(tag=["prod", "k8s"])), ["d1"])
+        self.assertEqual(uids(self.index.search_dashboards(tag="staging")), ["d3"])
+        self.assertEqual(self.index.search_dashboards(tag=["prod", "staging"]), [])
+
+    def test_filters(self):
+        self.assertEqual(uids(self.index.search_dashboards(type_="dash-folder")), ["f1"])
+        self.assertEqual(uids(self.index.search_dashboards(folder_uids=["f1"])), ["d2", "d1"])
+        self.assertEqual(uids(self.index.search_dashboards(folder="infra", query="node")), ["d1"])
+        self.assertEqual(uids(self.index.search_dashboards(dashboard_uids=["d3", "unknown"])), ["d3"])
+        self.assertEqual(uids(self.index.search_dashboards(starred=True)), ["d1"])
+        self.assertEqual(uids(self.index.search_dashboards(limit=2)), ["d3", "f1"])
+
+    def test_hit_shape(self):
+        self.assertIs(self.index.search_dashboards(query="business")[0], HITS[3])
+
+    def test_update(self):
+        changed = {**HITS[3], "title": "Revenue KPIs"}
+        stats = self.index.update([*HITS[:2], changed, {"uid": "d4", "title": "New"}], complete=True)
+        self.assertEqual(stats, {"added": 1, "changed": 1, "removed": 1})
+        self.assertEqual(self.index.search_dashboards(query="business"), [])
+        self.assertEqual(uids(self.index.search_dashboards(query="revenue")), ["d3"])
+        self.assertEqual(uids(self.index.search_dashboards(query="cluster")), [])
+        self.assertNotIn("d2", self.index)
+        self.assertNotIn("cluster", self.index.fields["title"].postings)
+
+    def test_persistence(self):
+        self.index.built_at = 1700000000.0
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "index.json"
+            self.index.save(path)
+            index = SearchIndex.load(path)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.built_at, 1700000000.0)
+        self.assertEqual(uids(index.search_dashboards(query="kube", tag="k8s")), ["d1"])
+
+    def test_within_one_edit(self):
+        self.assertTrue(within_one_edit("node", "nodes"))
+        self.assertTrue(within_one_edit("node", "nose"))
+        self.assertTrue(within_one_edit("node", "ndoe"))
+        self.assertFalse(within_one_edit("abcd", "bcde"))
+        self.assertFalse(within_one_edit("node", "nodess"))
+
+    def test_latency(self):
+        hits = [
+            {"uid": f"d{index}", "title": f"Service {index} latency overview", "tags": [f"team-{index % 50}"]}
+            for index in range(20000)
+        ]
+        index = SearchIndex(hits)
+        index.search_dashboards(query="servce", fuzzy=True)
+        start = time.perf_counter()
+        for _ in range(100):
+            index.search_dashboards(query="service 1234", tag="team-34")
+        self.assertLess((time.perf_counter() - start) / 100, 0.005)
+
+    @requests_mock.Mocker()
+    def test_build_and_refresh(self, m):
+        m.get("http://localhost:3000/api/search", json=HITS, headers=JSON_HEADERS)
+        grafana = GrafanaApi.from_url()
+        index = SearchIndex.build(grafana)
+        self.assertEqual(len(index), 4)
+        self.assertIsNotNone(index.built_at)
+        m.get("http://localhost:3000/api/search", json=HITS[1:], headers=JSON_HEADERS)
+        self.assertEqual(index.refresh(grafana), {"added": 0, "changed": 0, "removed": 1})
+        self.assertEqual(index.stats()["hits"], 3)
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+    from grafana_client import AsyncGrafanaApi
+
+    from .util import make_response
+
+    class AsyncSearchIndexTestCase(IsolatedAsyncioTestCase):
+        async def test_build(self):
+            grafana = AsyncGrafanaApi.from_url()
+            grafana.client.s.request = AsyncMock(return_value=make_response(200, HITS))
+            index = await SearchIndex.abuild(grafana)
+            self.assertEqual(uids(index.search_dashboards(tag="prod")), ["d2", "d1"])
@@ -0,0 +1,87 @@
+import json
+import subprocess
+import sys
+import unittest
+
+import grafana_client
+from grafana_client import AsyncGrafanaApi, GrafanaApi
+from grafana_client.api import LazyElement
+from grafana_client.elements import Dashboard, Health
+from grafana_client.elements._async import AsyncHealth
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    command = [sys.executable, *args]
+    return subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)  # noqa: S603
+
+
+def loaded_modules(code: str):
+    return json.loads(run_python("-c", f"import json, sys; {code}; print(json.dumps(sorted(sys.modules)))").stdout)
+
+
+class LazyElementTestCase(unittest.TestCase):
+    def test_constructed_on_first_access(self):
+        grafana = GrafanaApi.from_url()
+        self.assertNotIn("health", vars(grafana))
+        self.assertIsInstance(grafana.health, Health)
+        self.assertIs(grafana.health, grafana.health)
+        self.assertIs(grafana.health.client, grafana.client)
+
+    def test_element_with_api(self):
+        grafana = GrafanaApi.from_url()
+        self.assertIsInstance(grafana.dashboard, Dashboard)
+        self.assertIs(grafana.dashboard.api, grafana)
+
+    def test_async_element(self):
+        grafana = AsyncGrafanaApi.from_url()
+        self.assertIsInstance(grafana.health, AsyncHealth)
+        self.assertIs(grafana.health.client, grafana.client)
+
+    def test_assign_element(self):
+        grafana = GrafanaApi.from_url()
+        grafana.health = "foo"
+        self.assertEqual(grafana.health, "foo")
+
+    def test_class_attribute(self):
+        self.assertIsInstance(GrafanaApi.health, LazyElement)
+
+    def test_package_exports(self):
+        self.assertIn("GrafanaApi", dir(grafana_client))
+        self.assertIn("__version__", dir(grafana_client))
+        self.assertIsInstance(grafana_client.__version__, str)
+        with self.assertRaises(AttributeError):
+            grafana_client.GrafanaApiNotExisting  # noqa: B018
+
+    def test_elements_exports(self):
+        from grafana_client import elements
+
+        self.assertIn("Dashboard", dir(elements))
+        with self.assertRaises(AttributeError):
+            elements.DashboardNotExisting  # noqa: B018
+
+
+class StartupTestCase(unittest.TestCase):
+    def test_import_package(self):
+        modules = loaded_modules("import grafana_client")
+        self.assertNotIn("grafana_client.api", modules)
+        self.assertNotIn("niquests", modules)
+
+    def test_single_element(self):
+        modules = loaded_modules("from grafana_client import GrafanaApi; GrafanaApi.from_url().health")
+        self.assertIn("grafana_client.elements.health", modules)
+        self.assertNotIn("grafana_client.elements.dashboard", modules)
+        self.assertNotIn("grafana_client.elements._async", modules)
+        self.assertNotIn("verlib2", modules)
+
+    def test_async_element(self):
+        modules = loaded_modules("from grafana_client import AsyncGrafanaApi; AsyncGrafanaApi.from_url().health")
+        self.assertIn("grafana_client.elements._async.health", modules)
+        self.assertNotIn("grafana_client.elements.health", modules)
+        self.assertNotIn("grafana_client.elements._async.dashboard", modules)
+
+    def test_optional_components(self):
+        modules = loaded_modules("from grafana_client import GrafanaApi; GrafanaApi.from_url().health")
+        for name in ["bulk", "cache", "circuitbreaker", "codec", "compression", "metrics", "ratelimit", "retry"]:
+            self.assertNotIn(f"grafana_client.{name}", modules)
+        modules = loaded_modules("from grafana_client import GrafanaApi, ResponseCache; GrafanaApi.from_url(retry=3)")
+        self.assertIn("grafana_client.retry", modules)
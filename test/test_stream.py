@@ -0,0 +1,197 @@
+import json
+import unittest
+
+from grafana_client import AsyncGrafanaApi, GrafanaApi
+from grafana_client.client import GrafanaServerError
+from grafana_client.stream import JsonItemStream, iter_items, loads, make_projection
+
+from .compat import requests_mock
+from .util import JSON_HEADERS
+
+DASHBOARDS = [
+    {
+        "uid": f"uid-{index}",
+        "title": 'Title "with" [brackets] and {braces} \\ ' * (index % 3),
+        "meta": {"folderUid": "folder", "url": f"/d/uid-{index}"},
+        "panels": [{"id": panel, "title": "]}"} for panel in range(index)],
+        "starred": index % 2 == 0,
+        "score": -1.5e3,
+        "tags": None,
+    }
+    for index in range(20)
+]
+
+
+def chunked(data: bytes, size: int):
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+class JsonItemStreamTestCase(unittest.TestCase):
+    def test_make_projection(self):
+        self.assertEqual(make_projection(None), None)
+        self.assertEqual(make_projection("uid"), {"uid": None})
+        self.assertEqual(
+            make_projection(["uid", "meta.folderUid", "meta.url"]),
+            {"uid": None, "meta": {"folderUid": None, "url": None}},
+        )
+        self.assertEqual(make_projection(["meta", "meta.url"]), {"meta": None})
+
+    def test_chunk_boundaries(self):
+        data = json.dumps(DASHBOARDS, ensure_ascii=False).encode()
+        for size in [1, 2, 3, 7, 100, len(data)]:
+            self.assertEqual(list(iter_items(chunked(data, size))), DASHBOARDS, f"chunk size {size}")
+
+    def test_projection(self):
+        data = json.dumps(DASHBOARDS).encode()
+        expected = [{"uid": item["uid"], "meta": {"url": item["meta"]["url"]}} for item in DASHBOARDS]
+        for size in [1, 5, 1000]:
+            items = list(iter_items(chunked(data, size), fields=["uid", "meta.url", "missing"]))
+            self.assertEqual(items, expected)
+
+    def test_projection_applies_to_nested_arrays(self):
+        data = json.dumps(DASHBOARDS).encode()
+        items = list(iter_items([data], fields=["panels.id"]))
+        self.assertEqual(items[3], {"panels": [{"id": 0}, {"id": 1}, {"id": 2}]})
+
+    def test_nested_path(self):
+        document = {"totalCount": 20, "perPage": {"serviceAccounts": 0}, "page": {"serviceAccounts": DASHBOARDS}}
+        data = json.dumps(document).encode()
+        for size in [1, 64]:
+            items = list(iter_items(chunked(data, size), path="page.serviceAccounts", fields=["uid"]))
+            self.assertEqual(items, [{"uid": item["uid"]} for item in DASHBOARDS])
+
+    def test_nested_path_missing(self):
+        self.assertEqual(list(iter_items([b'{"totalCount": 0}'], path="serviceAccounts")), [])
+
+    def test_scalars(self):
+        self.assertEqual(list(iter_items([b'[1, 2.5, "x", null, true, [3], {}]'])), [1, 2.5, "x", None, True, [3], {}])
+        self.assertEqual(list(iter_items([b"[", b"1", b"2", b"]"])), [12])
+        self.assertEqual(list(iter_items([b" [ ] "])), [])
+
+    def test_scalars_split_at_every_offset(self):
+        data = b'[-2.5, 1e3, -0.25E-2, 17, true, false, null, "x", 4.0e+1]'
+        expected = json.loads(data)
+        for offset in range(1, len(data)):
+            items = list(iter_items([data[:offset], data[offset:]]))
+            self.assertEqual(items, expected, f"offset {offset}")
+
+    def test_incremental(self):
+        stream = JsonItemStream()
+        self.assertEqual(stream.feed('[{"a": 1}, {"a"'), [{"a": 1}])
+        self.assertEqual(stream.feed(": 2}"), [{"a": 2}])
+        self.assertEqual(stream.feed("]"), [])
+        self.assertEqual(stream.close(), [])
+        self.assertEqual(stream.count, 2)
+
+    def test_invalid(self):
+        for document in [b"[1,", b"{}", b"[{]", b"[1 2]", b'[{"a" 1}]']:
+            with self.assertRaises(ValueError, msg=document):
+                list(iter_items([document]))
+
+    def test_loads(self):
+        text = json.dumps({"dashboard": DASHBOARDS[5], "meta": {"folderUid": "folder"}})
+        self.assertEqual(
+            loads(text, ["dashboard.uid", "meta"]),
+            {"dashboard": {"uid": "uid-5"}, "meta": {"folderUid": "folder"}},
+        )
+        self.assertEqual(loads(text), json.loads(text))
+        self.assertRaises(ValueError, loads, "", ["uid"])
+        self.assertRaises(ValueError, loads, '{"uid": 1} 2', ["uid"])
+
+
+class SyncStreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.grafana = GrafanaApi.from_url()
+
+    @requests_mock.Mocker()
+    def test_search_stream(self, m):
+        m.get("http://localhost:3000/api/search", json=DASHBOARDS, headers=JSON_HEADERS)
+        hits = self.grafana.search.search_dashboards(stream=True, fields=["uid", "title"])
+        self.assertFalse(isinstance(hits, list))
+        self.assertEqual(list(hits), [{"uid": item["uid"], "title": item["title"]} for item in DASHBOARDS])
+
+    @requests_mock.Mocker()
+    def test_stream_nested_path(self, m):
+        m.get(
+            "http://localhost:3000/api/serviceaccounts/search",
+            json={"totalCount": 2, "serviceAccounts": [{"id": 1}, {"id": 2}]},
+            headers=JSON_HEADERS,
+        )
+        items = self.grafana.client.GET("/serviceaccounts/search", stream="serviceAccounts")
+        self.assertEqual(list(items), [{"id": 1}, {"id": 2}])
+
+    @requests_mock.Mocker()
+    def test_fields_without_stream(self, m):
+        m.get(
+            "http://localhost:3000/api/dashboards/uid/uid-3",
+            json={"dashboard": DASHBOARDS[3], "meta": {"folderUid": "folder"}},
+            headers=JSON_HEADERS,
+        )
+        dashboard = self.grafana.dashboard.get_dashboard("uid-3", fields=["dashboard.title", "meta.folderUid"])
+        self.assertEqual(dashboard, {"dashboard": {"title": DASHBOARDS[3]["title"]}, "meta": {"folderUid": "folder"}})
+
+    @requests_mock.Mocker()
+    def test_stream_error(self, m):
+        m.get("http://localhost:3000/api/datasources", json={"message": "Internal error"}, status_code=500)
+        with self.assertRaises(GrafanaServerError) as ctx:
+            self.grafana.datasource.list_datasources(stream=True)
+        self.assertEqual(ctx.exception.message, "Server Error 500: Internal error")
+
+
+class FakeAsyncResponse:
+    """
+    Minimal stand-in for `niquests.AsyncResponse` with `stream=True`.
+    """
+
+    def __init__(self, status_code, data: bytes, chunk_size=7):
+        self.status_code = status_code
+        self.headers = JSON_HEADERS
+        self.data = data
+        self.chunk_size = chunk_size
+        self.closed = False
+
+    @property
+    async def text(self):
+        return self.data.decode()
+
+    async def iter_content(self, chunk_size):  # noqa: ARG002
+        async def generate():
+            for chunk in chunked(self.data, self.chunk_size):
+                yield chunk
+
+        return generate()
+
+    async def close(self):
+        self.closed = True
+
+
+try:
+    from unittest import IsolatedAsyncioTestCase
+    from unittest.mock import AsyncMock
+except ImportError:  # pragma: no cover
+    pass
+else:
+
+    class AsyncStreamTestCase(IsolatedAsyncioTestCase):
+        def setUp(self):
+            self.grafana = AsyncGrafanaApi.from_url()
+
+        def mock_response(self, status_code, payload):
+            response = FakeAsyncResponse(status_code, json.dumps(payload).encode())
+            self.grafana.client.s.request = AsyncMock(return_value=response)
+            return response
+
+        async def test_alertrules_stream(self):
+            rules = [{"uid": f"rule-{index}", "title": "High load", "data": [{"model": {}}]} for index in range(5)]
+            response = self.mock_response(200, rules)
+            items = await self.grafana.alertingprovisioning.get_alertrules_all(stream=True, fields=["uid"])
+            self.assertEqual([item async for item in items], [{"uid": rule["uid"]} for rule in rules])
+            self.assertTrue(response.closed)
+            self.assertTrue(self.grafana.client.s.request.call_args.kwargs["stream"])
+
+        async def test_stream_error(self):
+            response = self.mock_response(503, {"message": "Service unavailable"})
+            with self.assertRaises(GrafanaServerError) as ctx:
+                await self.grafana.datasource.list_datasources(stream=True)
+            self.assertEqual(ctx.exception.message, "Server Error 503: Service unavailable")
+            self.assertTrue(response.closed)
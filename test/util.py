@@ -0,0 +1,16 @@
+import json
+
+import niquests
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def make_response(status_code, json_data=None, headers=None):
+    """
+    Create a `niquests.Response` object, for mocking `Session.request`.
+    """
+    response = niquests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or JSON_HEADERS)
+    response._content = json.dumps(json_data).encode()
+    return response